@@ -0,0 +1,5 @@
+"""
+Offline benchmarks. Run each module from the repository root, e.g.
+
+    python -m benchmarks.bench_jd_pipe --jobs 200
+"""
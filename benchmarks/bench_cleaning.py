@@ -0,0 +1,112 @@
+"""
+Cleaning engine: equivalence checks and throughput against the previous
+``TextCleaner`` implementation (three ``re.sub`` calls and a
+``str.replace`` per punctuation/stopword token).
+
+    python -m benchmarks.bench_cleaning --docs 20 --sizes medium xlarge
+
+Exits non-zero when the engine disagrees with the token-by-token reference
+or the legacy pattern stripping. The reference cases themselves are in
+tests/test_cleaning.py.
+"""
+
+import argparse
+import re
+import sys
+import time
+
+from benchmarks.corpus import make_resume
+from scripts.utils import models
+from scripts.utils.Utils import REGEX_PATTERNS, cleaner
+
+
+def legacy_strip_patterns(text):
+    for pattern in REGEX_PATTERNS:
+        text = re.sub(REGEX_PATTERNS[pattern], "", text)
+    return text
+
+
+def legacy_clean_doc(text, doc):
+    for token in doc:
+        if token.pos_ == "PUNCT":
+            text = text.replace(token.text, "")
+    return text
+
+
+def legacy_remove_stopwords(text, doc):
+    for token in doc:
+        if token.is_stop:
+            text = text.replace(token.text, "")
+    return text
+
+
+def reference_clean_doc(doc, drop_punct=True, drop_stopwords=False):
+    return "".join(
+        token.whitespace_
+        if (drop_punct and token.pos_ == "PUNCT") or (drop_stopwords and token.is_stop)
+        else token.text_with_ws
+        for token in doc
+    )
+
+
+def best_of(fn, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--sizes", nargs="+", default=["medium", "xlarge"])
+    args = parser.parse_args()
+
+    failures = 0
+    for size in args.sizes:
+        size = int(size) if size.isdigit() else size
+        texts = [make_resume(seed, size) for seed in range(args.docs)]
+        stripped = [cleaner.strip_patterns(text) for text in texts]
+        docs = list(models.pipe(stripped, profile="keywords"))
+
+        pattern_mismatches = sum(
+            cleaner.strip_patterns(text) != legacy_strip_patterns(text) for text in texts
+        )
+        engine_mismatches = sum(
+            cleaner.clean_doc(doc) != reference_clean_doc(doc)
+            or cleaner.clean_doc(doc, drop_punct=False, drop_stopwords=True)
+            != reference_clean_doc(doc, drop_punct=False, drop_stopwords=True)
+            for doc in docs
+        )
+        legacy_differences = sum(
+            cleaner.clean_doc(doc) != legacy_clean_doc(doc.text, doc) for doc in docs
+        )
+        failures += engine_mismatches + pattern_mismatches
+
+        chars = sum(len(text) for text in texts)
+        timings = {
+            "strip patterns (legacy)": best_of(lambda: [legacy_strip_patterns(t) for t in texts]),
+            "strip patterns (engine)": best_of(lambda: [cleaner.strip_patterns(t) for t in texts]),
+            "drop punctuation (legacy)": best_of(lambda: [legacy_clean_doc(d.text, d) for d in docs]),
+            "drop punctuation (engine)": best_of(lambda: [cleaner.clean_doc(d) for d in docs]),
+            "drop stopwords (legacy)": best_of(lambda: [legacy_remove_stopwords(d.text, d) for d in docs]),
+            "drop stopwords (engine)": best_of(
+                lambda: [cleaner.clean_doc(d, drop_punct=False, drop_stopwords=True) for d in docs]
+            ),
+        }
+
+        print(f"size={size} docs={args.docs} avg chars={chars // args.docs}")
+        for label, elapsed in timings.items():
+            print(f"  {label:<28} {elapsed * 1000:9.2f}ms  {chars / elapsed / 1e6:8.2f} MB/s")
+        print(f"  engine vs token-by-token reference mismatches: {engine_mismatches}")
+        print(f"  engine vs legacy pattern stripping mismatches: {pattern_mismatches}")
+        print(f"  docs where legacy punctuation removal differs (substring deletions): {legacy_differences}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
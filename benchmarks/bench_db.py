@@ -0,0 +1,352 @@
+"""
+Database-backed checks of the task pipeline against a scratch Postgres:
+
+- ``pipeline``: DB round trips per task, and whether the legacy
+  context-free stage sequence, run_task, run_task_async, run_batch and
+  streamed runs (TASK_STREAM_MIN_JOBS=0, tiny chunks) leave identical
+  rows;
+- ``pool``: the sync pool waiting for, timing out on and replacing
+  connections;
+- ``memory``: peak RSS growth of one large task loaded versus streamed.
+
+    python -m benchmarks.bench_db --dsn postgresql://localhost/matcher_bench pipeline --tasks 3 --jobs 50
+    python -m benchmarks.bench_db --dsn postgresql://localhost/matcher_bench pool
+    python -m benchmarks.bench_db --dsn postgresql://localhost/matcher_bench memory --jobs 3000 --description-kb 40
+
+``pipeline`` and ``memory`` DROP and recreate "TaskRequest", "Resume",
+"Job", "JobMatched" and the matcher's own tables as minimal stand-ins for
+the main application's, so never point them at a real database. Every run
+happens in a fresh subprocess with the keyword cache disabled, so no run
+sees another's parsed keywords or IDF model. Exits non-zero when the
+runners disagree or the pool misbehaves.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+import psycopg2
+
+from benchmarks.corpus import make_job_html, make_resume
+
+CORE_TABLES = """
+    DROP TABLE IF EXISTS "JobMatched", "Job", "Resume", "TaskRequest", "IdfModel", "IdfTerm", "TaskQueue" CASCADE;
+    CREATE TABLE "Resume" (id text PRIMARY KEY, "rawText" text, keywords text[]);
+    CREATE TABLE "Job" (id text PRIMARY KEY, "htmlDescription" text, keywords text[]);
+    CREATE TABLE "TaskRequest" (
+        id text PRIMARY KEY, "resumeId" text REFERENCES "Resume" (id), "matchStatus" text
+    );
+    CREATE TABLE "JobMatched" (
+        id serial PRIMARY KEY,
+        "taskRequestId" text REFERENCES "TaskRequest" (id),
+        "jobId" text REFERENCES "Job" (id),
+        "similarityScore" double precision
+    );
+"""
+
+# Short postings share few terms with any resume, so scores spread out
+# instead of all reaching the calibration ceiling
+JOB_SIZES = ("small", 300, 120)
+
+# Large descriptions are mostly markup the HTML-to-text step drops, so the
+# memory run measures rows held in memory rather than parsing time
+LARGE_JOBS_QUERY = """
+    INSERT INTO "Job" (id, "htmlDescription")
+    SELECT 'large' || g, '<script>' || repeat(md5(g::text), %s) || '</script>'
+        || '<p>Senior Python engineer ' || g || ' with Kafka and Kubernetes experience.</p>'
+    FROM generate_series(1, %s) g
+"""
+
+DUMP_QUERIES = {
+    "TaskRequest": 'SELECT id, "matchStatus" FROM "TaskRequest" ORDER BY id',
+    "Resume": 'SELECT id, keywords, "keywordCounts", "keywordsHash" FROM "Resume" ORDER BY id',
+    "Job": 'SELECT id, keywords, "keywordCounts", "keywordsHash" FROM "Job" ORDER BY id',
+    "JobMatched": """
+        SELECT "taskRequestId", "jobId", "similarityScore", "scoreModelVersion"
+        FROM "JobMatched" ORDER BY 1, 2
+    """,
+}
+
+# run_task logs "for task_id=<id>", run_batch "for <n> tasks"
+ROUND_TRIPS_LOG = re.compile(r"📊 (\d+) DB round trips for (?:task_id=(\S+)|\d+ tasks)")
+
+# name -> extra environment of the subprocess running it
+RUNNERS = {
+    "legacy": {},
+    "sync": {},
+    "async": {},
+    "batch": {},
+    "sync-streamed": {"TASK_STREAM_MIN_JOBS": "0", "DB_STREAM_CHUNK_SIZE": "7"},
+    "async-streamed": {"TASK_STREAM_MIN_JOBS": "0", "DB_STREAM_CHUNK_SIZE": "7"},
+    "batch-streamed": {"TASK_STREAM_MIN_JOBS": "0", "DB_STREAM_CHUNK_SIZE": "7"},
+}
+
+
+def seed(dsn: str, tasks: int, jobs: int):
+    """
+    Recreate the tables with ``jobs`` jobs and ``tasks`` pending tasks. The
+    first task matches every job, the others every second one.
+    """
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(CORE_TABLES)
+            cur.executemany(
+                'INSERT INTO "Job" (id, "htmlDescription") VALUES (%s, %s)',
+                [(f"job{j}", make_job_html(j, JOB_SIZES[j % len(JOB_SIZES)])) for j in range(jobs)],
+            )
+            for t in range(tasks):
+                cur.execute('INSERT INTO "Resume" (id, "rawText") VALUES (%s, %s)', (f"res{t}", make_resume(t, "small")))
+                cur.execute(
+                    'INSERT INTO "TaskRequest" (id, "resumeId", "matchStatus") VALUES (%s, %s, %s)',
+                    (f"task{t}", f"res{t}", "PENDING"),
+                )
+                cur.executemany(
+                    'INSERT INTO "JobMatched" ("taskRequestId", "jobId") VALUES (%s, %s)',
+                    [(f"task{t}", f"job{j}") for j in range(jobs) if t == 0 or (j + t) % 2 == 0],
+                )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def seed_large(dsn: str, jobs: int, description_kb: int):
+    seed(dsn, tasks=1, jobs=0)
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            # md5 is 32 characters
+            cur.execute(LARGE_JOBS_QUERY, (description_kb * 32, jobs))
+            cur.execute('INSERT INTO "JobMatched" ("taskRequestId", "jobId") SELECT %s, id FROM "Job"', ("task0",))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def dump(dsn: str) -> dict:
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            tables = {}
+            for table, query in DUMP_QUERIES.items():
+                cur.execute(query)
+                tables[table] = [list(row) for row in cur.fetchall()]
+        return tables
+    finally:
+        conn.close()
+
+
+def spawn(dsn: str, runner: str, task_ids, extra_env=None) -> dict:
+    env = {**os.environ, "PG_DSN": dsn, "KEYWORD_CACHE_ENABLED": "0", **RUNNERS.get(runner, {}), **(extra_env or {})}
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_db", "--dsn", dsn, "run", runner, *task_ids],
+        env=env, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        sys.stderr.write(completed.stderr)
+        raise RuntimeError(f"{runner} run exited with {completed.returncode}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(runner: str, task_ids) -> dict:
+    """
+    Run the tasks in this process with one runner and report the outcome,
+    the round trips each task logged and the peak RSS growth.
+    """
+    from scripts.Pipeline import run_batch, run_task, run_task_async
+    from scripts.utils import aio, models
+    from scripts.utils.schema import ensure_schema
+
+    round_trips = {}
+
+    class RoundTripsHandler(logging.Handler):
+        def emit(self, record):
+            match = ROUND_TRIPS_LOG.search(record.getMessage())
+            if match:
+                round_trips[match.group(2) or "batch"] = int(match.group(1))
+
+    # Warnings go to stderr, shown when the run fails; INFO is only parsed
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger().handlers[0].setLevel(logging.WARNING)
+    logging.getLogger().addHandler(RoundTripsHandler())
+
+    ensure_schema()
+    models.warm_up()
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+
+    if runner.startswith("legacy"):
+        results = {task_id: run_legacy(task_id, round_trips) for task_id in task_ids}
+    elif runner.startswith("sync"):
+        results = {task_id: run_task(task_id) for task_id in task_ids}
+    elif runner.startswith("async"):
+        async def run_all():
+            # One task at a time, so every runner updates the IDF model in the same order
+            try:
+                return {task_id: await run_task_async(task_id) for task_id in task_ids}
+            finally:
+                await aio.close_async_pool()
+        results = asyncio.run(run_all())
+    else:
+        results = run_batch(task_ids)
+
+    return {
+        "results": results,
+        "roundTrips": round_trips,
+        "seconds": time.perf_counter() - start,
+        "peakRssGrowthMb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base) / 1024,
+    }
+
+
+def run_legacy(task_id: str, round_trips: dict) -> bool:
+    # The stages without a TaskContext, each querying what it needs as
+    # before the context was introduced
+    from scripts.JobDescriptionProcessor import JobDescriptionProcessor
+    from scripts.ResumeProcessor import ResumeProcessor
+    from scripts.Score import Score
+    from scripts.utils.db import track_round_trips
+
+    with track_round_trips() as trips:
+        score = Score(task_id)
+        ok = (
+            score.is_valid_task()
+            and ResumeProcessor(task_id).process()
+            and JobDescriptionProcessor(task_id).process()
+            and score.calculate_score()
+        )
+        score.update_status("SUCCESS" if ok else "FAILED")
+    round_trips[task_id] = trips.count
+    return bool(ok)
+
+
+def check_pipeline(dsn: str, tasks: int, jobs: int) -> bool:
+    task_ids = [f"task{t}" for t in range(tasks)]
+    dumps, reports = {}, {}
+    for runner in RUNNERS:
+        seed(dsn, tasks, jobs)
+        reports[runner] = spawn(dsn, runner, task_ids)
+        dumps[runner] = dump(dsn)
+
+    reference = dumps["sync"]
+    ok = True
+    print(f"{tasks} tasks over {jobs} jobs; round trips per task (batch: whole batch)")
+    for runner, report in reports.items():
+        same = dumps[runner] == reference
+        ok = ok and same and all(report["results"].values())
+        trips = report["roundTrips"].get("batch") or "/".join(
+            str(report["roundTrips"].get(task_id, "-")) for task_id in task_ids
+        )
+        print(f"  {runner:<15} {trips!s:<12} {report['seconds']:7.2f}s  {'same rows' if same else 'ROWS DIFFER'}")
+        for table in reference:
+            if dumps[runner][table] != reference[table]:
+                print(f"    {table} differs from sync")
+    return ok
+
+
+def check_pool(dsn: str) -> bool:
+    from scripts.utils.db import CountingConnection, InstrumentedPool
+
+    pool = InstrumentedPool(1, 2, dsn=dsn, connection_factory=CountingConnection, timeout=0.5, validate_idle_seconds=0)
+    ok = True
+
+    # Exhausted: a third checkout times out
+    held = [pool.getconn(), pool.getconn()]
+    try:
+        pool.getconn()
+        print("  ! checkout from an exhausted pool did not time out")
+        ok = False
+    except psycopg2.pool.PoolError as e:
+        print(f"  exhausted pool: {e}")
+
+    # A connection returned while waiting is handed to the waiter
+    timer = threading.Timer(0.2, pool.putconn, args=(held.pop(),))
+    timer.start()
+    start = time.monotonic()
+    held.append(pool.getconn())
+    print(f"  waited {time.monotonic() - start:.2f}s for a returned connection")
+    for conn in held:
+        pool.putconn(conn)
+
+    # A backend killed while idle is replaced on the next checkout
+    conn = pool.getconn()
+    pid = conn.get_backend_pid()
+    pool.putconn(conn)
+    admin = psycopg2.connect(dsn)
+    try:
+        with admin.cursor() as cur:
+            cur.execute("SELECT pg_terminate_backend(%s)", (pid,))
+        admin.commit()
+    finally:
+        admin.close()
+    conn = pool.getconn()
+    replaced = conn.get_backend_pid()
+    pool.putconn(conn)
+    print(f"  idle backend {pid} terminated, next checkout got backend {replaced}")
+
+    stats = pool.snapshot()
+    pool.closeall()
+    print("  " + json.dumps(stats))
+    expected = {"waits": 2, "timeouts": 1, "validationFailures": 1}
+    for name, count in expected.items():
+        if stats[name] != count:
+            print(f"  ! {name} is {stats[name]}, expected {count}")
+            ok = False
+    return ok and replaced != pid
+
+
+def check_memory(dsn: str, jobs: int, description_kb: int) -> bool:
+    ok = True
+    print(f"one task over {jobs} jobs with {description_kb} KB descriptions")
+    for label, min_jobs in (("loaded", str(jobs + 1)), ("streamed", "0")):
+        seed_large(dsn, jobs, description_kb)
+        report = spawn(dsn, "sync", ["task0"], {"TASK_STREAM_MIN_JOBS": min_jobs})
+        ok = ok and report["results"]["task0"]
+        print(f"  {label:<9} peak RSS growth {report['peakRssGrowthMb']:7.1f} MB  {report['seconds']:7.1f}s")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", required=True, help="scratch database; its tables are dropped")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pipeline = commands.add_parser("pipeline")
+    pipeline.add_argument("--tasks", type=int, default=3)
+    pipeline.add_argument("--jobs", type=int, default=50)
+
+    commands.add_parser("pool")
+
+    memory = commands.add_parser("memory")
+    memory.add_argument("--jobs", type=int, default=3000)
+    memory.add_argument("--description-kb", type=int, default=40)
+
+    # Internal: one runner in a fresh process
+    single = commands.add_parser("run")
+    single.add_argument("runner", choices=list(RUNNERS))
+    single.add_argument("task_ids", nargs="+")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        print(json.dumps(run(args.runner, args.task_ids)))
+        return
+
+    if args.command == "pipeline":
+        ok = check_pipeline(args.dsn, args.tasks, args.jobs)
+    elif args.command == "pool":
+        ok = check_pool(args.dsn)
+    else:
+        ok = check_memory(args.dsn, args.jobs, args.description_kb)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
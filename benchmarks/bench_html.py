@@ -0,0 +1,75 @@
+"""
+HTML-to-text: equivalence checks and throughput of the streaming extractor
+against the previous BeautifulSoup ``get_text`` implementation.
+
+    python -m benchmarks.bench_html --docs 20 --sizes large xlarge
+
+Every posting and whole scraped page must give the BeautifulSoup text
+once block newlines are read as spaces. Exits non-zero on any mismatch.
+Edge cases and feeding markup in pieces are covered by
+tests/test_htmltext.py.
+"""
+
+import argparse
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks.corpus import make_job_html, make_job_page
+from scripts.utils.htmltext import html_to_text
+
+
+def reference_text(html):
+    return BeautifulSoup(html, "html.parser").get_text(separator=" ", strip=True)
+
+
+def mismatches(htmls) -> int:
+    count = 0
+    for html in htmls:
+        if html_to_text(html).replace("\n", " ") != reference_text(html).replace("\n", " "):
+            count += 1
+            print(f"  ! mismatch on {html[:60]!r}")
+    return count
+
+
+def best_of(fn, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--sizes", nargs="+", default=["medium", "large", "xlarge"])
+    args = parser.parse_args()
+
+    failures = 0
+    for size in args.sizes:
+        size = int(size) if size.isdigit() else size
+        for kind, make in (("posting", make_job_html), ("page", make_job_page)):
+            htmls = [make(seed, size) for seed in range(args.docs)]
+            size_failures = mismatches(htmls)
+            failures += size_failures
+
+            chars = sum(len(html) for html in htmls)
+            timings = {
+                "BeautifulSoup get_text": best_of(lambda: [reference_text(html) for html in htmls]),
+                "streaming extractor": best_of(lambda: [html_to_text(html) for html in htmls]),
+            }
+            print(f"{kind} size={size} docs={args.docs} avg chars={chars // args.docs}")
+            for label, elapsed in timings.items():
+                print(f"  {label:<24} {elapsed * 1000:9.2f}ms  {chars / elapsed / 1e6:8.2f} MB/s")
+            speedup = timings["BeautifulSoup get_text"] / timings["streaming extractor"]
+            print(f"  speedup: {speedup:.2f}x  mismatches: {size_failures}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Job-description parsing throughput: per-job ``ParseJobDesc`` loop versus
+one batched ``nlp.pipe`` run, as ``JobDescriptionProcessor`` does for a task.
+
+    python -m benchmarks.bench_jd_pipe --jobs 200 --batch-size 64 --n-process 1 2 4
+"""
+
+import argparse
+import time
+
+from benchmarks.corpus import make_job_description
+from scripts.parsers import ParseJobDesc
+
+
+def run_loop(descriptions):
+    return [ParseJobDesc(description).get_JSON() for description in descriptions]
+
+
+def run_batched(descriptions, batch_size, n_process):
+    return [
+        parsed.get_JSON()
+        for parsed in ParseJobDesc.pipe(descriptions, batch_size=batch_size, n_process=n_process)
+    ]
+
+
+def timed(label, fn, jobs):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.2f}s  {jobs / elapsed:8.1f} jobs/sec")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--size", default="small", help="corpus size name or character count")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+
+    size = int(args.size) if args.size.isdigit() else args.size
+    descriptions = [make_job_description(seed, size) for seed in range(args.jobs)]
+
+    # Warm the model so the first measured run does not pay for lazy setup
+    ParseJobDesc(descriptions[0])
+
+    expected = timed("loop", lambda: run_loop(descriptions), args.jobs)
+    for n_process in args.n_process:
+        result = timed(
+            f"pipe batch={args.batch_size} n_process={n_process}",
+            lambda: run_batched(descriptions, args.batch_size, n_process),
+            args.jobs,
+        )
+        if result != expected:
+            print("  ! batched keywords differ from the per-job loop")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Pre-forked parse workers: throughput scaling from 1 to N processes and the
+memory each worker adds on top of the parent's preloaded model.
+
+RSS counts shared pages in every process; PSS splits them between the
+processes sharing them, and USS is what a worker alone would free on exit.
+Linux only (reads /proc/<pid>/smaps_rollup).
+
+    python -m benchmarks.bench_prefork --jobs 400 --workers 1 2 4 8 16
+    python -m benchmarks.bench_prefork --no-freeze   # compare without gc.freeze
+"""
+
+import argparse
+import gc
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.corpus import make_job_html
+from scripts.JobDescriptionProcessor import parse_html_descriptions
+from scripts.utils import models, procpool
+
+
+def memory(pid) -> dict:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if rest.strip().endswith("kB"):
+                fields[name] = int(rest.split()[0]) / 1024
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def run(htmls, workers, chunk_size):
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=procpool.fork_context())
+    list(pool.map(procpool._ready, range(workers)))
+    try:
+        start = time.perf_counter()
+        result = list(procpool.map_chunks(parse_html_descriptions, htmls, chunk_size, pool))
+        elapsed = time.perf_counter() - start
+        usage = [memory(process.pid) for process in multiprocessing.active_children()]
+    finally:
+        pool.shutdown()
+    return result, elapsed, usage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=400)
+    parser.add_argument("--size", default="small", help="corpus size name or character count")
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count()])
+    parser.add_argument("--no-freeze", dest="freeze", action="store_false")
+    args = parser.parse_args()
+
+    size = int(args.size) if args.size.isdigit() else args.size
+    htmls = [make_job_html(seed, size) for seed in range(args.jobs)]
+
+    if args.freeze:
+        procpool.preload()
+    else:
+        models.warm_up()
+    parent = memory(os.getpid())
+    print(f"parent after preload  rss {parent['rss']:7.1f} MiB  (freeze={args.freeze}, {gc.get_freeze_count()} frozen)")
+
+    expected = parse_html_descriptions(htmls[:args.chunk_size])
+    base = None
+    print(f"{'workers':>7} {'jobs/sec':>9} {'speedup':>8} {'rss/worker':>11} {'pss/worker':>11} {'uss/worker':>11}")
+    for workers in sorted(set(args.workers)):
+        result, elapsed, usage = run(htmls, workers, args.chunk_size)
+        if result[:args.chunk_size] != expected:
+            print("  ! pooled keywords differ from in-process parsing")
+        throughput = args.jobs / elapsed
+        base = base or throughput
+        mean = {key: sum(u[key] for u in usage) / len(usage) for key in ("rss", "pss", "uss")}
+        print(f"{workers:>7} {throughput:>9.1f} {throughput / base:>7.2f}x "
+              f"{mean['rss']:>7.1f} MiB {mean['pss']:>7.1f} MiB {mean['uss']:>7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+spaCy throughput per extraction profile, against running every pipeline
+component as the extractor did before profiles existed. The pipeline is
+the one SPACY_MODEL names; speedups depend on its components, so quote
+them together with the model line printed first.
+
+    SPACY_MODEL=en_core_web_md python -m benchmarks.bench_profiles --docs 200 --size medium
+"""
+
+import argparse
+import time
+
+from benchmarks.corpus import make_resume
+from scripts.utils import models
+
+
+def run(texts, batch_size, disable):
+    nlp = models.get_nlp()
+    start = time.perf_counter()
+    for _ in nlp.pipe(texts, batch_size=batch_size, disable=disable):
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--size", default="medium", help="corpus size name or character count")
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    size = int(args.size) if args.size.isdigit() else args.size
+    texts = [make_resume(seed, size) for seed in range(args.docs)]
+    nlp = models.get_nlp()
+    print(f"model {models.SPACY_MODEL} {models.model_version()} components {','.join(nlp.pipe_names)}")
+    run(texts[:8], args.batch_size, [])
+
+    baseline = run(texts, args.batch_size, [])
+    print(f"{'all components':<10} {'':<52} {args.docs / baseline:8.1f} docs/sec")
+    for name, profile in models.PROFILES.items():
+        disabled = profile.disabled(nlp)
+        elapsed = run(texts, args.batch_size, disabled)
+        enabled = [component for component in nlp.pipe_names if component not in disabled]
+        print(
+            f"{name:<10} runs {','.join(enabled) or '(tokenizer only)':<47} "
+            f"{args.docs / elapsed:8.1f} docs/sec  {baseline / elapsed:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
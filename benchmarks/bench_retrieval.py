@@ -0,0 +1,59 @@
+"""
+Top-k job retrieval: pruned ``JobIndex.pruned_top_k`` versus exhaustive
+accumulation of every posting, for short skill-style queries and
+resume-length queries, on a synthetic catalog.
+
+    python -m benchmarks.bench_retrieval --jobs 100000 --queries 50 --k 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.corpus import make_keywords
+from scripts.JobIndex import JobIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--keywords", type=int, default=80, help="keywords per job")
+    parser.add_argument("--query-keywords", type=int, nargs="+", default=[5, 20, 80, 160])
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = JobIndex()
+    index.add_documents(
+        (job_id, make_keywords(job_id, args.keywords, args.vocabulary)) for job_id in range(args.jobs)
+    )
+    index.top_k(["warm"], 1)
+    print(f"built index over {args.jobs} jobs in {time.perf_counter() - start:.2f}s")
+
+    for query_size in args.query_keywords:
+        queries = [make_keywords(-1 - seed, query_size, args.vocabulary) for seed in range(args.queries)]
+        timings = {"pruned": [], "exhaustive": []}
+        recall = []
+        for query in queries:
+            start = time.perf_counter()
+            pruned = index.pruned_top_k(query, args.k)
+            timings["pruned"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            exhaustive = index.exhaustive_top_k(query, args.k)
+            timings["exhaustive"].append(time.perf_counter() - start)
+
+            expected = {job_id for job_id, _ in exhaustive}
+            recall.append(len(expected & {job_id for job_id, _ in pruned}) / max(1, len(expected)))
+
+        print(f"query keywords={query_size}")
+        for label, values in timings.items():
+            values = np.array(values) * 1000
+            print(f"  {label:<11} p50 {np.percentile(values, 50):8.2f}ms  p95 {np.percentile(values, 95):8.2f}ms")
+        print(f"  recall@{args.k} vs exhaustive: {np.mean(recall):.4f}")
+
+if __name__ == "__main__":
+    main()
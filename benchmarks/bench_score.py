@@ -0,0 +1,129 @@
+"""
+Resume-vs-jobs scoring: per-pair ``tfidf_job_in_resume_score`` versus the
+vectorized ``tfidf_job_in_resume_scores``, and corpus-model scoring from
+keywords versus from precomputed job vectors, with equivalence checks.
+With ``--processes`` the batched scores are also computed in chunks on a
+pre-forked pool through ``procpool.map_chunks``, as parsing is.
+
+    python -m benchmarks.bench_score --jobs 10 100 10000
+    python -m benchmarks.bench_score --jobs 1000 10000 --processes 2 4
+"""
+
+import argparse
+import math
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from benchmarks.corpus import make_keywords
+from scripts.IdfModel import IdfModel
+from scripts.JobVectors import job_vectors
+from scripts.Score import Score
+from scripts.utils import procpool
+from scripts.utils.keywords import count_keywords, term_counts
+
+
+def corpus_model(jobs) -> IdfModel:
+    frequencies = Counter()
+    for keywords in jobs:
+        frequencies.update(term_counts(keywords).keys())
+    term_ids = {term: term_id for term_id, term in enumerate(sorted(frequencies), start=1)}
+    return IdfModel("bench", len(jobs), dict(frequencies), term_ids)
+
+
+def stored_vectors(jobs, model) -> list:
+    # As Score reads them back from the Job table
+    vectors = job_vectors(dict(enumerate(jobs)), model)
+    return [
+        (model.version, vectors[row][0].tolist(), vectors[row][1].tolist()) if row in vectors else None
+        for row in range(len(jobs))
+    ]
+
+
+def score_chunk(resume, jobs) -> list:
+    return Score(task_id=None).tfidf_job_in_resume_scores(resume, jobs).tolist()
+
+
+def pooled_scores(resume, jobs, processes) -> tuple:
+    pool = ProcessPoolExecutor(max_workers=processes, mp_context=procpool.fork_context())
+    list(pool.map(procpool._ready, range(processes)))
+    try:
+        start = time.perf_counter()
+        chunk_size = math.ceil(len(jobs) / processes)
+        scores = np.array(list(procpool.map_chunks(partial(score_chunk, resume), jobs, chunk_size, pool)))
+        return scores, time.perf_counter() - start
+    finally:
+        pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[10, 100, 10_000])
+    parser.add_argument("--keywords", type=int, default=150, help="keywords per document")
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    parser.add_argument("--processes", type=int, nargs="*", default=[], help="pool sizes to score on")
+    args = parser.parse_args()
+
+    score = Score(task_id=None)
+    resume = " ".join(make_keywords(seed=-1, count=args.keywords))
+    failures = 0
+
+    for n_jobs in args.jobs:
+        jobs = [" ".join(make_keywords(seed, args.keywords)) for seed in range(n_jobs)]
+
+        start = time.perf_counter()
+        pairwise = np.array([score.tfidf_job_in_resume_score(resume, job) for job in jobs])
+        pairwise_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched = score.tfidf_job_in_resume_scores(resume, jobs)
+        batched_elapsed = time.perf_counter() - start
+
+        max_diff = float(np.max(np.abs(pairwise - batched)))
+        status = "ok" if max_diff <= args.tolerance else "MISMATCH"
+        failures += status != "ok"
+        print(
+            f"jobs={n_jobs:<6} pairwise {pairwise_elapsed:8.3f}s  batched {batched_elapsed:8.3f}s  "
+            f"speedup {pairwise_elapsed / batched_elapsed:7.1f}x  max|diff| {max_diff:.2e} {status}"
+        )
+
+        for processes in args.processes:
+            pooled, pooled_elapsed = pooled_scores(resume, jobs, processes)
+            max_diff = float(np.max(np.abs(pooled - batched)))
+            status = "ok" if max_diff <= args.tolerance else "MISMATCH"
+            failures += status != "ok"
+            print(
+                f"{'':<11} pool={processes:<3} {pooled_elapsed:8.3f}s  batched {batched_elapsed:8.3f}s  "
+                f"speedup {batched_elapsed / pooled_elapsed:7.1f}x  max|diff| {max_diff:.2e} {status}"
+            )
+
+        job_counts = [count_keywords(job.split()) for job in jobs]
+        model = corpus_model(job_counts)
+        vectors = stored_vectors(job_counts, model)
+
+        start = time.perf_counter()
+        from_keywords = score.corpus_tfidf_job_in_resume_scores(resume, job_counts, model)
+        keywords_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        from_vectors = score.corpus_tfidf_job_in_resume_scores(resume, job_counts, model, vectors)
+        vectors_elapsed = time.perf_counter() - start
+
+        max_diff = float(np.max(np.abs(from_keywords - from_vectors)))
+        status = "ok" if max_diff <= args.tolerance else "MISMATCH"
+        failures += status != "ok"
+        print(
+            f"{'':<11} corpus   {keywords_elapsed:8.3f}s  vectors {vectors_elapsed:8.3f}s  "
+            f"speedup {keywords_elapsed / vectors_elapsed:7.1f}x  max|diff| {max_diff:.2e} {status}"
+        )
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Semantic matching: ``SemanticIndex.top_k`` (IVF) recall@k and latency
+against exhaustive search for several probe counts, and task scoring with
+``Score.semantic_scores`` versus a per-job loop, with an equivalence check.
+Vectors are synthetic: normalized points scattered around random topics.
+
+    python -m benchmarks.bench_semantic --jobs 100000 --queries 50 --k 20
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from scripts.Score import Score
+from scripts.SemanticIndex import SemanticIndex
+
+
+def clustered_vectors(count: int, dimensions: int, topics: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = np.random.default_rng(0).standard_normal((topics, dimensions)).astype(np.float32)
+    vectors = centers[rng.integers(topics, size=count)] + rng.standard_normal((count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--dimensions", type=int, default=300)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--probes", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--task-jobs", type=int, default=1000, help="jobs per scored task")
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    vectors = clustered_vectors(args.jobs, args.dimensions, args.topics, seed=1)
+    start = time.perf_counter()
+    index = SemanticIndex(min_jobs=0)
+    index.add_documents(enumerate(vectors))
+    index.train()
+    print(f"built index over {args.jobs} jobs, {len(index.lists)} lists in {time.perf_counter() - start:.2f}s")
+
+    queries = clustered_vectors(args.queries, args.dimensions, args.topics, seed=2)
+    exhaustive, timings = [], []
+    for query in queries:
+        start = time.perf_counter()
+        exhaustive.append({job_id for job_id, _ in index.exhaustive_top_k(query, args.k)})
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1000
+    print(f"  {'exhaustive':<11} p50 {np.percentile(timings, 50):8.2f}ms  p95 {np.percentile(timings, 95):8.2f}ms")
+
+    for n_probes in args.probes:
+        timings, recall = [], []
+        for query, expected in zip(queries, exhaustive):
+            start = time.perf_counter()
+            found = index.top_k(query, args.k, n_probes)
+            timings.append(time.perf_counter() - start)
+            recall.append(len(expected & {job_id for job_id, _ in found}) / max(1, len(expected)))
+        timings = np.array(timings) * 1000
+        print(
+            f"  {f'probes={n_probes}':<11} p50 {np.percentile(timings, 50):8.2f}ms  "
+            f"p95 {np.percentile(timings, 95):8.2f}ms  recall@{args.k} {np.mean(recall):.4f}"
+        )
+
+    # As Score reads them back from the Job table
+    resume = queries[0].tolist()
+    jobs = [vector.tolist() for vector in vectors[:args.task_jobs]]
+
+    start = time.perf_counter()
+    looped = np.array([max(0.0, min(1.0, float(np.dot(resume, job)))) for job in jobs])
+    looped_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = Score.semantic_scores(resume, jobs)
+    batched_elapsed = time.perf_counter() - start
+
+    max_diff = float(np.max(np.abs(looped - batched)))
+    status = "ok" if max_diff <= args.tolerance else "MISMATCH"
+    print(
+        f"task jobs={args.task_jobs:<6} per-job {looped_elapsed:8.3f}s  batched {batched_elapsed:8.3f}s  "
+        f"speedup {looped_elapsed / batched_elapsed:7.1f}x  max|diff| {max_diff:.2e} {status}"
+    )
+    if status != "ok":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Per-stage latency and throughput on the synthetic corpora, with a baseline
+comparison so a release that slows a stage down fails loudly.
+
+    python -m benchmarks.bench_stages --sizes small medium --output stages.json
+    python -m benchmarks.bench_stages --baseline stages.json --threshold 0.2
+
+Every input is timed on its own, so each stage reports p50/p95 latency per
+call as well as throughput. Runs offline: no database is touched. Exits
+non-zero when a stage's latency exceeds the baseline by more than the
+threshold.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.corpus import SIZES, make_job_description, make_job_html, make_keywords, make_resume
+from scripts.Extractor import DataExtractor, pipeline_version
+from scripts.JobDescriptionProcessor import JobDescriptionProcessor
+from scripts.Score import Score
+from scripts.parsers import ParseJobDesc
+from scripts.utils import models
+from scripts.utils.Utils import TextCleaner
+
+
+def keyword_count(size) -> int:
+    # Roughly one noun per 12 characters of generated text
+    return max(10, (SIZES[size] if isinstance(size, str) else int(size)) // 12)
+
+
+def parsed_resumes(size, docs):
+    texts = [make_resume(seed, size) for seed in range(docs)]
+    return list(DataExtractor.pipe_docs(texts))
+
+
+def score_pairs(size, docs):
+    count = keyword_count(size)
+    return [
+        (" ".join(make_keywords(-seed - 1, count)), " ".join(make_keywords(seed, count)))
+        for seed in range(docs)
+    ]
+
+
+def score_batches(size, docs, jobs_per_call=1000):
+    count = keyword_count(size)
+    jobs = [" ".join(make_keywords(seed, count)) for seed in range(jobs_per_call)]
+    return [(" ".join(make_keywords(-seed - 1, count)), jobs) for seed in range(docs)]
+
+
+score = Score(task_id=None)
+
+# name -> (build inputs from (size, docs), run one input, characters in one input)
+STAGES = {
+    "read_html_description": (
+        lambda size, docs: [make_job_html(seed, size) for seed in range(docs)],
+        JobDescriptionProcessor.read_html_description,
+        len,
+    ),
+    "parse": (
+        lambda size, docs: [TextCleaner.remove_emails_links(make_resume(seed, size)) for seed in range(docs)],
+        lambda text: models.parse(text, "keywords"),
+        len,
+    ),
+    "clean_text": (
+        parsed_resumes,
+        lambda item: TextCleaner.clean_text(item[0], doc=item[1]),
+        lambda item: len(item[0]),
+    ),
+    "extract_particular_words": (
+        lambda size, docs: [DataExtractor(text, doc=doc) for text, doc in parsed_resumes(size, docs)],
+        lambda extractor: extractor.extract_particular_words(),
+        lambda extractor: len(extractor.text),
+    ),
+    "parse_job_description": (
+        lambda size, docs: [make_job_description(seed, size) for seed in range(docs)],
+        lambda text: ParseJobDesc(text).get_JSON(),
+        len,
+    ),
+    "tfidf_job_in_resume_score": (
+        score_pairs,
+        lambda pair: score.tfidf_job_in_resume_score(*pair),
+        lambda pair: len(pair[0]) + len(pair[1]),
+    ),
+    "tfidf_job_in_resume_scores[1000]": (
+        score_batches,
+        lambda batch: score.tfidf_job_in_resume_scores(*batch),
+        lambda batch: len(batch[0]) + sum(len(job) for job in batch[1]),
+    ),
+}
+
+
+def measure(stage, size, docs, repeat, warmup) -> dict:
+    build, run, chars = STAGES[stage]
+    inputs = build(size, docs)
+    for item in inputs[:warmup]:
+        run(item)
+
+    timings = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            run(item)
+            timings.append(time.perf_counter() - start)
+
+    timings = np.array(timings)
+    total_chars = sum(chars(item) for item in inputs) * repeat
+    return {
+        "stage": stage,
+        "size": size,
+        "calls": len(timings),
+        "p50_ms": float(np.percentile(timings, 50) * 1000),
+        "p95_ms": float(np.percentile(timings, 95) * 1000),
+        "mean_ms": float(timings.mean() * 1000),
+        "calls_per_sec": float(len(timings) / timings.sum()),
+        "mb_per_sec": float(total_chars / timings.sum() / 1e6),
+    }
+
+
+def compare(results, baseline, metric, threshold) -> list:
+    """
+    Print each stage's change against the baseline.
+
+    Returns:
+        list: Keys of the stages slower than the baseline by more than threshold.
+    """
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            print(f"  {key:<42} (not in baseline)")
+            continue
+        ratio = result[metric] / previous[metric]
+        regressed = ratio > 1 + threshold
+        if regressed:
+            regressions.append(key)
+        print(f"  {key:<42} {previous[metric]:9.3f}ms -> {result[metric]:9.3f}ms  "
+              f"{(ratio - 1) * 100:+7.1f}%{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--sizes", nargs="+", default=["small", "medium"])
+    parser.add_argument("--docs", type=int, default=20, help="inputs per stage and size")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes over the inputs")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed calls before timing")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--metric", choices=["p50_ms", "p95_ms", "mean_ms"], default="p50_ms")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown against the baseline, e.g. 0.2 for 20%%")
+    args = parser.parse_args()
+
+    models.warm_up()
+    results = {}
+    for size in args.sizes:
+        size = int(size) if size.isdigit() else size
+        for stage in args.stages:
+            result = measure(stage, size, args.docs, args.repeat, args.warmup)
+            results[f"{stage}/{size}"] = result
+            print(f"{stage:<34} {str(size):<7} p50 {result['p50_ms']:9.3f}ms  p95 {result['p95_ms']:9.3f}ms  "
+                  f"{result['calls_per_sec']:9.1f}/s  {result['mb_per_sec']:7.2f} MB/s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "environment": {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "pipeline": pipeline_version(),
+                },
+                "settings": {"docs": args.docs, "repeat": args.repeat, "warmup": args.warmup},
+                "results": results,
+            }, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Against {args.baseline} ({args.metric}, threshold {args.threshold:.0%}):")
+        regressions = compare(results, baseline["results"], args.metric, args.threshold)
+        if regressions:
+            print(f"! {len(regressions)} stages regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
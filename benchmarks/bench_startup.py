@@ -0,0 +1,50 @@
+"""
+Cold-start cost: importing the app in a fresh interpreter (what a uvicorn
+reload pays before / answers) and, separately, model warm-up.
+
+    python -m benchmarks.bench_startup --runs 5 --max-import-seconds 3
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_APP = "import main"
+WARM_UP = "from scripts.utils import models; models.warm_up()"
+
+
+def time_fresh_interpreter(code: str, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-seconds", type=float, default=None,
+                        help="exit non-zero when the median app import is slower")
+    parser.add_argument("--skip-warm-up", action="store_true")
+    args = parser.parse_args()
+
+    baseline = statistics.median(time_fresh_interpreter("pass", args.runs))
+    import_app = statistics.median(time_fresh_interpreter(IMPORT_APP, args.runs))
+    print(f"interpreter start   {baseline:6.2f}s")
+    print(f"import main         {import_app:6.2f}s  (+{import_app - baseline:.2f}s)")
+
+    if not args.skip_warm_up:
+        warm = statistics.median(time_fresh_interpreter(WARM_UP, max(1, args.runs // 2)))
+        print(f"import + warm-up    {warm:6.2f}s  (+{warm - baseline:.2f}s)")
+
+    if args.max_import_seconds is not None and import_app > args.max_import_seconds:
+        print(f"! app import exceeded {args.max_import_seconds:.2f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
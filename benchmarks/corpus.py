@@ -0,0 +1,259 @@
+"""
+Deterministic synthetic resumes and job descriptions for offline benchmarks.
+
+Every generator takes a seed, so two runs with the same arguments produce
+byte-identical corpora and timings stay comparable between releases.
+"""
+
+import itertools
+import random
+from functools import lru_cache
+
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Rust", "SQL",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Kafka", "Spark", "Hadoop",
+    "Airflow", "Docker", "Kubernetes", "Terraform", "AWS", "Azure", "GCP",
+    "React", "Angular", "Vue", "Django", "Flask", "FastAPI", "Spring",
+    "TensorFlow", "PyTorch", "scikit-learn", "pandas", "NumPy", "Linux",
+    "Git", "Jenkins", "GraphQL", "REST", "microservices", "Tableau",
+    "Excel", "Jira", "Agile", "Scrum", "CI/CD", "Node.js", "C++", "Scala",
+]
+
+NOUNS = [
+    "experience", "team", "product", "platform", "pipeline", "service",
+    "customer", "system", "architecture", "design", "infrastructure",
+    "data", "analytics", "model", "application", "feature", "release",
+    "performance", "reliability", "security", "testing", "deployment",
+    "stakeholder", "requirement", "solution", "project", "roadmap",
+    "communication", "ownership", "mentorship", "documentation", "code",
+]
+
+VERBS = [
+    "built", "designed", "led", "maintained", "optimized", "delivered",
+    "migrated", "automated", "scaled", "shipped", "improved", "owned",
+]
+
+ADJECTIVES = [
+    "scalable", "distributed", "robust", "high-traffic", "cloud-native",
+    "real-time", "secure", "cross-functional", "data-driven", "modern",
+]
+
+TITLES = [
+    "Software Engineer", "Data Engineer", "Backend Developer",
+    "Machine Learning Engineer", "DevOps Engineer", "Full Stack Developer",
+    "Data Scientist", "Platform Engineer", "Site Reliability Engineer",
+]
+
+RESUME_SECTIONS = ["Summary", "Experience", "Skills", "Projects", "Education"]
+
+# Approximate characters per generated document for each named size
+SIZES = {
+    "small": 1_000,
+    "medium": 5_000,
+    "large": 25_000,
+    "xlarge": 100_000,
+}
+
+
+def _sentence(rng: random.Random) -> str:
+    return "{} {} {} {} using {} and {}, improving {} for the {}.".format(
+        rng.choice(VERBS).capitalize(),
+        rng.choice(ADJECTIVES),
+        rng.choice(NOUNS),
+        rng.choice(NOUNS),
+        rng.choice(SKILLS),
+        rng.choice(SKILLS),
+        rng.choice(NOUNS),
+        rng.choice(NOUNS),
+    )
+
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def _target_chars(size) -> int:
+    return SIZES[size] if isinstance(size, str) else int(size)
+
+
+def make_resume(seed: int = 0, size="small") -> str:
+    """
+    Generate a plain-text resume of roughly ``size`` characters.
+
+    Args:
+        seed (int): Seed for the random generator.
+        size (str | int): A key of ``SIZES`` or a character count.
+
+    Returns:
+        str: The resume text, including contact details and section headers.
+    """
+    rng = random.Random(f"resume-{seed}")
+    target = _target_chars(size)
+    parts = [
+        f"Jane Doe {seed}",
+        f"jane.doe{seed}@example.com | (555) 123-{seed % 10000:04d} | "
+        f"https://www.linkedin.com/in/jane-doe-{seed}",
+    ]
+    length = sum(len(part) for part in parts)
+    while length < target:
+        section = rng.choice(RESUME_SECTIONS)
+        if section == "Skills":
+            body = ", ".join(rng.sample(SKILLS, 12))
+        else:
+            body = f"{rng.choice(TITLES)}, {rng.randint(2010, 2020)} - present. " + _paragraph(rng, 4)
+        parts.extend([section, body])
+        length += len(section) + len(body)
+    return "\n".join(parts)
+
+
+def make_job_description(seed: int = 0, size="small") -> str:
+    """
+    Generate a plain-text job description of roughly ``size`` characters.
+
+    Args:
+        seed (int): Seed for the random generator.
+        size (str | int): A key of ``SIZES`` or a character count.
+
+    Returns:
+        str: The job description text.
+    """
+    rng = random.Random(f"jd-{seed}")
+    target = _target_chars(size)
+    parts = [f"{rng.choice(TITLES)} at Company {seed % 997}"]
+    length = len(parts[0])
+    while length < target:
+        body = _paragraph(rng, 3) + " Requirements: " + ", ".join(rng.sample(SKILLS, 6)) + "."
+        parts.append(body)
+        length += len(body)
+    return "\n".join(parts)
+
+
+def make_job_html(seed: int = 0, size="small") -> str:
+    """
+    Generate scraped-posting-shaped HTML of roughly ``size`` characters.
+
+    The markup mixes block and inline elements, entities, comments and
+    script/style blocks, as real job board pages do.
+
+    Args:
+        seed (int): Seed for the random generator.
+        size (str | int): A key of ``SIZES`` or a character count.
+
+    Returns:
+        str: The HTML document.
+    """
+    rng = random.Random(f"html-{seed}")
+    target = _target_chars(size)
+    parts = [
+        "<html><head><title>Job posting</title>",
+        "<style>.apply{color:#fff;background:#0a66c2}</style>",
+        "<script>window.dataLayer=window.dataLayer||[];dataLayer.push({job:%d});</script>" % seed,
+        "</head><body><div class=\"job\">",
+        f"<h1>{rng.choice(TITLES)}</h1>",
+    ]
+    length = sum(len(part) for part in parts)
+    while length < target:
+        kind = rng.random()
+        if kind < 0.4:
+            chunk = f"<p>{_sentence(rng)} <strong>{rng.choice(SKILLS)}</strong> &amp; {rng.choice(SKILLS)}.</p>"
+        elif kind < 0.7:
+            items = "".join(f"<li>{rng.choice(ADJECTIVES)} {rng.choice(SKILLS)} {rng.choice(NOUNS)}</li>" for _ in range(5))
+            chunk = f"<h3>Requirements</h3><ul>{items}</ul>"
+        elif kind < 0.85:
+            chunk = f"<div><span>{_sentence(rng)}</span><br/><em>{rng.choice(NOUNS)}</em></div>"
+        elif kind < 0.95:
+            chunk = f"<!-- tracking {rng.randint(0, 10**6)} --><p>{_sentence(rng)}&nbsp;</p>"
+        else:
+            chunk = "<script>track('%d');</script>" % rng.randint(0, 10**6)
+        parts.append(chunk)
+        length += len(chunk)
+    parts.append("</div></body></html>")
+    return "".join(parts)
+
+
+def make_job_page(seed: int = 0, size="large") -> str:
+    """
+    Generate a whole scraped job board page of roughly ``size`` characters:
+    the posting wrapped in attribute-heavy layout markup, JSON-LD, inline
+    SVG icons, navigation and footer link lists and tracking pixels.
+
+    Args:
+        seed (int): Seed for the random generator.
+        size (str | int): A key of ``SIZES`` or a character count.
+
+    Returns:
+        str: The HTML document.
+    """
+    rng = random.Random(f"page-{seed}")
+    target = _target_chars(size)
+    title = rng.choice(TITLES)
+    parts = [
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\">",
+        f"<title>{title} - Company {seed % 997} | Jobs</title>",
+        "".join(f"<link rel=\"preload\" href=\"/static/chunk-{i}.js\" as=\"script\">" for i in range(8)),
+        "<script type=\"application/ld+json\">{\"@type\":\"JobPosting\",\"title\":\"%s\",\"hiringOrganization\":"
+        "{\"name\":\"Company %d\"},\"description\":\"&lt;p&gt;%s&lt;/p&gt;\"}</script>" % (title, seed % 997, _sentence(rng)),
+        "<style>" + "".join(f".c{i}{{margin:{i}px;display:flex}}" for i in range(40)) + "</style>",
+        "</head><body class=\"page jobs-detail\"><header class=\"site-header\"><nav aria-label=\"Main\"><ul>",
+        "".join(f"<li class=\"nav-item\"><a href=\"/{noun}\" data-track=\"nav-{i}\">{noun.title()}</a></li>"
+                for i, noun in enumerate(rng.sample(NOUNS, 8))),
+        "</ul></nav></header><main id=\"content\"><article class=\"posting\" data-job-id=\"%d\">" % seed,
+        f"<h1 class=\"posting-title\">{title}</h1>",
+        "<table class=\"facts\"><tr><th>Location</th><td>Remote &ndash; EU</td></tr>"
+        f"<tr><th>Salary</th><td>&euro;{rng.randint(40, 120)}k&#8211;&#x20AC;{rng.randint(121, 200)}k</td></tr></table>",
+    ]
+    footer = "</article></main><footer><ul>" + "".join(
+        f"<li><a href=\"/legal/{i}\">Legal&nbsp;{i}</a></li>" for i in range(12)
+    ) + "</ul><p>&copy; Company</p></footer><img src=\"/pixel.gif?id=%d\" width=\"1\" height=\"1\"></body></html>" % seed
+    length = sum(len(part) for part in parts) + len(footer)
+    while length < target:
+        kind = rng.random()
+        icon = f"<svg class=\"icon\" viewBox=\"0 0 24 24\"><path d=\"M{rng.randint(0, 24)} 0L24 {rng.randint(0, 24)}Z\"/></svg>"
+        if kind < 0.35:
+            chunk = (f"<div class=\"section c{rng.randint(0, 39)}\" style=\"padding:8px\"><p>{_sentence(rng)} "
+                     f"<a href=\"/skills/{rng.choice(SKILLS)}\" rel=\"nofollow\">{rng.choice(SKILLS)}</a>, "
+                     f"<strong>{rng.choice(SKILLS)}</strong> &amp; {rng.choice(SKILLS)}.</p></div>")
+        elif kind < 0.65:
+            items = "".join(f"<li class=\"req\">{icon}<span>{rng.choice(ADJECTIVES)} {rng.choice(SKILLS)} "
+                            f"{rng.choice(NOUNS)}</span></li>" for _ in range(4))
+            chunk = f"<section><h2>What you&rsquo;ll need</h2><ul class=\"list\">{items}</ul></section>"
+        elif kind < 0.85:
+            chunk = (f"<div class=\"row\"><div class=\"col\"><span data-i18n=\"k{rng.randint(0, 999)}\">"
+                     f"{_sentence(rng)}</span><br><em>{rng.choice(NOUNS)}</em></div></div>")
+        elif kind < 0.95:
+            chunk = f"<!-- ab-test {rng.randint(0, 10**6)} --><p>{_sentence(rng)}&nbsp;&#8212; {rng.choice(NOUNS)}</p>"
+        else:
+            chunk = "<script>window.__STATE__.push({\"id\":%d,\"html\":\"<p>x</p>\"});</script>" % rng.randint(0, 10**6)
+        parts.append(chunk)
+        length += len(chunk)
+    parts.append(footer)
+    return "".join(parts)
+
+
+@lru_cache(maxsize=None)
+def _zipf_vocabulary(size: int):
+    vocabulary = SKILLS + NOUNS + [f"skill{i}" for i in range(max(0, size - len(SKILLS) - len(NOUNS)))]
+    vocabulary = vocabulary[:size]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocabulary))))
+    return vocabulary, cum_weights
+
+
+def make_keywords(seed: int = 0, count: int = 80, vocabulary_size: int = 2000) -> list:
+    """
+    Generate a keyword list shaped like ``extract_particular_words`` output.
+
+    Terms follow a Zipf distribution over a vocabulary of
+    ``vocabulary_size`` terms, so common skills repeat across documents and
+    the long tail is sparse, as in the real ``Job.keywords`` column.
+
+    Args:
+        seed (int): Seed for the random generator.
+        count (int): Number of keywords, duplicates included.
+        vocabulary_size (int): Number of distinct terms to draw from.
+
+    Returns:
+        list: The keywords.
+    """
+    rng = random.Random(f"kw-{seed}")
+    vocabulary, cum_weights = _zipf_vocabulary(vocabulary_size)
+    return rng.choices(vocabulary, cum_weights=cum_weights, k=count)
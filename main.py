@@ -1,17 +1,60 @@
 import json
 import logging
-import time
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import Literal
 
 from pydantic import BaseModel
-from fastapi import FastAPI, BackgroundTasks
-from scripts import JobDescriptionProcessor, ResumeProcessor, Score
+from fastapi import FastAPI, BackgroundTasks, Response
+from scripts import Score
+from scripts.JobIndex import get_job_index
+from scripts.SemanticIndex import get_semantic_index
+from scripts.Pipeline import run_batch, run_task, run_task_async
+from scripts.TaskQueue import get_task_queue
+from scripts.utils import aio, db, metrics, models, profiling, schema
+from scripts.utils.docvectors import SCORE_MODE, current_vector, vector_model
+
+# Load and run the spaCy model in the background right after startup, so
+# the server answers immediately and /ready flips once warm
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "1") == "1"
+
+# Hand tasks to the durable queue served by worker.py; set to 0 to run them
+# in this process with BackgroundTasks (local development only)
+TASK_QUEUE_ENABLED = os.getenv("TASK_QUEUE_ENABLED", "1") == "1"
+
+warm_up_error = None
+# Set once the database has every column the matcher needs
+schema_ready = False
+
+def warm_up():
+    global warm_up_error
+    try:
+        models.warm_up()
+        warm_up_error = None
+    except Exception as e:
+        warm_up_error = str(e)
+        logging.exception("❌ Model warm-up failed")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARM_UP_ON_STARTUP:
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    yield
+    await aio.close_async_pool()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 logging.basicConfig(level=logging.INFO)
 
 class JobMatchRequest(BaseModel):
     taskId: str
+    # Write a cProfile dump of the run to PROFILE_DIR
+    profile: bool = False
+
+class JobMatchBatchRequest(BaseModel):
+    taskIds: list[str]
+    profile: bool = False
 
 @app.get("/")
 def root():
@@ -21,76 +64,135 @@ def root():
         logging.exception("❌ Health check failed.")
         return {"error": str(e)}
 
+@app.get("/ready")
+def ready(response: Response):
+    global schema_ready
+    if not schema_ready:
+        try:
+            missing = schema.missing_columns()
+        except Exception as e:
+            response.status_code = 503
+            return {"ready": False, "error": f"Could not check the schema: {e}"}
+        if missing:
+            response.status_code = 503
+            return {"ready": False, "error": f"Missing columns: {', '.join(missing)}"}
+        schema_ready = True
+    if not models.is_loaded():
+        response.status_code = 503
+        return {"ready": False, "error": warm_up_error}
+    return {"ready": True}
+
+@app.get("/pool-stats")
+def pool_stats():
+    return {"sync": db.pool_stats(), "async": aio.pool_stats()}
+
+@app.get("/metrics")
+def metrics_page():
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
 @app.post("/webhook/job-match")
-def process(request: JobMatchRequest, background_tasks: BackgroundTasks):
+async def process(request: JobMatchRequest, background_tasks: BackgroundTasks):
     task_id = request.taskId
     logging.info(f"📥 Received job match request for task_id={task_id}")
-    background_tasks.add_task(background_process, task_id)
+
+    if not TASK_QUEUE_ENABLED:
+        # Requested and sampled tasks alike: the profiler only sees its own
+        # thread, so every stage of a profiled task runs on it
+        if profiling.should_profile(request.profile):
+            background_tasks.add_task(run_task, task_id, True)
+        else:
+            background_tasks.add_task(run_task_async, task_id)
+        return {
+            "statusCode": 200,
+            "body": json.dumps({
+                "message": "Task accepted for background processing.",
+                "taskId": task_id
+            })
+        }
+
+    try:
+        queued = await get_task_queue().enqueue_async(task_id, profile=request.profile)
+    except Exception as e:
+        return {
+            "statusCode": 503,
+            "body": json.dumps({"error": f"Could not queue task: {e}", "taskId": task_id})
+        }
 
     return {
         "statusCode": 200,
         "body": json.dumps({
-            "message": "Task accepted for background processing.",
+            "message": "Task queued for processing." if queued else "Task is already queued.",
             "taskId": task_id
         })
     }
 
-def background_process(task_id: str):
-    start_time = time.time()
-    score = Score(task_id)
-
+@app.post("/webhook/job-match/batch")
+async def process_batch(request: JobMatchBatchRequest, background_tasks: BackgroundTasks):
+    task_ids = list(dict.fromkeys(request.taskIds))
+    logging.info(f"📥 Received batch job match request for {len(task_ids)} tasks")
+
+    if not TASK_QUEUE_ENABLED:
+        # One pipeline run for the whole batch, on the threadpool
+        background_tasks.add_task(run_batch, task_ids, request.profile)
+        return {
+            "statusCode": 200,
+            "body": json.dumps({
+                "message": "Tasks accepted for background processing.",
+                "taskIds": task_ids
+            })
+        }
+
+    # Workers started with WORKER_BATCH_SIZE > 1 claim queued tasks together
+    # and run them as one batch
+    queued, duplicates = [], []
     try:
-        logging.info(f"🚀 Starting background processing for task_id={task_id}")
-
-        if not score.is_valid_task():
-            logging.warning(f"⚠️ Task ID {task_id} does not exist. Skipping processing.")
-            return
-
-        if not process_resumes(task_id):
-            logging.error(f"❌ Resume processing failed for task_id={task_id}")
-            score.update_status("FAILED")
-            return
-
-        if not process_job_descriptions(task_id):
-            logging.error(f"❌ Job description processing failed for task_id={task_id}")
-            score.update_status("FAILED")
-            return
-
-        if not update_match_score(task_id):
-            logging.error(f"❌ Score update failed for task_id={task_id}")
-            score.update_status("FAILED")
-            return
-
-        score.update_status("SUCCESS")
-        elapsed = time.time() - start_time
-        logging.info(f"✅ Background processing completed in {elapsed:.2f} seconds for task_id={task_id}")
-
+        for task_id in task_ids:
+            if await get_task_queue().enqueue_async(task_id, profile=request.profile):
+                queued.append(task_id)
+            else:
+                duplicates.append(task_id)
     except Exception as e:
-        logging.exception(f"❌ Unhandled error during background processing for task_id={task_id}")
-        score.update_status("FAILED")
+        return {
+            "statusCode": 503,
+            "body": json.dumps({"error": f"Could not queue task: {e}", "queued": queued, "taskIds": task_ids})
+        }
 
-def process_resumes(task_id):
-    try:
-        processor = ResumeProcessor(task_id)
-        return processor.process()
-    except Exception as e:
-        logging.exception(f"❌ Resume processing failed for task_id={task_id}")
-        return False
-
-def process_job_descriptions(task_id):
-    try:
-        processor = JobDescriptionProcessor(task_id)
-        return processor.process()
-    except Exception as e:
-        logging.exception(f"❌ Job description processing failed for task_id={task_id}")
-        return False
+    return {
+        "statusCode": 200,
+        "body": json.dumps({
+            "message": f"{len(queued)} tasks queued for processing.",
+            "queued": queued,
+            "alreadyQueued": duplicates,
+        })
+    }
 
-def update_match_score(task_id):
-    try:
-        score = Score(task_id)
-        score.calculate_score()
-        score.update_status("SUCCESS")
-        return True
-    except Exception as e:
-        logging.exception(f"❌ Match score update failed for task_id={task_id}")
-        return False
+@app.get("/tasks/{task_id}/top-jobs")
+async def top_jobs(task_id: str, k: int = 20, mode: Literal["tfidf", "semantic"] = SCORE_MODE):
+    resume = await Score(task_id).get_resume_async()
+    if "error" in resume:
+        return {
+            "statusCode": 404,
+            "body": json.dumps({"error": resume["error"], "taskId": task_id})
+        }
+
+    # Building an index on first use reads every Job, so keep it off the loop too
+    if mode == "semantic":
+        vector = current_vector(resume.get("document_vector"), vector_model())
+        if vector is None:
+            return {
+                "statusCode": 409,
+                "body": json.dumps({"error": "Resume has no document vector from the current model", "taskId": task_id})
+            }
+        index = await aio.run_cpu(get_semantic_index)
+        matches = await aio.run_cpu(index.top_k, vector, k)
+    else:
+        index = await aio.run_cpu(get_job_index)
+        matches = await aio.run_cpu(index.top_k, resume.get("keywords") or [], k)
+    return {
+        "statusCode": 200,
+        "body": json.dumps({
+            "taskId": task_id,
+            "jobs": [{"jobId": job_id, "score": round(score, 4)} for job_id, score in matches]
+        })
+    }
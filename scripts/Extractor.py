@@ -1,16 +1,14 @@
 import re
 import urllib.request
 
-import spacy
-
 from .utils import TextCleaner
+from .utils import models
+from .utils.docvectors import document_vector
+from .utils.models import SPACY_MODEL, model_version
 
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+# Bump whenever cleaning or keyword extraction changes output, so cached
+# keywords produced by the old pipeline are no longer reused.
+EXTRACTION_PIPELINE_VERSION = "2"
 
 
 RESUME_SECTIONS = [
@@ -46,22 +44,76 @@ RESUME_SECTIONS = [
 ]
 
 
+def pipeline_version():
+    """
+    Returns a tag identifying the keyword extraction pipeline, including the
+    spaCy model name and version.
+    """
+    return "{}:{}-{}".format(
+        EXTRACTION_PIPELINE_VERSION, SPACY_MODEL, model_version()
+    )
+
+
 class DataExtractor:
     """
     A class for extracting various types of data from text.
     """
 
-    def __init__(self, raw_text: str):
+    def __init__(self, raw_text: str, doc=None, profile="keywords"):
         """
         Initialize the DataExtractor object.
 
+        The text is parsed exactly once; the resulting Doc is shared by the
+        cleaning step and every extraction method.
+
         Args:
             raw_text (str): The raw input text.
+            doc (spacy.tokens.Doc, optional): A Doc already parsed from
+                ``TextCleaner.remove_emails_links(raw_text)``, e.g. one
+                produced by ``nlp.pipe``.
+            profile (str | ExtractionProfile): The features this extractor
+                will serve; only their pipeline components are run.
         """
 
         self.text = raw_text
-        self.clean_text = TextCleaner.clean_text(self.text)
-        self.doc = nlp(self.clean_text)
+        self.profile = models.get_profile(profile)
+        if doc is None:
+            doc = models.parse(TextCleaner.remove_emails_links(self.text), self.profile)
+        self.doc = doc
+        if "clean_text" in self.profile.features:
+            self.clean_text = TextCleaner.clean_text(self.text, doc=self.doc)
+        else:
+            self.clean_text = self.doc.text
+
+    @staticmethod
+    def pipe_docs(raw_texts, batch_size: int = 64, n_process: int = 1, profile="keywords"):
+        """
+        Parse many texts with a single batched ``nlp.pipe`` run.
+
+        Args:
+            raw_texts (list): The raw input texts.
+            batch_size (int): Number of texts buffered per spaCy batch.
+            n_process (int): Number of processes spaCy parses with.
+            profile (str | ExtractionProfile): Features the Docs will serve.
+
+        Yields:
+            tuple: ``(raw_text, doc)`` pairs in input order, ready to be
+            passed to ``DataExtractor(raw_text, doc=doc)``.
+        """
+        raw_texts = list(raw_texts)
+        docs = models.pipe(
+            (TextCleaner.remove_emails_links(text) for text in raw_texts),
+            profile=profile,
+            batch_size=batch_size,
+            n_process=n_process,
+        )
+        yield from zip(raw_texts, docs)
+
+    def _require(self, feature):
+        if feature not in self.profile.features:
+            raise ValueError(
+                f"{feature} is not part of the '{self.profile.name}' extraction profile"
+            )
 
     def extract_links(self):
         """
@@ -121,6 +173,7 @@ class DataExtractor:
         Returns:
             list: A list of strings representing the names extracted from the text.
         """
+        self._require("extract_names")
         names = [ent.text for ent in self.doc.ents if ent.label_ == "PERSON"]
         return names
 
@@ -205,10 +258,22 @@ class DataExtractor:
         Returns:
             list: A list of extracted nouns.
         """
+        self._require("extract_particular_words")
         pos_tags = ["NOUN", "PROPN"]
         nouns = [token.text for token in self.doc if token.pos_ in pos_tags]
         return nouns
 
+    def extract_document_vector(self):
+        """
+        The L2-normalized vector of the parsed document, for semantic
+        matching.
+
+        Returns:
+            list | None: The vector, or None when the pipeline has no
+            vectors.
+        """
+        return document_vector(self.doc)
+
     def extract_entities(self):
         """
         Extract named entities of types 'GPE' (geopolitical entity) and 'ORG' (organization) from the given text.
@@ -219,6 +284,7 @@ class DataExtractor:
         Returns:
             list: A list of extracted entities.
         """
+        self._require("extract_entities")
         entity_labels = ["GPE", "ORG"]
         entities = [
             token.text for token in self.doc.ents if token.label_ in entity_labels
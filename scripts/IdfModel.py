@@ -0,0 +1,288 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+from sklearn.preprocessing import normalize
+
+from .utils.db import get_conn, put_conn
+from .utils.keywords import analyze, count_matrix, term_counts
+
+# Seconds a worker keeps its loaded model before re-reading it, so that
+# terms added by other workers are picked up eventually
+IDF_MODEL_MAX_AGE = float(os.getenv("IDF_MODEL_MAX_AGE", "300"))
+
+
+class IdfModel:
+    """
+    Corpus-level document frequencies over every keyworded Job, persisted in
+    the "IdfModel" and "IdfTerm" tables.
+
+    The version names the snapshot published by ``rebuild`` and changes
+    only then. Newly keyworded jobs are counted in incrementally under the
+    same version, so its frequencies drift as the corpus grows: job vectors
+    and scores recorded under one version are weighted by the frequencies
+    of when they were computed, and only agree exactly again after the
+    next rebuild.
+    """
+
+    def __init__(self, version=None, document_count=0, document_frequency=None, term_ids=None):
+        self.version = version
+        self.document_count = document_count
+        self.document_frequency = document_frequency or {}
+        self.term_ids = term_ids or {}
+        self.loaded_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._known_ids = None
+
+    @property
+    def is_empty(self) -> bool:
+        return self.version is None or self.document_count == 0
+
+    def idf(self, terms) -> np.ndarray:
+        """
+        Smoothed IDF of each term, as TfidfVectorizer would compute it had
+        it been fitted on the whole Job table. Unseen terms get the maximum.
+
+        Args:
+            terms (list): Analyzed terms.
+
+        Returns:
+            np.ndarray: One IDF value per term.
+        """
+        df = np.fromiter(
+            (self.document_frequency.get(term, 0) for term in terms),
+            dtype=np.float64,
+            count=len(terms),
+        )
+        return np.log((1 + self.document_count) / (1 + df)) + 1
+
+    def vectors(self, keyword_counts) -> list:
+        """
+        L2-normalized TF-IDF vector of each document under this model, with
+        the weights Score gives it.
+
+        Args:
+            keyword_counts (list): The keyword counts of each document.
+
+        Returns:
+            list: ``(terms, weights, norm)`` per document: its analyzed terms
+            in sorted order, their normalized weights and the L2 norm they
+            were divided by.
+        """
+        keyword_counts = list(keyword_counts)
+        try:
+            counts, terms = count_matrix(term_counts(keywords) for keywords in keyword_counts)
+        except ValueError:
+            return [(np.zeros(0, dtype=object), np.zeros(0), 0.0) for _ in keyword_counts]
+        weights = counts.multiply(self.idf(terms)[np.newaxis, :]).tocsr()
+        norms = np.sqrt(np.asarray(weights.power(2).sum(axis=1)).ravel())
+        weights = normalize(weights)
+        terms = np.asarray(terms, dtype=object)
+        return [
+            (terms[weights.indices[start:end]], weights.data[start:end], float(norm))
+            for start, end, norm in zip(weights.indptr[:-1], weights.indptr[1:], norms)
+        ]
+
+    def known_ids(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The ids of every term in this copy of the model, sorted.
+        """
+        with self._lock:
+            if self._known_ids is None or len(self._known_ids) != len(self.term_ids):
+                self._known_ids = np.sort(np.fromiter(self.term_ids.values(), dtype=np.int64))
+            return self._known_ids
+
+    @classmethod
+    def load(cls):
+        """
+        Read the persisted model. A missing or never-built model loads as an
+        empty one, which makes Score fall back to pairwise IDF.
+        """
+        conn = get_conn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT version, "documentCount" FROM public."IdfModel" WHERE id = 1
+                """)
+                row = cur.fetchone()
+                if not row:
+                    return cls()
+                cur.execute("""
+                    SELECT id, term, "documentFrequency" FROM public."IdfTerm"
+                """)
+                document_frequency = {}
+                term_ids = {}
+                for term_id, term, frequency in cur:
+                    term_ids[term] = term_id
+                    if frequency:
+                        document_frequency[term] = frequency
+            conn.commit()
+            return cls(row[0], row[1], document_frequency, term_ids)
+        except psycopg2.errors.UndefinedTable:
+            conn.rollback()
+            logging.warning("⚠️ IDF model tables missing; run python -m scripts.utils.schema")
+            return cls()
+        except Exception:
+            conn.rollback()
+            logging.exception("❌ Error loading IDF model")
+            return cls()
+        finally:
+            put_conn(conn)
+
+    def add_documents(self, keyword_lists) -> bool:
+        """
+        Incrementally count newly keyworded jobs into the persisted model and
+        into this in-memory copy. The model version is left unchanged, so
+        the vectors and scores already stored under it stay valid as
+        approximations instead of all going stale with every new job.
+
+        Args:
+            keyword_lists (list): The keyword counts (or keywords) of each
+                new job.
+
+        Returns:
+            bool: True when the increments were persisted.
+        """
+        keyword_lists = list(keyword_lists)
+        if self.version is None or not keyword_lists:
+            return False
+
+        increments = Counter()
+        for keywords in keyword_lists:
+            increments.update(term_counts(keywords).keys())
+
+        conn = get_conn()
+        try:
+            with conn.cursor() as cur:
+                rows = execute_values(cur, """
+                    INSERT INTO public."IdfTerm" (term, "documentFrequency")
+                    VALUES %s
+                    ON CONFLICT (term) DO UPDATE
+                    SET "documentFrequency" = "IdfTerm"."documentFrequency" + EXCLUDED."documentFrequency"
+                    RETURNING id, term, "documentFrequency"
+                """, sorted(increments.items()), fetch=True)
+                cur.execute("""
+                    UPDATE public."IdfModel"
+                    SET "documentCount" = "documentCount" + %s, "updatedAt" = now()
+                    WHERE id = 1
+                    RETURNING "documentCount"
+                """, (len(keyword_lists),))
+                (document_count,) = cur.fetchone()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logging.exception("❌ Error updating IDF model")
+            return False
+        finally:
+            put_conn(conn)
+
+        with self._lock:
+            for term_id, term, frequency in rows:
+                self.term_ids[term] = term_id
+                self.document_frequency[term] = frequency
+            self.document_count = document_count
+        return True
+
+    @classmethod
+    def rebuild(cls, chunk_size: int = 5000):
+        """
+        Recount document frequencies over the whole Job table and publish
+        them under a new version. Term ids are kept stable across rebuilds.
+
+        Args:
+            chunk_size (int): Rows fetched per round trip.
+
+        Returns:
+            IdfModel: The rebuilt model.
+        """
+        frequencies = Counter()
+        document_count = 0
+        version = datetime.now(timezone.utc).strftime("idf-%Y%m%dT%H%M%SZ")
+
+        conn = get_conn()
+        try:
+            with conn.cursor(name="idf_rebuild") as cur:
+                cur.itersize = chunk_size
+                cur.execute("""
+                    SELECT keywords FROM public."Job" WHERE keywords IS NOT NULL
+                """)
+                for (keywords,) in cur:
+                    frequencies.update(set(analyze(" ".join(keywords))))
+                    document_count += 1
+
+            with conn.cursor() as cur:
+                cur.execute('UPDATE public."IdfTerm" SET "documentFrequency" = 0')
+                execute_values(cur, """
+                    INSERT INTO public."IdfTerm" (term, "documentFrequency")
+                    VALUES %s
+                    ON CONFLICT (term) DO UPDATE
+                    SET "documentFrequency" = EXCLUDED."documentFrequency"
+                """, sorted(frequencies.items()), page_size=chunk_size)
+                cur.execute("""
+                    INSERT INTO public."IdfModel" (id, version, "documentCount", "updatedAt")
+                    VALUES (1, %s, %s, now())
+                    ON CONFLICT (id) DO UPDATE
+                    SET version = EXCLUDED.version,
+                        "documentCount" = EXCLUDED."documentCount",
+                        "updatedAt" = EXCLUDED."updatedAt"
+                """, (version, document_count))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            put_conn(conn)
+
+        logging.info(f"✅ Rebuilt IDF model {version}: {document_count} jobs, {len(frequencies)} terms")
+        model = cls.load()
+        _set_cached_model(model)
+        return model
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def _set_cached_model(model):
+    global _model
+    with _model_lock:
+        _model = model
+
+
+def get_idf_model(refresh: bool = False) -> IdfModel:
+    """
+    Returns the worker-wide IDF model, loading it on first use and again
+    once it is older than IDF_MODEL_MAX_AGE seconds.
+    """
+    global _model
+    with _model_lock:
+        stale = _model is not None and time.monotonic() - _model.loaded_at > IDF_MODEL_MAX_AGE
+        if _model is None or refresh or stale:
+            _model = IdfModel.load()
+        return _model
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Manage the corpus-level IDF model.")
+    parser.add_argument("command", choices=["info", "rebuild"])
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        from .JobVectors import rebuild_job_vectors
+
+        model = IdfModel.rebuild()
+        # Stored job vectors are weighted by the previous version
+        rebuild_job_vectors(model)
+    else:
+        model = IdfModel.load()
+    print(f"version={model.version} documents={model.document_count} terms={len(model.document_frequency)}")
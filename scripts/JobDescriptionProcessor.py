@@ -1,35 +1,209 @@
 import logging
-from bs4 import BeautifulSoup
+import os
+from .Extractor import pipeline_version
+from .IdfModel import get_idf_model
+from .JobIndex import update_job_index
+from .JobVectors import save_job_vectors
+from .SemanticIndex import update_semantic_index
 from .parsers import ParseJobDesc
-from .utils.db import get_conn, put_conn
+from .utils import aio, metrics
+from .utils.cache import KeywordCache, get_keyword_cache
+from .utils.db import BatchUpdate, get_conn, put_conn
+from .utils.docvectors import DOCUMENT_VECTORS_ENABLED, vector_model
+from .utils.fingerprint import keywords_hash
+from .utils.htmltext import html_to_text
+from .utils.keywords import save_values
+from .utils.procpool import get_process_pool, map_chunks
+
+# Batched spaCy settings, overridable per deployment
+JD_BATCH_SIZE = int(os.getenv("JD_BATCH_SIZE", "64"))
+JD_N_PROCESS = int(os.getenv("JD_N_PROCESS", "1"))
+
+PENDING_JOBS_QUERY = """
+    SELECT jd.id, jd."htmlDescription"
+    FROM public."TaskRequest" t
+    JOIN public."JobMatched" j ON j."taskRequestId" = t.id
+    JOIN public."Job" jd ON j."jobId" = jd.id
+    WHERE t.id = %s
+    AND jd.keywords IS NULL
+"""
 
 class JobDescriptionProcessor:
-    def __init__(self, task_id: int):
+    def __init__(self, task_id: int, batched: bool = True,
+                 batch_size: int = JD_BATCH_SIZE, n_process: int = JD_N_PROCESS, context=None, label=None):
         self.task_id = task_id
+        self.context = context
+        # How log lines name the work, e.g. for a batch of tasks that has no task_id
+        self.label = label or f"task_id={task_id}"
+        self.batched = batched
+        self.batch_size = batch_size
+        self.n_process = n_process
 
     def process(self) -> bool:
         try:
-            job_data = self.get_current_task_jobs()
+            job_data = self.context.pending_jobs() if self.context else self.get_current_task_jobs()
             if isinstance(job_data, dict) and "error" in job_data:
                 raise Exception(job_data["error"])
 
-            for job in job_data:
-                raw_description = self.read_html_description(job["description"])
-                parsed = ParseJobDesc(raw_description).get_JSON()
+            writer, saved_keywords, document_vectors = self.keyword_writer(job_data)
+            with metrics.timed("keyword_save"):
+                failures = writer.flush()
+            for job_id, error in failures.items():
+                logging.error(f"Failed to update keywords for job_id={job_id}: {error}")
+                saved_keywords.pop(job_id, None)
+                document_vectors.pop(job_id, None)
 
-                if "extracted_keywords" not in parsed:
-                    logging.warning(f"No keywords extracted for job_id={job['id']}")
-                    continue
+            vectors = self.publish_keywords(saved_keywords, document_vectors)
+            if self.context:
+                self.context.set_job_keywords(saved_keywords, vectors, document_vectors)
+            return True
+        except Exception as e:
+            logging.exception(f"❌ Error in JobDescriptionProcessor.process for {self.label}: {str(e)}")
+            return False
+
+    async def process_async(self) -> bool:
+        try:
+            job_data = self.context.pending_jobs() if self.context else await self.get_current_task_jobs_async()
+            if isinstance(job_data, dict) and "error" in job_data:
+                raise Exception(job_data["error"])
 
-                success = self.save_jd_keywords(job['id'], parsed['extracted_keywords'])
-                if success is not True:
-                    logging.error(f"Failed to update keywords for job_id={job['id']}: {success}")
+            writer, saved_keywords, document_vectors = await aio.run_cpu(self.keyword_writer, job_data)
+            with metrics.timed("keyword_save"):
+                failures = await writer.flush_async()
+            for job_id, error in failures.items():
+                logging.error(f"Failed to update keywords for job_id={job_id}: {error}")
+                saved_keywords.pop(job_id, None)
+                document_vectors.pop(job_id, None)
 
+            vectors = await aio.run_cpu(self.publish_keywords, saved_keywords, document_vectors)
+            if self.context:
+                self.context.set_job_keywords(saved_keywords, vectors, document_vectors)
             return True
         except Exception as e:
-            logging.exception(f"❌ Error in JobDescriptionProcessor.process for task_id={self.task_id}: {str(e)}")
+            logging.exception(f"❌ Error in JobDescriptionProcessor.process_async for {self.label}: {str(e)}")
             return False
 
+    def keyword_writer(self, job_data) -> tuple:
+        """
+        Parse the jobs and queue their keywords for one batched write, as the
+        distinct keywords and their counts, with the document vector when
+        document vectors are enabled. Their stored TF-IDF vectors, if any, no
+        longer match and are marked stale.
+
+        Returns:
+            tuple: The BatchUpdate, the keyword counts per job id and the
+            document vector per job id, as ``(vector model, components)``.
+        """
+        writer = BatchUpdate(
+            "Job", ["id"],
+            ["keywords", "keywordCounts", "keywordsHash", "vectorModelVersion", "documentVector", "documentVectorModel"],
+            casts={
+                "keywords": "text[]",
+                "keywordCounts": "integer[]",
+                "keywordsHash": "text",
+                "vectorModelVersion": "text",
+                "documentVector": "real[]",
+                "documentVectorModel": "text",
+            },
+        )
+        vectors_from = vector_model() if DOCUMENT_VECTORS_ENABLED else None
+        counts_by_job, document_vectors = {}, {}
+        for job, parsed in self.parse_jobs(job_data):
+            if "extracted_keywords" not in parsed:
+                logging.warning(f"No keywords extracted for job_id={job['id']}")
+                continue
+
+            if not isinstance(parsed['extracted_keywords'], list):
+                logging.error(f"Failed to update keywords for job_id={job['id']}: Keywords must be a list")
+                continue
+            distinct, counts, counts_by_job[job['id']] = save_values(parsed['extracted_keywords'])
+            vector = parsed.get("document_vector") if vectors_from else None
+            writer.add(job['id'], distinct, counts, keywords_hash(counts_by_job[job['id']]), None, vector, vectors_from)
+            if vectors_from:
+                document_vectors[job['id']] = (vectors_from, vector)
+        metrics.count_documents("job", len(writer))
+        return writer, counts_by_job, document_vectors
+
+    @staticmethod
+    def publish_keywords(saved_keywords: dict, document_vectors=None) -> dict:
+        """
+        Count newly keyworded jobs into the corpus IDF model and the job
+        index, and store their vectors under the model. Their document
+        vectors join the semantic index.
+
+        Returns:
+            dict: The stored TF-IDF vectors per job id.
+        """
+        model = get_idf_model()
+        vectors = save_job_vectors(saved_keywords, model) if model.add_documents(saved_keywords.values()) else {}
+        update_job_index(saved_keywords.items())
+        update_semantic_index(document_vectors or {})
+        return vectors
+
+    def parse_jobs(self, job_data):
+        """
+        Yields (job, parsed JSON) pairs in job order. Descriptions already in
+        the keyword cache are not parsed at all, and identical descriptions
+        within the task are parsed once.
+        """
+        cache = get_keyword_cache()
+        version = pipeline_version()
+        keys = [KeywordCache.make_key(job["description"], version) for job in job_data]
+        cached = cache.get_many(set(keys)) if cache else {}
+        # Entries are keyword lists, or parsed JSON when they carry a
+        # document vector; without one they are parsed again
+        cached = {
+            key: entry if isinstance(entry, dict) else {"extracted_keywords": entry}
+            for key, entry in cached.items()
+            if isinstance(entry, dict) or not DOCUMENT_VECTORS_ENABLED
+        }
+
+        pending = {}
+        for key, job in zip(keys, job_data):
+            if key not in cached:
+                pending.setdefault(key, job["description"])
+        if cached:
+            logging.info(f"♻️ Keyword cache hits: {len(job_data) - len(pending)}/{len(job_data)} for {self.label}")
+
+        parsed_by_key = dict(zip(pending, self.parse_descriptions(pending.values())))
+        if cache:
+            cache.put_many({
+                key: self.cache_entry(parsed)
+                for key, parsed in parsed_by_key.items()
+                if "extracted_keywords" in parsed
+            }, version)
+
+        for key, job in zip(keys, job_data):
+            if key in cached:
+                yield job, cached[key]
+            else:
+                yield job, parsed_by_key[key]
+
+    @staticmethod
+    def cache_entry(parsed: dict):
+        if not DOCUMENT_VECTORS_ENABLED:
+            return parsed["extracted_keywords"]
+        return {key: parsed.get(key) for key in ("extracted_keywords", "document_vector")}
+
+    def parse_descriptions(self, html_descriptions):
+        """
+        Yields the parsed JSON of each HTML description, in order. In batched
+        mode every description is streamed through one nlp.pipe run.
+        """
+        if not self.batched:
+            for html_description in html_descriptions:
+                raw_description = self.read_html_description(html_description)
+                yield ParseJobDesc(raw_description).get_JSON()
+            return
+
+        pool = get_process_pool()
+        if pool is not None:
+            # One batch per pre-forked worker call
+            yield from map_chunks(parse_html_descriptions, html_descriptions, self.batch_size, pool)
+            return
+
+        yield from parse_html_descriptions(html_descriptions, self.batch_size, self.n_process)
+
     def save_jd_keywords(self, job_id, keywords):
         conn = get_conn()
         try:
@@ -37,11 +211,13 @@ class JobDescriptionProcessor:
             if not isinstance(keywords, list):
                 raise ValueError("Keywords must be a list")
 
+            distinct, counts, count_map = save_values(keywords)
             cur.execute("""
                 UPDATE public."Job"
-                SET keywords = %s
+                SET keywords = %s, "keywordCounts" = %s, "keywordsHash" = %s, "vectorModelVersion" = NULL,
+                    "documentVector" = NULL, "documentVectorModel" = NULL
                 WHERE id = %s
-            """, (keywords, job_id))
+            """, (distinct, counts, keywords_hash(count_map), job_id))
             conn.commit()
             cur.close()
             return True
@@ -55,32 +231,48 @@ class JobDescriptionProcessor:
         conn = get_conn()
         try:
             cur = conn.cursor()
-            cur.execute("""
-                SELECT jd.id, jd."htmlDescription"
-                FROM public."TaskRequest" t
-                JOIN public."JobMatched" j ON j."taskRequestId" = t.id
-                JOIN public."Job" jd ON j."jobId" = jd.id
-                WHERE t.id = %s
-                AND jd.keywords IS NULL
-            """, (self.task_id,))
+            cur.execute(PENDING_JOBS_QUERY, (self.task_id,))
             rows = cur.fetchall()
             cur.close()
             put_conn(conn)
 
             if not rows:
-                logging.info(f"No jobs without keywords for task_id={self.task_id}")
+                logging.info(f"No jobs without keywords for {self.label}")
                 return []
 
             return [{"id": row[0], "description": row[1]} for row in rows]
         except Exception as e:
-            logging.exception(f"❌ Error fetching jobs for task_id={self.task_id}")
+            logging.exception(f"❌ Error fetching jobs for {self.label}")
             put_conn(conn)
             return {"error": str(e)}
 
-    def read_html_description(self, html_content: str) -> str:
+    async def get_current_task_jobs_async(self):
+        try:
+            rows = await aio.fetchall(PENDING_JOBS_QUERY, (self.task_id,))
+            if not rows:
+                logging.info(f"No jobs without keywords for {self.label}")
+                return []
+
+            return [{"id": row[0], "description": row[1]} for row in rows]
+        except Exception as e:
+            logging.exception(f"❌ Error fetching jobs for {self.label}")
+            return {"error": str(e)}
+
+    @staticmethod
+    def read_html_description(html_content: str) -> str:
         try:
-            soup = BeautifulSoup(html_content, "html.parser")
-            return soup.get_text(separator=" ", strip=True)
+            with metrics.timed("html_to_text"):
+                return html_to_text(html_content)
         except Exception as e:
             logging.exception("❌ Error parsing HTML content in job description")
             return ""
+
+
+def parse_html_descriptions(html_descriptions, batch_size: int = JD_BATCH_SIZE, n_process: int = 1) -> list:
+    """
+    Parse HTML descriptions with one nlp.pipe run and return their JSON, in
+    order. Module-level so chunks can be dispatched to the process pool.
+    """
+    descriptions = [JobDescriptionProcessor.read_html_description(html) for html in html_descriptions]
+    parsed_jobs = ParseJobDesc.pipe(descriptions, batch_size=batch_size, n_process=n_process)
+    return [parsed.get_JSON() for parsed in parsed_jobs]
@@ -0,0 +1,355 @@
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from .utils.db import get_conn, put_conn
+from .utils.keywords import keyword_counts, term_counts
+
+# Queries with more distinct terms than this are answered exhaustively: with
+# resume-length queries the MaxScore bounds prune too little to pay for
+# themselves (see benchmarks/bench_retrieval.py)
+JOB_INDEX_PRUNE_MAX_TERMS = int(os.getenv("JOB_INDEX_PRUNE_MAX_TERMS", "32"))
+# Seconds the API keeps its index before rebuilding it from the Job table.
+# Jobs are keyworded in worker processes, whose updates never reach the
+# API's index, so this bounds how long new jobs stay invisible to it
+JOB_INDEX_MAX_AGE = float(os.getenv("JOB_INDEX_MAX_AGE", "300"))
+
+
+class _Postings:
+    """
+    Posting list of one term: job numbers in ascending order with their
+    weights, plus appends not yet merged into the arrays.
+    """
+
+    __slots__ = ("docs", "weights", "pending_docs", "pending_weights", "max_weight")
+
+    def __init__(self):
+        self.docs = np.zeros(0, dtype=np.int32)
+        self.weights = np.zeros(0, dtype=np.float32)
+        self.pending_docs = []
+        self.pending_weights = []
+        self.max_weight = 0.0
+
+    def append(self, doc, weight):
+        self.pending_docs.append(doc)
+        self.pending_weights.append(weight)
+        self.max_weight = max(self.max_weight, weight)
+
+    def merge(self, alive=None):
+        if self.pending_docs:
+            # New job numbers are always larger, so order is preserved
+            self.docs = np.concatenate([self.docs, np.asarray(self.pending_docs, dtype=np.int32)])
+            self.weights = np.concatenate([self.weights, np.asarray(self.pending_weights, dtype=np.float32)])
+            self.pending_docs = []
+            self.pending_weights = []
+        if alive is not None and len(self.docs):
+            keep = alive[self.docs]
+            if not keep.all():
+                self.docs = self.docs[keep]
+                self.weights = self.weights[keep]
+                self.max_weight = float(self.weights.max()) if len(self.weights) else 0.0
+
+
+class JobIndex:
+    """
+    In-process inverted index from keyword to the jobs containing it, with
+    L2-normalized TF-IDF weights, answering top-k cosine queries with a
+    MaxScore-style pruned search.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.document_frequency = Counter()
+        self.job_ids = []
+        self.job_numbers = {}
+        self.alive = np.zeros(0, dtype=bool)
+        self.deleted = 0
+        self._dirty = set()
+        self._lock = threading.RLock()
+        # Jobs keyworded after this are only indexed if added in-process
+        self.built_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.job_numbers)
+
+    def idf(self, term) -> float:
+        return math.log((1 + len(self)) / (1 + self.document_frequency.get(term, 0))) + 1
+
+    def _weights(self, keywords) -> dict:
+        counts = term_counts(keywords)
+        weights = {term: count * self.idf(term) for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        if norm == 0:
+            return {}
+        return {term: weight / norm for term, weight in weights.items()}
+
+    def add_documents(self, documents):
+        """
+        Index jobs, replacing any earlier postings of the same job ids.
+
+        Document frequencies are updated before weights are computed, so a
+        bulk build weights every job against the full corpus. Jobs added
+        later are weighted against the corpus as it was at that time.
+
+        Args:
+            documents (iterable): (job_id, keyword counts) pairs; plain
+                keyword lists are accepted too.
+        """
+        documents = [(job_id, keywords or {}) for job_id, keywords in documents]
+        with self._lock:
+            for job_id, _ in documents:
+                self._remove(job_id)
+            for _, keywords in documents:
+                self.document_frequency.update(term_counts(keywords).keys())
+
+            start = len(self.job_ids)
+            self.alive = np.concatenate([self.alive, np.ones(len(documents), dtype=bool)])
+            # Number every job before weighting any, so the IDF sees the
+            # final corpus size as well as the final document frequencies
+            for offset, (job_id, _) in enumerate(documents):
+                self.job_ids.append(job_id)
+                self.job_numbers[job_id] = start + offset
+            for offset, (_, keywords) in enumerate(documents):
+                number = start + offset
+                for term, weight in self._weights(keywords).items():
+                    postings = self.postings.get(term)
+                    if postings is None:
+                        postings = self.postings[term] = _Postings()
+                    postings.append(number, weight)
+                    self._dirty.add(term)
+
+    def _remove(self, job_id):
+        number = self.job_numbers.pop(job_id, None)
+        if number is None:
+            return
+        self.alive[number] = False
+        self.deleted += 1
+
+    def _merge(self):
+        if self.deleted:
+            # Drop postings of replaced jobs from every list once
+            for postings in self.postings.values():
+                postings.merge(self.alive)
+            self.deleted = 0
+        else:
+            for term in self._dirty:
+                self.postings[term].merge()
+        self._dirty.clear()
+
+    def _query_terms(self, keywords):
+        weights = self._weights(keywords)
+        terms = [term for term in weights if term in self.postings]
+        query = np.array([weights[term] for term in terms], dtype=np.float32)
+        upper = np.array([self.postings[term].max_weight for term in terms], dtype=np.float32) * query
+        order = np.argsort(-upper, kind="stable")
+        return [terms[i] for i in order], query[order], upper[order]
+
+    def top_k(self, keywords, k: int = 20) -> list:
+        """
+        Return the k jobs with the highest cosine similarity to the keywords,
+        using the pruned search for queries of up to
+        JOB_INDEX_PRUNE_MAX_TERMS distinct terms.
+
+        Args:
+            keywords (list): Query keywords, e.g. a resume's.
+            k (int): Number of jobs to return.
+
+        Returns:
+            list: (job_id, score) pairs, best first.
+        """
+        with self._lock:
+            self._merge()
+            query_terms = self._query_terms(keywords)
+            if len(query_terms[0]) <= JOB_INDEX_PRUNE_MAX_TERMS:
+                return self._pruned_top_k(query_terms, k)
+            return self._exhaustive_top_k(query_terms, k)
+
+    def pruned_top_k(self, keywords, k: int = 20) -> list:
+        """
+        Top-k with a MaxScore-style pruned search.
+
+        Terms are processed by decreasing score upper bound. Full posting
+        lists are accumulated only while an unseen job could still enter the
+        top k; afterwards the remaining lists are probed just for surviving
+        candidates, which are pruned as their upper bound falls below the
+        current k-th score.
+
+        Args:
+            keywords (list): Query keywords, e.g. a resume's.
+            k (int): Number of jobs to return.
+
+        Returns:
+            list: (job_id, score) pairs, best first.
+        """
+        with self._lock:
+            self._merge()
+            return self._pruned_top_k(self._query_terms(keywords), k)
+
+    def _pruned_top_k(self, query_terms, k):
+        terms, query, upper = query_terms
+        if not terms or k <= 0:
+            return []
+
+        remaining = np.concatenate([np.cumsum(upper[::-1])[::-1][1:], [0.0]])
+        total = float(upper.sum())
+        accumulator = np.zeros(len(self.job_ids), dtype=np.float32)
+
+        threshold = 0.0
+        next_check = total
+        position = 0
+        for position, term in enumerate(terms):
+            postings = self.postings[term]
+            accumulator[postings.docs] += query[position] * postings.weights
+            # No job can have scored more than the bounds seen so far, so
+            # skip the k-th score selection while that cannot end phase one,
+            # and re-check only once the remaining bound has shrunk by 10%
+            if total - remaining[position] <= remaining[position] or remaining[position] > next_check:
+                continue
+            next_check = remaining[position] * 0.9
+            # Scores only grow, so the k-th best among the jobs touched by
+            # this term is a safe lower bound of the final k-th score
+            threshold = max(threshold, self._kth_score(accumulator[postings.docs], k))
+            if threshold > remaining[position]:
+                break
+        else:
+            return self._ranked(np.flatnonzero(accumulator), accumulator, k)
+
+        candidates = np.flatnonzero(accumulator + remaining[position] >= threshold)
+        scores = accumulator[candidates]
+        # Reused as a dense weight lookup for lists that are cheaper to
+        # scan than to binary-search once per candidate
+        accumulator[:] = 0
+        for position in range(position + 1, len(terms)):
+            postings = self.postings[terms[position]]
+            size = len(postings.docs)
+            if len(candidates) == 0 or size == 0:
+                continue
+            if len(candidates) * math.log2(size + 1) < 2 * size:
+                found = np.searchsorted(postings.docs, candidates)
+                found = np.minimum(found, size - 1)
+                hit = postings.docs[found] == candidates
+                scores[hit] += query[position] * postings.weights[found[hit]]
+            else:
+                accumulator[postings.docs] = postings.weights
+                scores += query[position] * accumulator[candidates]
+                accumulator[postings.docs] = 0
+
+            threshold = max(threshold, self._kth_score(scores, k))
+            keep = scores + remaining[position] >= threshold
+            candidates, scores = candidates[keep], scores[keep]
+
+        accumulator[candidates] = scores
+        return self._ranked(candidates, accumulator, k)
+
+    @staticmethod
+    def _kth_score(scores, k) -> float:
+        if len(scores) < k:
+            return 0.0
+        return float(np.partition(scores, len(scores) - k)[len(scores) - k])
+
+    def _ranked(self, candidates, scores, k) -> list:
+        candidates = candidates[scores[candidates] > 0]
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.job_ids[number], float(scores[number])) for number in candidates]
+
+    def exhaustive_top_k(self, keywords, k: int = 20) -> list:
+        """
+        Top-k over every posting of every query term.
+        """
+        with self._lock:
+            self._merge()
+            return self._exhaustive_top_k(self._query_terms(keywords), k)
+
+    def _exhaustive_top_k(self, query_terms, k):
+        terms, query, _ = query_terms
+        if not terms or k <= 0:
+            return []
+        accumulator = np.zeros(len(self.job_ids), dtype=np.float32)
+        for weight, term in zip(query, terms):
+            postings = self.postings[term]
+            accumulator[postings.docs] += weight * postings.weights
+        return self._ranked(np.flatnonzero(accumulator), accumulator, k)
+
+    @classmethod
+    def build_from_db(cls, chunk_size: int = 5000):
+        """
+        Build an index over every Job with keywords.
+
+        Args:
+            chunk_size (int): Rows fetched per round trip.
+
+        Returns:
+            JobIndex: The populated index.
+        """
+        index = cls()
+        conn = get_conn()
+        try:
+            with conn.cursor(name="job_index_build") as cur:
+                cur.itersize = chunk_size
+                cur.execute("""
+                    SELECT id, "keywordCounts", keywords FROM public."Job" WHERE keywords IS NOT NULL
+                """)
+                documents = [(job_id, keyword_counts(counts, keywords)) for job_id, counts, keywords in cur]
+            conn.commit()
+        finally:
+            put_conn(conn)
+        index.add_documents(documents)
+        logging.info(f"✅ Built job index: {len(index)} jobs, {len(index.postings)} terms")
+        return index
+
+
+_index = None
+_index_lock = threading.Lock()
+_rebuilding = False
+
+
+def get_job_index() -> JobIndex:
+    """
+    Returns the process-wide job index, building it on first use. Once it
+    is older than JOB_INDEX_MAX_AGE seconds it is rebuilt in the
+    background; the current index keeps answering until the new one
+    replaces it.
+    """
+    global _index, _rebuilding
+    with _index_lock:
+        if _index is None:
+            _index = JobIndex.build_from_db()
+        elif not _rebuilding and time.monotonic() - _index.built_at > JOB_INDEX_MAX_AGE:
+            _rebuilding = True
+            threading.Thread(target=_rebuild_job_index, name="job-index-rebuild", daemon=True).start()
+        return _index
+
+
+def _rebuild_job_index():
+    global _index, _rebuilding
+    try:
+        index = JobIndex.build_from_db()
+        with _index_lock:
+            _index = index
+    except Exception:
+        logging.exception("❌ Error rebuilding the job index; keeping the current one")
+        with _index_lock:
+            # Wait a full period before trying again
+            _index.built_at = time.monotonic()
+    finally:
+        _rebuilding = False
+
+
+def update_job_index(documents):
+    """
+    Add newly keyworded jobs to the process-wide index if this process has
+    built one, i.e. the API running tasks itself. Indexes in other processes
+    see the jobs once they are rebuilt.
+
+    Args:
+        documents (iterable): (job_id, keyword counts) pairs.
+    """
+    if _index is not None:
+        _index.add_documents(documents)
@@ -0,0 +1,155 @@
+import logging
+import time
+
+import numpy as np
+
+from .IdfModel import get_idf_model
+from .utils.db import DB_STREAM_CHUNK_SIZE, BatchUpdate, get_conn, put_conn, stream_rows
+from .utils.keywords import keyword_counts
+
+JOB_VECTORS_QUERY = """
+    SELECT id, "keywordCounts", keywords FROM public."Job"
+    WHERE keywords IS NOT NULL
+"""
+
+STALE_JOB_VECTORS_QUERY = JOB_VECTORS_QUERY + """
+    AND "vectorModelVersion" IS DISTINCT FROM %s
+"""
+
+JOB_VECTORS_INFO_QUERY = """
+    SELECT count(*),
+           count(*) FILTER (WHERE "vectorModelVersion" = %s),
+           count(*) FILTER (WHERE "vectorModelVersion" IS NULL)
+    FROM public."Job"
+    WHERE keywords IS NOT NULL
+"""
+
+
+def job_vectors(counts_by_job: dict, model=None) -> dict:
+    """
+    Corpus TF-IDF vectors of jobs, as stored in the Job "vector*" columns:
+    IdfTerm ids, L2-normalized weights and the norm. A job with a term the
+    model has no id for gets no vector and is scored from its keywords.
+
+    Args:
+        counts_by_job (dict): Keyword counts per job id.
+        model (IdfModel, optional): Defaults to the worker's model.
+
+    Returns:
+        dict: ``(term ids, weights, norm)`` per job id; empty while the
+        model has not been built.
+    """
+    model = model or get_idf_model()
+    if model.is_empty or not counts_by_job:
+        return {}
+
+    job_ids = list(counts_by_job)
+    vectors = {}
+    for job_id, (terms, weights, norm) in zip(job_ids, model.vectors(counts_by_job[job_id] for job_id in job_ids)):
+        term_ids = [model.term_ids.get(term) for term in terms]
+        if None in term_ids:
+            continue
+        vectors[job_id] = (np.asarray(term_ids, dtype=np.int64), weights, norm)
+    return vectors
+
+
+def vector_writer() -> BatchUpdate:
+    return BatchUpdate(
+        "Job", ["id"], ["vectorTermIds", "vectorWeights", "vectorNorm", "vectorModelVersion"],
+        casts={
+            "vectorTermIds": "integer[]",
+            "vectorWeights": "double precision[]",
+            "vectorNorm": "double precision",
+            "vectorModelVersion": "text",
+        },
+    )
+
+
+def save_job_vectors(counts_by_job: dict, model=None) -> dict:
+    """
+    Compute and store the vectors of newly keyworded jobs.
+
+    Returns:
+        dict: The stored vectors per job id, as Score reads them:
+        ``(model version, term ids, weights)``.
+    """
+    model = model or get_idf_model()
+    vectors = job_vectors(counts_by_job, model)
+    writer = vector_writer()
+    for job_id, (term_ids, weights, norm) in vectors.items():
+        writer.add(job_id, term_ids.tolist(), weights.tolist(), norm, model.version)
+    for job_id, error in writer.flush().items():
+        logging.error(f"❌ Failed to store the vector of job_id={job_id}: {error}")
+        vectors.pop(job_id, None)
+    return {
+        job_id: (model.version, term_ids, weights)
+        for job_id, (term_ids, weights, _) in vectors.items()
+    }
+
+
+def rebuild_job_vectors(model=None, stale_only: bool = False, chunk_size: int = DB_STREAM_CHUNK_SIZE) -> int:
+    """
+    Recompute the stored vectors of every keyworded job under the current
+    IDF model, e.g. after the model was rebuilt or the weighting changed.
+    Jobs are read through a server-side cursor and written chunk by chunk.
+
+    Args:
+        model (IdfModel, optional): Defaults to the freshly loaded model.
+        stale_only (bool): Only jobs without a vector for the model version.
+        chunk_size (int): Jobs read and written per round trip.
+
+    Returns:
+        int: Number of vectors written.
+    """
+    model = model or get_idf_model(refresh=True)
+    if model.is_empty:
+        logging.warning("⚠️ IDF model has not been built; run python -m scripts.IdfModel rebuild")
+        return 0
+
+    start = time.perf_counter()
+    query, params = (STALE_JOB_VECTORS_QUERY, (model.version,)) if stale_only else (JOB_VECTORS_QUERY, None)
+    written = 0
+    for rows in stream_rows(query, params, chunk_size):
+        counts_by_job = {job_id: keyword_counts(counts, keywords) for job_id, counts, keywords in rows}
+        written += len(save_job_vectors(counts_by_job, model))
+    logging.info(
+        f"✅ Rebuilt {written} job vectors for IDF model {model.version} "
+        f"in {time.perf_counter() - start:.2f} seconds"
+    )
+    return written
+
+
+def vector_stats(model=None) -> dict:
+    model = model or get_idf_model(refresh=True)
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(JOB_VECTORS_INFO_QUERY, (model.version,))
+            keyworded, current, missing = cur.fetchone()
+        conn.commit()
+    finally:
+        put_conn(conn)
+    return {
+        "modelVersion": model.version,
+        "keywordedJobs": keyworded,
+        "current": current,
+        "stale": keyworded - current - missing,
+        "missing": missing,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Manage the precomputed job vectors.")
+    parser.add_argument("command", choices=["info", "rebuild"])
+    parser.add_argument("--stale-only", action="store_true",
+                        help="only jobs without a vector for the current model version")
+    parser.add_argument("--chunk-size", type=int, default=DB_STREAM_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        rebuild_job_vectors(stale_only=args.stale_only, chunk_size=args.chunk_size)
+    print(json.dumps(vector_stats(), indent=2))
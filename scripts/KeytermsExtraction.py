@@ -1,6 +1,8 @@
 import textacy
 from textacy import extract
 
+from .utils.models import get_nlp
+
 
 class KeytermExtractor:
     """
@@ -16,7 +18,7 @@ class KeytermExtractor:
             top_n_values (int): The number of top keyterms to extract.
         """
         self.raw_text = raw_text
-        self.text_doc = textacy.make_spacy_doc(self.raw_text, lang="en_core_web_md")
+        self.text_doc = textacy.make_spacy_doc(self.raw_text, lang=get_nlp())
         self.top_n_values = top_n_values
 
     def get_keyterms_based_on_textrank(self):
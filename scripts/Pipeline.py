@@ -0,0 +1,283 @@
+import contextlib
+import logging
+import time
+
+from .JobDescriptionProcessor import JobDescriptionProcessor
+from .ResumeProcessor import ResumeProcessor
+from .Score import Score
+from .TaskContext import TaskBatch, TaskContext
+from .utils import metrics, profiling
+from .utils.db import track_round_trips
+
+
+def run_task(task_id: str, profile: bool = False, final_attempt: bool = True) -> bool:
+    """
+    Run every stage of a job match task: resume keywords, job description
+    keywords, then match scores. The task's data is loaded once into a
+    TaskContext that every stage reads from.
+
+    Args:
+        task_id (str): The TaskRequest to process.
+        profile (bool): Run under the profiler and dump the result to
+            PROFILE_DIR; a share of tasks is also profiled when
+            PROFILE_SAMPLE_RATE is set.
+        final_attempt (bool): False when the caller retries a failed task;
+            its "matchStatus" is then left as it is instead of set to FAILED.
+
+    Returns:
+        bool: False when the task failed and is worth retrying; True when it
+            succeeded or can never succeed (e.g. it does not exist).
+    """
+    start_time = time.time()
+    score = Score(task_id)
+    outcome = "failed"
+
+    def mark_failed():
+        # A task the queue will run again stays IN_PROGRESS until its last attempt
+        if final_attempt:
+            score.update_status("FAILED")
+
+    with profiling.profiled(f"task-{task_id}", profile), track_round_trips() as round_trips, metrics.in_flight():
+        try:
+            logging.info(f"🚀 Starting processing for task_id={task_id}")
+
+            context = TaskContext.load(task_id)
+            if context is None:
+                logging.warning(f"⚠️ Task ID {task_id} does not exist. Skipping processing.")
+                outcome = "skipped"
+                return True
+
+            if not process_resumes(task_id, context):
+                logging.error(f"❌ Resume processing failed for task_id={task_id}")
+                mark_failed()
+                return False
+
+            if context.streamed:
+                if not process_job_chunks(task_id, context):
+                    mark_failed()
+                    return False
+
+            elif not process_job_descriptions(task_id, context):
+                logging.error(f"❌ Job description processing failed for task_id={task_id}")
+                mark_failed()
+                return False
+
+            elif not update_match_score(task_id, context):
+                logging.error(f"❌ Score update failed for task_id={task_id}")
+                mark_failed()
+                return False
+
+            score.update_status("SUCCESS")
+            elapsed = time.time() - start_time
+            logging.info(f"✅ Processing completed in {elapsed:.2f} seconds for task_id={task_id}")
+            outcome = "success"
+            return True
+
+        except Exception:
+            logging.exception(f"❌ Unhandled error during processing for task_id={task_id}")
+            mark_failed()
+            return False
+
+        finally:
+            metrics.count_task(outcome)
+            logging.info(f"📊 {round_trips.count} DB round trips for task_id={task_id}")
+
+
+async def run_task_async(task_id: str) -> bool:
+    """
+    Async counterpart of ``run_task``: queries go through the async pool and
+    parsing and scoring run on the CPU executor.
+    """
+    start_time = time.time()
+    score = Score(task_id)
+    outcome = "failed"
+
+    with track_round_trips() as round_trips, metrics.in_flight():
+        try:
+            logging.info(f"🚀 Starting processing for task_id={task_id}")
+
+            context = await TaskContext.load_async(task_id)
+            if context is None:
+                logging.warning(f"⚠️ Task ID {task_id} does not exist. Skipping processing.")
+                outcome = "skipped"
+                return True
+
+            if not await ResumeProcessor(task_id, context=context).process_async():
+                logging.error(f"❌ Resume processing failed for task_id={task_id}")
+                await score.update_status_async("FAILED")
+                return False
+
+            if context.streamed:
+                if not await process_job_chunks_async(task_id, context):
+                    await score.update_status_async("FAILED")
+                    return False
+
+            elif not await JobDescriptionProcessor(task_id, context=context).process_async():
+                logging.error(f"❌ Job description processing failed for task_id={task_id}")
+                await score.update_status_async("FAILED")
+                return False
+
+            elif not await Score(task_id, context=context).calculate_score_async():
+                logging.error(f"❌ Score update failed for task_id={task_id}")
+                await score.update_status_async("FAILED")
+                return False
+
+            await score.update_status_async("SUCCESS")
+            elapsed = time.time() - start_time
+            logging.info(f"✅ Processing completed in {elapsed:.2f} seconds for task_id={task_id}")
+            outcome = "success"
+            return True
+
+        except Exception:
+            logging.exception(f"❌ Unhandled error during processing for task_id={task_id}")
+            await score.update_status_async("FAILED")
+            return False
+
+        finally:
+            metrics.count_task(outcome)
+            logging.info(f"📊 {round_trips.count} DB round trips for task_id={task_id}")
+
+
+def run_batch(task_ids, profile: bool = False, retried=()) -> dict:
+    """
+    Run many job match tasks as one pipeline pass. Their data is loaded
+    together, every distinct resume and job is parsed at most once, all
+    their (resume, job) pairs are scored in one vectorized pass, and each
+    task still gets its own "matchStatus".
+
+    Args:
+        task_ids (list): The TaskRequests to process.
+        profile (bool): Profile the whole batch, as ``run_task`` does.
+        retried (collection): task_ids the caller runs again if they fail;
+            their "matchStatus" is not set to FAILED.
+
+    Returns:
+        dict: ``run_task``'s result per task_id.
+    """
+    start_time = time.time()
+    task_ids = list(dict.fromkeys(task_ids))
+    results = {task_id: True for task_id in task_ids}
+    contexts = {}
+
+    with profiling.profiled(f"batch-{len(task_ids)}", profile), track_round_trips() as round_trips, \
+            metrics.in_flight(len(task_ids)):
+        try:
+            logging.info(f"🚀 Starting batch processing for {len(task_ids)} tasks")
+
+            contexts = TaskContext.load_many(task_ids)
+            for task_id in task_ids:
+                if task_id not in contexts:
+                    logging.warning(f"⚠️ Task ID {task_id} does not exist. Skipping processing.")
+
+            for task_id, succeeded in ResumeProcessor.process_many(contexts.values()).items():
+                if not succeeded:
+                    logging.error(f"❌ Resume processing failed for task_id={task_id}")
+                    results[task_id] = False
+
+            batch = TaskBatch(
+                context for context in contexts.values() if results[context.task_id] and not context.streamed
+            )
+            if not JobDescriptionProcessor(None, context=batch, label=batch.label).process():
+                logging.error(f"❌ Job description processing failed for {batch.label}")
+                results.update({context.task_id: False for context in batch.contexts})
+            else:
+                for task_id in Score(None, label=batch.label).calculate_batch_score(batch.contexts):
+                    logging.error(f"❌ Score update failed for task_id={task_id}")
+                    results[task_id] = False
+
+            # Tasks too large to hold in memory run one after another
+            for context in contexts.values():
+                if context.streamed and results[context.task_id]:
+                    results[context.task_id] = process_job_chunks(context.task_id, context)
+
+            elapsed = time.time() - start_time
+            logging.info(f"✅ Batch of {len(task_ids)} tasks completed in {elapsed:.2f} seconds")
+
+        except Exception:
+            logging.exception(f"❌ Unhandled error during batch processing of {len(task_ids)} tasks")
+            results.update({task_id: False for task_id in contexts})
+
+        finally:
+            Score.update_statuses({
+                task_id: "SUCCESS" if results[task_id] else "FAILED"
+                for task_id in contexts
+                if results[task_id] or task_id not in retried
+            })
+            for task_id in task_ids:
+                metrics.count_task(
+                    "skipped" if task_id not in contexts else "success" if results[task_id] else "failed"
+                )
+            logging.info(f"📊 {round_trips.count} DB round trips for {len(task_ids)} tasks")
+
+    return results
+
+
+def process_job_chunks(task_id, context) -> bool:
+    """
+    Run the job description and score stages of a streamed task one chunk
+    of jobs at a time: each chunk is parsed, its keywords written, and its
+    scores written before the next chunk is read, so memory stays bounded
+    by the chunk size and the first scores land early.
+    """
+    chunks = 0
+    try:
+        with contextlib.closing(context.job_chunks()) as job_chunks:
+            for chunk in job_chunks:
+                chunks += 1
+                if not JobDescriptionProcessor(task_id, context=chunk).process():
+                    logging.error(f"❌ Job description processing failed for task_id={task_id} in chunk {chunks}")
+                    return False
+                if not Score(task_id, context=chunk).calculate_score():
+                    logging.error(f"❌ Score update failed for task_id={task_id} in chunk {chunks}")
+                    return False
+        logging.info(f"🌊 Streamed {context.job_count} jobs in {chunks} chunks for task_id={task_id}")
+        return True
+    except Exception:
+        logging.exception(f"❌ Streaming jobs failed for task_id={task_id} in chunk {chunks}")
+        return False
+
+
+async def process_job_chunks_async(task_id, context) -> bool:
+    chunks = 0
+    try:
+        async with contextlib.aclosing(context.job_chunks_async()) as job_chunks:
+            async for chunk in job_chunks:
+                chunks += 1
+                if not await JobDescriptionProcessor(task_id, context=chunk).process_async():
+                    logging.error(f"❌ Job description processing failed for task_id={task_id} in chunk {chunks}")
+                    return False
+                if not await Score(task_id, context=chunk).calculate_score_async():
+                    logging.error(f"❌ Score update failed for task_id={task_id} in chunk {chunks}")
+                    return False
+        logging.info(f"🌊 Streamed {context.job_count} jobs in {chunks} chunks for task_id={task_id}")
+        return True
+    except Exception:
+        logging.exception(f"❌ Streaming jobs failed for task_id={task_id} in chunk {chunks}")
+        return False
+
+
+def process_resumes(task_id, context=None):
+    try:
+        processor = ResumeProcessor(task_id, context=context)
+        return processor.process()
+    except Exception:
+        logging.exception(f"❌ Resume processing failed for task_id={task_id}")
+        return False
+
+
+def process_job_descriptions(task_id, context=None):
+    try:
+        processor = JobDescriptionProcessor(task_id, context=context)
+        return processor.process()
+    except Exception:
+        logging.exception(f"❌ Job description processing failed for task_id={task_id}")
+        return False
+
+
+def update_match_score(task_id, context=None):
+    try:
+        score = Score(task_id, context=context)
+        return score.calculate_score()
+    except Exception:
+        logging.exception(f"❌ Match score update failed for task_id={task_id}")
+        return False
@@ -1,26 +1,61 @@
-from .utils.db import get_conn, put_conn
+from .Extractor import pipeline_version
+from .utils import aio, metrics
+from .utils.db import BatchUpdate, get_conn, put_conn
+from .utils.docvectors import DOCUMENT_VECTORS_ENABLED, vector_model
+from .utils.fingerprint import keywords_hash, source_hash
+from .utils.keywords import keyword_counts, save_values
 from .parsers import ParseResume
 import logging
 
+RESUME_QUERY = """
+    SELECT r.id, r."rawText", r."keywordCounts", r.keywords, r."keywordsSourceHash",
+           r."documentVectorModel", r."documentVector"
+    FROM public."TaskRequest" t
+    JOIN public."Resume" r ON r.id = t."resumeId"
+    WHERE t.id = %s
+"""
+
+SAVE_KEYWORDS_QUERY = """
+    UPDATE public."Resume"
+    SET keywords = %s, "keywordCounts" = %s, "keywordsHash" = %s, "keywordsSourceHash" = %s,
+        "documentVector" = %s, "documentVectorModel" = %s
+    WHERE id = %s
+"""
+
 class ResumeProcessor:
-    def __init__(self, task_id):
+    def __init__(self, task_id, context=None):
         self.task_id = task_id
+        self.context = context
         self.raw_text = None
         self.resume_id = None
+        # Keyword counts already stored and the fingerprint of the text they
+        # came from
+        self.keywords = None
+        self.keywords_source_hash = None
+        # Stored document vector as (vector model, components)
+        self.document_vector = None
+        # Counts of the keywords last passed to save_params, and their hash
+        self.saved_counts = None
+        self.saved_hash = None
+        # Document vector of the last extraction
+        self.extracted_vector = None
 
     def process(self) -> bool:
         try:
-            success = self.get_resume_data()
+            success = self.load_from_context() if self.context else self.get_resume_data()
             if not success:
                 logging.error(f"❌ Failed to fetch resume data for task_id={self.task_id}")
                 return False
 
-            resume_dict = ParseResume(self.raw_text).get_JSON()
-            if "extracted_keywords" not in resume_dict:
-                logging.warning(f"⚠️ No extracted_keywords found in resume for task_id={self.task_id}")
+            if self.is_unchanged():
+                return True
+
+            keywords = self.extract_keywords()
+            if keywords is None:
                 return False
 
-            if self.save_resume_keywords(resume_dict["extracted_keywords"]):
+            if self.save_resume_keywords(keywords):
+                self.update_context()
                 logging.info(f"✅ Resume keywords saved for resume_id={self.resume_id}")
                 return True
             else:
@@ -31,23 +66,154 @@ class ResumeProcessor:
             logging.exception(f"❌ Unexpected error while processing task_id={self.task_id}: {str(e)}")
             return False
 
+    async def process_async(self) -> bool:
+        try:
+            success = self.load_from_context() if self.context else await self.get_resume_data_async()
+            if not success:
+                logging.error(f"❌ Failed to fetch resume data for task_id={self.task_id}")
+                return False
+
+            if self.is_unchanged():
+                return True
+
+            keywords = await aio.run_cpu(self.extract_keywords)
+            if keywords is None:
+                return False
+
+            if await self.save_resume_keywords_async(keywords):
+                self.update_context()
+                logging.info(f"✅ Resume keywords saved for resume_id={self.resume_id}")
+                return True
+            else:
+                logging.error(f"❌ Failed to save resume keywords for resume_id={self.resume_id}")
+                return False
+
+        except Exception as e:
+            logging.exception(f"❌ Unexpected error while processing task_id={self.task_id}: {str(e)}")
+            return False
+
+    @classmethod
+    def process_many(cls, contexts, batch_size: int = 64) -> dict:
+        """
+        Process the resumes of many tasks together. Each distinct resume
+        that needs keywords is parsed once, all of them in one nlp.pipe run,
+        and saved in one batched write.
+
+        Args:
+            contexts (list): TaskContext of each task.
+            batch_size (int): Number of texts buffered per spaCy batch.
+
+        Returns:
+            dict: Success per task_id.
+        """
+        results, pending, seen = {}, {}, set()
+        for context in contexts:
+            processor = cls(context.task_id, context=context)
+            results[context.task_id] = processor.load_from_context()
+            if not results[context.task_id] or processor.resume_id in seen:
+                continue
+            seen.add(processor.resume_id)
+            if not processor.is_unchanged():
+                pending[processor.resume_id] = processor
+        if not pending:
+            return results
+
+        writer = BatchUpdate(
+            "Resume", ["id"],
+            ["keywords", "keywordCounts", "keywordsHash", "keywordsSourceHash", "documentVector", "documentVectorModel"],
+            casts={
+                "keywords": "text[]",
+                "keywordCounts": "integer[]",
+                "keywordsHash": "text",
+                "keywordsSourceHash": "text",
+                "documentVector": "real[]",
+                "documentVectorModel": "text",
+            },
+        )
+        with metrics.timed("resume_parse"):
+            parsed_resumes = list(ParseResume.pipe(
+                [processor.raw_text for processor in pending.values()], batch_size=batch_size
+            ))
+        metrics.count_documents("resume", len(parsed_resumes))
+        saved = {}
+        for processor, parsed in zip(pending.values(), parsed_resumes):
+            resume_dict = parsed.get_JSON()
+            keywords = resume_dict.get("extracted_keywords")
+            if not isinstance(keywords, list):
+                logging.warning(f"⚠️ No extracted_keywords found in resume_id={processor.resume_id}")
+                continue
+            processor.extracted_vector = resume_dict.get("document_vector")
+            writer.add(processor.resume_id, *processor.save_params(keywords)[:-1])
+            saved[processor.resume_id] = processor
+        with metrics.timed("keyword_save"):
+            failures = writer.flush()
+        for resume_id, error in failures.items():
+            logging.error(f"❌ Error updating keywords for resume_id={resume_id}: {error}")
+            saved.pop(resume_id, None)
+
+        for context in contexts:
+            if context.resume_id in saved:
+                saved[context.resume_id].update_context(context)
+            elif context.resume_id in pending:
+                results[context.task_id] = False
+        logging.info(f"✅ Resume keywords saved for {len(saved)}/{len(pending)} resumes")
+        return results
+
+    def is_unchanged(self) -> bool:
+        """
+        True when the stored keywords were extracted from the current text
+        by the current pipeline, so parsing again would reproduce them. With
+        document vectors enabled, the stored vector must come from the
+        current pipeline too.
+        """
+        if self.keywords is None or self.keywords_source_hash != source_hash(self.raw_text, pipeline_version()):
+            return False
+        if DOCUMENT_VECTORS_ENABLED and (self.document_vector or (None, None))[0] != vector_model():
+            return False
+        logging.info(f"♻️ Resume {self.resume_id} unchanged; keeping its keywords")
+        return True
+
+    def extract_keywords(self):
+        with metrics.timed("resume_parse"):
+            resume_dict = ParseResume(self.raw_text).get_JSON()
+        metrics.count_documents("resume")
+        if "extracted_keywords" not in resume_dict:
+            logging.warning(f"⚠️ No extracted_keywords found in resume for task_id={self.task_id}")
+            return None
+        self.extracted_vector = resume_dict.get("document_vector")
+        return resume_dict["extracted_keywords"]
+
+    def load_from_context(self) -> bool:
+        if self.context.resume_id is None:
+            logging.error(f"❌ No matching resume found for task_id={self.task_id}")
+            return False
+
+        self.resume_id, self.raw_text = self.context.resume_id, self.context.resume_raw_text
+        self.keywords = self.context.resume_keywords
+        self.keywords_source_hash = self.context.resume_keywords_source_hash
+        self.document_vector = self.context.resume_document_vector
+        return True
+
+    def update_context(self, context=None):
+        # Later stages see what was just saved
+        context = context or self.context
+        if context:
+            context.resume_keywords = self.saved_counts
+            context.resume_keywords_hash = self.saved_hash
+            context.resume_document_vector = self.document_vector
+
     def get_resume_data(self) -> bool:
         conn = get_conn()
         try:
             with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT r.id, r."rawText"
-                    FROM public."TaskRequest" t
-                    JOIN public."Resume" r ON r.id = t."resumeId"
-                    WHERE t.id = %s
-                """, (self.task_id,))
+                cur.execute(RESUME_QUERY, (self.task_id,))
                 result = cur.fetchone()
 
                 if not result:
                     logging.error(f"❌ No matching resume found for task_id={self.task_id}")
                     return False
 
-                self.resume_id, self.raw_text = result
+                self.load_row(result)
                 return True
 
         except Exception as e:
@@ -57,6 +223,46 @@ class ResumeProcessor:
         finally:
             put_conn(conn)
 
+    async def get_resume_data_async(self) -> bool:
+        try:
+            result = await aio.fetchone(RESUME_QUERY, (self.task_id,))
+            if not result:
+                logging.error(f"❌ No matching resume found for task_id={self.task_id}")
+                return False
+
+            self.load_row(result)
+            return True
+
+        except Exception as e:
+            logging.exception(f"❌ Error fetching resume data for task_id={self.task_id}: {str(e)}")
+            return False
+
+    def load_row(self, row):
+        self.resume_id, self.raw_text, counts, keywords, self.keywords_source_hash, vector_model_tag, vector = row
+        self.keywords = keyword_counts(counts, keywords)
+        self.document_vector = (vector_model_tag, vector) if vector_model_tag else None
+
+    def save_params(self, keywords: list) -> tuple:
+        """
+        The UPDATE parameters storing an extracted keyword list compactly: the
+        distinct keywords and their counts, along with the extracted
+        document vector. What is stored is kept in ``saved_counts``,
+        ``saved_hash`` and ``document_vector``.
+        """
+        distinct, counts, self.saved_counts = save_values(keywords)
+        self.saved_hash = keywords_hash(self.saved_counts)
+        self.document_vector = (vector_model(), self.extracted_vector) if DOCUMENT_VECTORS_ENABLED else None
+        vector_model_tag, vector = self.document_vector or (None, None)
+        return (
+            distinct,
+            counts,
+            self.saved_hash,
+            source_hash(self.raw_text, pipeline_version()),
+            vector,
+            vector_model_tag,
+            self.resume_id,
+        )
+
     def save_resume_keywords(self, keywords: list) -> bool:
         if not isinstance(keywords, list):
             logging.warning("⚠️ Keywords must be a list")
@@ -64,12 +270,8 @@ class ResumeProcessor:
 
         conn = get_conn()
         try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    UPDATE public."Resume"
-                    SET keywords = %s
-                    WHERE id = %s
-                """, (keywords, self.resume_id))
+            with metrics.timed("keyword_save"), conn.cursor() as cur:
+                cur.execute(SAVE_KEYWORDS_QUERY, self.save_params(keywords))
                 conn.commit()
                 return True
 
@@ -79,3 +281,16 @@ class ResumeProcessor:
 
         finally:
             put_conn(conn)
+
+    async def save_resume_keywords_async(self, keywords: list) -> bool:
+        if not isinstance(keywords, list):
+            logging.warning("⚠️ Keywords must be a list")
+            return False
+
+        try:
+            with metrics.timed("keyword_save"):
+                await aio.execute(SAVE_KEYWORDS_QUERY, self.save_params(keywords))
+            return True
+        except Exception as e:
+            logging.exception(f"❌ Error updating keywords for resume_id={self.resume_id}: {str(e)}")
+            return False
@@ -1,39 +1,271 @@
 import logging
+import math
 import numpy as np
+from scipy.sparse import csr_matrix
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-from .utils.db import get_conn, put_conn
+from .IdfModel import get_idf_model
+from .utils import aio, metrics
+from .utils.db import BatchUpdate, get_conn, put_conn
+from .utils.docvectors import SCORE_MODE, current_vector, is_vectorized, vector_columns, vector_matrix, vector_model
+from .utils.fingerprint import keywords_hash, score_inputs_hash
+from .utils.keywords import count_keywords, count_matrix, keyword_counts, split_terms, term_counts
+
+# Smoothed IDF of a term present in only one document of a two-document
+# corpus, as TfidfVectorizer computes it for a (resume, job) pair. Terms in
+# both documents get an IDF of exactly 1.
+PAIR_IDF_SINGLE = math.log(3 / 2) + 1
+
+# Recorded in "scoreModelVersion" when no corpus IDF model was available
+PAIRWISE_MODEL_VERSION = "pairwise"
+
+# "scoreModelVersion" of semantic scores, followed by the vector model
+SEMANTIC_MODEL_PREFIX = "semantic:"
+
+RESUME_KEYWORDS_QUERY = """
+    SELECT r.id, r."keywordCounts", r.keywords, r."keywordsHash", r."documentVectorModel", r."documentVector"
+    FROM public."TaskRequest" t
+    JOIN public."Resume" r ON r.id = t."resumeId"
+    WHERE t.id = %s
+"""
+
+TASK_JOBS_QUERY = f"""
+    SELECT jd.id, jd."keywordCounts", jd.keywords, jd."keywordsHash", j."scoreInputsHash",
+           jd."vectorModelVersion", jd."vectorTermIds", jd."vectorWeights", {vector_columns("jd")}
+    FROM public."TaskRequest" t
+    JOIN public."JobMatched" j ON j."taskRequestId" = t.id
+    JOIN public."Job" jd ON j."jobId" = jd.id
+    WHERE t.id = %s
+"""
+
+UPDATE_STATUS_QUERY = """
+    UPDATE public."TaskRequest"
+    SET "matchStatus" = %s
+    WHERE id = %s
+"""
+
+UPDATE_STATUSES_QUERY = """
+    UPDATE public."TaskRequest"
+    SET "matchStatus" = %s
+    WHERE id = ANY(%s)
+"""
+
+TASK_EXISTS_QUERY = """
+    SELECT 1 FROM public."TaskRequest" WHERE id = %s
+"""
+
+def row_sums(matrix) -> np.ndarray:
+    return np.asarray(matrix.sum(axis=1)).ravel()
+
 
 class Score:
-    def __init__(self, task_id: int):
+    def __init__(self, task_id: int, context=None, label=None):
         self.task_id = task_id
+        self.context = context
+        # How log lines name the work, e.g. for a batch of tasks that has no task_id
+        self.label = label or f"task_id={task_id}"
 
-    def calculate_score(self):
+    def calculate_score(self) -> bool:
+        """
+        Score the task's jobs and write the scores.
+
+        Returns:
+            bool: False when scoring failed or any score could not be written.
+        """
         try:
-            resume = self.get_resume()
+            resume = self.context.resume() if self.context else self.get_resume()
             if "error" in resume:
                 raise Exception(resume["error"])
-            resume_keywords = resume.get("keywords", [])
-            resume_string = " ".join(resume_keywords)
 
-            jobs = self.get_jobs()
+            jobs = self.context.job_keywords() if self.context else self.get_jobs()
             if "error" in jobs:
                 raise Exception(jobs["error"])
 
-            for job in jobs:
-                try:
-                    job_keywords = job.get("keywords", [])
-                    jd_string = " ".join(job_keywords)
+            writer = self.scored_writer(resume, jobs)
+            failures = writer.flush()
+            for (_, job_id), error in failures.items():
+                logging.error(f"❌ Failed to update similarityScore for job_id={job_id}: {error}")
+            return not failures
 
-                    tfidf_score = self.tfidf_job_in_resume_score(resume_string, jd_string)
-                    similarity_score = round(tfidf_score * 100, 2)
+        except Exception as e:
+            logging.exception(f"❌ Error in calculate_score for {self.label}: {str(e)}")
+            return False
 
-                    self.save_score(job["id"], float(similarity_score))
-                except Exception as job_e:
-                    logging.exception(f"❌ Error scoring job_id={job['id']}: {str(job_e)}")
+    async def calculate_score_async(self) -> bool:
+        try:
+            resume = self.context.resume() if self.context else await self.get_resume_async()
+            if "error" in resume:
+                raise Exception(resume["error"])
+
+            jobs = self.context.job_keywords() if self.context else await self.get_jobs_async()
+            if "error" in jobs:
+                raise Exception(jobs["error"])
+
+            writer = await aio.run_cpu(self.scored_writer, resume, jobs)
+            failures = await writer.flush_async()
+            for (_, job_id), error in failures.items():
+                logging.error(f"❌ Failed to update similarityScore for job_id={job_id}: {error}")
+            return not failures
 
         except Exception as e:
-            logging.exception(f"❌ Error in calculate_score for task_id={self.task_id}: {str(e)}")
+            logging.exception(f"❌ Error in calculate_score_async for {self.label}: {str(e)}")
+            return False
+
+    def scored_writer(self, resume, jobs) -> BatchUpdate:
+        """
+        Score the jobs whose inputs changed since they were last scored and
+        queue the scores for one batched write. A job is stale when the hash
+        of its resume keywords, job keywords and scoring model version no
+        longer matches its stored "scoreInputsHash"; keywords are only
+        hashed here when no "keywordsHash" was stored with them. The IDF
+        model version only changes on a rebuild, so a reused score may be
+        weighted by older document frequencies than a fresh one (see
+        IdfModel). Jobs without keywords, e.g. because their description
+        failed to parse, are not scored, nor is any job of a resume without
+        keywords.
+
+        With SCORE_MODE=semantic a job is scored by the cosine similarity of
+        its document vector to the resume's, as a percentage. A task is
+        scored in one mode only, so its scores stay comparable: when the
+        resume or any keyworded job has no vector from the current pipeline
+        the whole task gets TF-IDF scores until their vectors are
+        backfilled. A job whose text has no vector at all scores 0.
+        """
+        return self.batch_scored_writer([(self.task_id, resume, jobs)])
+
+    def batch_scored_writer(self, tasks) -> BatchUpdate:
+        """
+        ``scored_writer`` for many tasks at once. Every stale (task, job)
+        pair is scored in one vectorized pass, and a resume or job shared by
+        several tasks is counted only once.
+
+        Args:
+            tasks (list): ``(task_id, resume, jobs)`` triples, with resume and
+                jobs as ``get_resume`` and ``get_jobs`` return them: their
+                "keywords" are keyword count maps. The resume of a streamed
+                task also carries "jobsWithoutVector": how many jobs in all
+                of the task's chunks have no current document vector.
+
+        Returns:
+            BatchUpdate: The queued "JobMatched" score updates.
+        """
+        model = get_idf_model()
+        model_version = PAIRWISE_MODEL_VERSION if model.is_empty else model.version
+        vectors_from = vector_model() if SCORE_MODE == "semantic" else None
+        semantic_version = f"{SEMANTIC_MODEL_PREFIX}{vectors_from}"
+
+        writer = self.score_writer()
+        resume_rows, job_rows = {}, {}
+        resumes_keywords, jobs_keywords, jobs_vectors, job_hashes = [], [], [], {}
+        pairs, semantic_tasks = [], []
+        for task_id, resume, jobs in tasks:
+            resume_keywords = resume.get("keywords")
+            if resume_keywords is None:
+                logging.error(f"❌ Resume {resume['id']} has no keywords; not scoring task_id={task_id}")
+                continue
+            resume_hash = resume.get("keywordsHash") or keywords_hash(resume_keywords)
+            resume_vector = current_vector(resume.get("document_vector"), vectors_from) if vectors_from else None
+            if vectors_from and resume_vector is None:
+                logging.warning(
+                    f"⚠️ Resume {resume['id']} has no {vectors_from} document vector; "
+                    f"scoring task_id={task_id} with TF-IDF"
+                )
+            if resume_vector is not None:
+                missing = resume.get("jobsWithoutVector") or sum(
+                    1 for job in jobs
+                    if job.get("keywords") is not None and not is_vectorized(job.get("document_vector"), vectors_from)
+                )
+                if missing:
+                    logging.warning(
+                        f"⚠️ {missing} jobs of task_id={task_id} have no {vectors_from} document vector; "
+                        "scoring the task with TF-IDF until python -m scripts.SemanticIndex backfill stores them"
+                    )
+                    resume_vector = None
+            version = model_version if resume_vector is None else semantic_version
+            semantic_pairs, semantic_vectors = [], []
+            reused = 0
+            for job in jobs:
+                if job.get("keywords") is None:
+                    logging.error(f"❌ Job {job['id']} has no keywords; not scoring it for task_id={task_id}")
+                    continue
+                if job["id"] not in job_hashes:
+                    job_hashes[job["id"]] = job.get("keywordsHash") or keywords_hash(job["keywords"])
+                job_vector = None
+                if resume_vector is not None:
+                    # A text without any vector is similar to nothing
+                    job_vector = current_vector(job.get("document_vector"), vectors_from) or [0.0] * len(resume_vector)
+                inputs_hash = score_inputs_hash(resume_hash, job_hashes[job["id"]], version)
+                if job.get("scoreInputsHash") == inputs_hash:
+                    reused += 1
+                    continue
+                if job_vector is not None:
+                    semantic_pairs.append((job["id"], inputs_hash))
+                    semantic_vectors.append(job_vector)
+                    continue
+                if resume["id"] not in resume_rows:
+                    resume_rows[resume["id"]] = len(resumes_keywords)
+                    resumes_keywords.append(resume_keywords)
+                if job["id"] not in job_rows:
+                    job_rows[job["id"]] = len(jobs_keywords)
+                    jobs_keywords.append(job["keywords"])
+                    jobs_vectors.append(job.get("vector"))
+                pairs.append((task_id, job["id"], inputs_hash, resume_rows[resume["id"]], job_rows[job["id"]]))
+            if reused:
+                logging.info(f"♻️ Reusing {reused} unchanged scores for task_id={task_id}")
+            if semantic_pairs:
+                semantic_tasks.append((task_id, resume_vector, semantic_pairs, semantic_vectors))
+
+        if semantic_tasks:
+            with metrics.timed("scoring"):
+                for task_id, resume_vector, semantic_pairs, semantic_vectors in semantic_tasks:
+                    similarity_scores = np.round(self.semantic_scores(resume_vector, semantic_vectors) * 100, 2)
+                    for (job_id, inputs_hash), similarity_score in zip(semantic_pairs, similarity_scores):
+                        writer.add(task_id, job_id, float(similarity_score), semantic_version, inputs_hash)
+        if not pairs:
+            return writer
+
+        pair_resumes = np.array([pair[3] for pair in pairs])
+        pair_jobs = np.array([pair[4] for pair in pairs])
+        with metrics.timed("scoring"):
+            if model.is_empty:
+                tfidf_scores = self.tfidf_pair_scores(resumes_keywords, jobs_keywords, pair_resumes, pair_jobs)
+            else:
+                tfidf_scores = self.corpus_tfidf_pair_scores(
+                    resumes_keywords, jobs_keywords, pair_resumes, pair_jobs, model, jobs_vectors
+                )
+        similarity_scores = np.round(tfidf_scores * 100, 2)
+
+        for (task_id, job_id, inputs_hash, _, _), similarity_score in zip(pairs, similarity_scores):
+            writer.add(task_id, job_id, float(similarity_score), model_version, inputs_hash)
+        return writer
+
+    def calculate_batch_score(self, contexts) -> set:
+        """
+        Score the jobs of every task in ``contexts`` with one
+        ``batch_scored_writer`` pass and one write.
+
+        Returns:
+            set: The task_ids with a score that could not be written.
+        """
+        writer = self.batch_scored_writer(
+            [(context.task_id, context.resume(), context.job_keywords()) for context in contexts]
+        )
+        failures = writer.flush()
+        for (task_id, job_id), error in failures.items():
+            logging.error(f"❌ Failed to update similarityScore for task_id={task_id}, job_id={job_id}: {error}")
+        return {task_id for task_id, _ in failures}
+
+    def score_writer(self):
+        return BatchUpdate(
+            "JobMatched",
+            ["taskRequestId", "jobId"],
+            ["similarityScore", "scoreModelVersion", "scoreInputsHash"],
+            casts={
+                "similarityScore": "double precision",
+                "scoreModelVersion": "text",
+                "scoreInputsHash": "text",
+            },
+        )
 
     def save_score(self, job_id, score):
         conn = get_conn()
@@ -57,16 +289,11 @@ class Score:
         conn = get_conn()
         try:
             cur = conn.cursor()
-            cur.execute("""
-                SELECT r.id, r.keywords
-                FROM public."TaskRequest" t
-                JOIN public."Resume" r ON r.id = t."resumeId"
-                WHERE t.id = %s
-            """, (self.task_id,))
+            cur.execute(RESUME_KEYWORDS_QUERY, (self.task_id,))
             row = cur.fetchone()
             cur.close()
             if row:
-                return {"id": row[0], "keywords": row[1]}
+                return self._resume(row)
             else:
                 raise ValueError("No resume found for task_id: {}".format(self.task_id))
         except Exception as e:
@@ -75,26 +302,91 @@ class Score:
         finally:
             put_conn(conn)
 
+    async def get_resume_async(self):
+        try:
+            row = await aio.fetchone(RESUME_KEYWORDS_QUERY, (self.task_id,))
+            if row:
+                return self._resume(row)
+            else:
+                raise ValueError("No resume found for task_id: {}".format(self.task_id))
+        except Exception as e:
+            logging.exception("❌ Error fetching resume")
+            return {"error": str(e)}
+
     def get_jobs(self):
         conn = get_conn()
         try:
             cur = conn.cursor()
-            cur.execute("""
-                SELECT jd.id, jd.keywords
-                FROM public."TaskRequest" t
-                JOIN public."JobMatched" j ON j."taskRequestId" = t.id
-                JOIN public."Job" jd ON j."jobId" = jd.id
-                WHERE t.id = %s
-            """, (self.task_id,))
+            cur.execute(TASK_JOBS_QUERY, (self.task_id,))
             rows = cur.fetchall()
             cur.close()
-            return [{"id": row[0], "keywords": row[1]} for row in rows]
+            return self._jobs(rows)
         except Exception as e:
             logging.exception("❌ Error fetching jobs")
             return {"error": str(e)}
         finally:
             put_conn(conn)
 
+    async def get_jobs_async(self):
+        try:
+            rows = await aio.fetchall(TASK_JOBS_QUERY, (self.task_id,))
+            return self._jobs(rows)
+        except Exception as e:
+            logging.exception("❌ Error fetching jobs")
+            return {"error": str(e)}
+
+    @staticmethod
+    def _resume(row) -> dict:
+        resume_id, counts, keywords, stored_hash, vectors_from, vector = row
+        return {
+            "id": resume_id,
+            "keywords": keyword_counts(counts, keywords),
+            "keywordsHash": stored_hash,
+            "document_vector": (vectors_from, vector) if vectors_from else None,
+        }
+
+    @staticmethod
+    def _jobs(rows) -> list:
+        return [
+            {
+                "id": job_id,
+                "keywords": keyword_counts(counts, keywords),
+                "keywordsHash": stored_hash,
+                "scoreInputsHash": inputs_hash,
+                "vector": (version, term_ids, weights) if version else None,
+                "document_vector": (vectors_from, vector) if vectors_from else None,
+            }
+            for job_id, counts, keywords, stored_hash, inputs_hash, version, term_ids, weights, vectors_from, vector
+            in rows
+        ]
+
+    @staticmethod
+    def as_counts(keywords):
+        # Space-joined keyword strings are accepted where a single document
+        # is scored, e.g. by the benchmarks
+        return count_keywords(keywords.split()) if isinstance(keywords, str) else keywords
+
+    @staticmethod
+    def semantic_scores(resume_vector, jobs_vectors) -> np.ndarray:
+        """
+        Cosine similarity of one resume to many jobs from their normalized
+        document vectors: a single matrix-vector product.
+
+        Args:
+            resume_vector (list): The resume's document vector.
+            jobs_vectors (list): The document vector of each job.
+
+        Returns:
+            np.ndarray: One similarity per job, in [0.0, 1.0].
+        """
+        if not len(jobs_vectors):
+            return np.zeros(0)
+        # In float64: float32 products vary in the last bits with the number
+        # of jobs, which can flip a rounded score between loaded and
+        # streamed runs of the same task
+        similarities = vector_matrix(jobs_vectors).astype(np.float64) @ np.asarray(resume_vector, dtype=np.float64)
+        return np.clip(similarities, 0.0, 1.0)
+
     def tfidf_job_in_resume_score(self, resume_keywords: str, job_keywords: str) -> float:
         try:
             vectorizer = TfidfVectorizer()
@@ -143,6 +435,258 @@ class Score:
             logging.exception("❌ Error calculating TF-IDF containment score")
             return 0.3  # Safe fallback minimum
 
+    def tfidf_job_in_resume_scores(self, resume_keywords: str, jobs_keywords: list) -> np.ndarray:
+        """
+        Vectorized tfidf_job_in_resume_score for one resume against many jobs.
+
+        Args:
+            resume_keywords (str | dict): Space-joined resume keywords, or
+                their count map.
+            jobs_keywords (list): Space-joined keywords, or the count map,
+                of each job.
+
+        Returns:
+            np.ndarray: One score per job, in [0.3, 1.0].
+        """
+        n_jobs = len(jobs_keywords)
+        return self.tfidf_pair_scores(
+            [self.as_counts(resume_keywords)], [self.as_counts(job) for job in jobs_keywords],
+            np.zeros(n_jobs, dtype=int), np.arange(n_jobs),
+        )
+
+    def tfidf_pair_scores(self, resumes_keywords: list, jobs_keywords: list, resume_rows, job_rows) -> np.ndarray:
+        """
+        Vectorized tfidf_job_in_resume_score for any set of (resume, job)
+        pairs.
+
+        All documents are counted into one sparse matrix straight from their
+        keyword counts. The per-pair IDF, L2 norms, min-containment
+        numerator, overlap boost and calibration curve are then evaluated as
+        array operations, giving the same scores as calling
+        tfidf_job_in_resume_score once per pair on the space-joined keywords.
+
+        Args:
+            resumes_keywords (list): Keyword count map of each resume.
+            jobs_keywords (list): Keyword count map of each job.
+            resume_rows (np.ndarray): Index into resumes_keywords per pair.
+            job_rows (np.ndarray): Index into jobs_keywords per pair.
+
+        Returns:
+            np.ndarray: One score per pair, in [0.3, 1.0].
+        """
+        n_pairs = len(job_rows)
+        if n_pairs == 0:
+            return np.zeros(0)
+
+        documents = list(resumes_keywords) + list(jobs_keywords)
+        try:
+            counts, _ = count_matrix(term_counts(keywords) for keywords in documents)
+        except ValueError:
+            # No token in any document: every pair hits the empty-vocabulary fallback
+            return np.full(n_pairs, 0.3)
+        resume_counts, job_counts, resume_shared, job_shared = self.pair_matrices(
+            counts, len(resumes_keywords), resume_rows, job_rows
+        )
+
+        a2 = PAIR_IDF_SINGLE ** 2
+        resume_norm = np.sqrt(np.maximum(
+            a2 * row_sums(resume_counts.power(2)) - (a2 - 1) * row_sums(resume_shared.power(2)), 0.0
+        ))
+        job_sum = row_sums(job_counts)
+        shared_sum = row_sums(job_shared)
+        job_norm = np.sqrt(np.maximum(
+            a2 * row_sums(job_counts.power(2)) - (a2 - 1) * row_sums(job_shared.power(2)), 0.0
+        ))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rows = np.repeat(np.arange(n_pairs), np.diff(job_shared.indptr))
+            contributions = np.minimum(
+                resume_shared.data / resume_norm[rows],
+                job_shared.data / job_norm[rows],
+            )
+            matched = np.bincount(rows, weights=contributions, minlength=n_pairs)
+            total_possible = (PAIR_IDF_SINGLE * job_sum - (PAIR_IDF_SINGLE - 1) * shared_sum) / job_norm
+            score = matched / total_possible
+
+        score = score * (1 + self.common_term_counts(resumes_keywords, jobs_keywords, resume_rows, job_rows) / 5)
+        score = self.calibrate(score)
+
+        # Same special cases as the per-pair scorer: a job without terms
+        # scores 1.0, unless neither side has terms (vectorizer error, 0.3)
+        resume_empty = row_sums(resume_counts) == 0
+        score = np.where(job_sum == 0, np.where(resume_empty, 0.3, 1.0), score)
+        return np.round(score, 4)
+
+    def corpus_tfidf_job_in_resume_scores(self, resume_keywords: str, jobs_keywords: list, model,
+                                          jobs_vectors=None) -> np.ndarray:
+        """
+        Containment scores of one resume against many jobs under a
+        corpus-level IDF model; see corpus_tfidf_pair_scores.
+        """
+        n_jobs = len(jobs_keywords)
+        return self.corpus_tfidf_pair_scores(
+            [self.as_counts(resume_keywords)], [self.as_counts(job) for job in jobs_keywords],
+            np.zeros(n_jobs, dtype=int), np.arange(n_jobs), model, jobs_vectors,
+        )
+
+    def corpus_tfidf_pair_scores(self, resumes_keywords: list, jobs_keywords: list, resume_rows, job_rows,
+                                 model, jobs_vectors=None) -> np.ndarray:
+        """
+        Containment scores against a corpus-level IDF model. The model is
+        only used to transform: documents are weighted by the persisted
+        document frequencies, nothing is fitted. Jobs with a vector stored
+        under the model's version are not weighted again.
+
+        Args:
+            resumes_keywords (list): Keyword count map of each resume.
+            jobs_keywords (list): Keyword count map of each job.
+            resume_rows (np.ndarray): Index into resumes_keywords per pair.
+            job_rows (np.ndarray): Index into jobs_keywords per pair.
+            model (IdfModel): The loaded corpus model.
+            jobs_vectors (list, optional): The stored vector of each job, as
+                ``(model version, term ids, weights)``, or None.
+
+        Returns:
+            np.ndarray: One score per pair, in [0.3, 1.0].
+        """
+        n_pairs = len(job_rows)
+        if n_pairs == 0:
+            return np.zeros(0)
+
+        weights = self.corpus_weights(resumes_keywords, jobs_keywords, model, jobs_vectors)
+        resume_weights, job_weights, resume_shared, job_shared = self.pair_matrices(
+            weights, len(resumes_keywords), resume_rows, job_rows
+        )
+
+        rows = np.repeat(np.arange(n_pairs), np.diff(job_shared.indptr))
+        contributions = np.minimum(resume_shared.data, job_shared.data)
+        matched = np.bincount(rows, weights=contributions, minlength=n_pairs)
+        total_possible = row_sums(job_weights)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            score = matched / total_possible
+        score = score * (1 + self.common_term_counts(resumes_keywords, jobs_keywords, resume_rows, job_rows) / 5)
+        score = self.calibrate(score)
+
+        resume_empty = row_sums(resume_weights) == 0
+        score = np.where(total_possible == 0, np.where(resume_empty, 0.3, 1.0), score)
+        return np.round(score, 4)
+
+    @staticmethod
+    def usable_vectors(jobs_vectors, model) -> list:
+        """
+        The stored job vectors that can stand in for weighting the job's
+        keywords: stored under the model's version and only referring to
+        terms this copy of the model knows.
+
+        Returns:
+            list: ``(term ids, weights)`` or None per job.
+        """
+        usable = [None] * len(jobs_vectors)
+        rows = [
+            row for row, vector in enumerate(jobs_vectors)
+            if vector is not None and vector[0] == model.version and len(vector[1])
+        ]
+        if not rows:
+            return usable
+
+        ids = [np.asarray(jobs_vectors[row][1], dtype=np.int64) for row in rows]
+        known = np.isin(np.concatenate(ids), model.known_ids())
+        starts = np.cumsum([0] + [len(term_ids) for term_ids in ids[:-1]])
+        for row, term_ids, all_known in zip(rows, ids, np.logical_and.reduceat(known, starts)):
+            if all_known:
+                usable[row] = (term_ids, np.asarray(jobs_vectors[row][2], dtype=np.float64))
+        return usable
+
+    def corpus_weights(self, resumes_keywords: list, jobs_keywords: list, model, jobs_vectors=None):
+        """
+        Document-term matrix of the resumes followed by the jobs, weighted
+        as ``IdfModel.vectors`` weighs them. Columns are IdfTerm ids, then
+        the terms the model has no id for.
+
+        Returns:
+            csr_matrix: One L2-normalized row per document.
+        """
+        n_resumes = len(resumes_keywords)
+        documents = list(resumes_keywords) + list(jobs_keywords)
+        vectors = [None] * n_resumes + self.usable_vectors(jobs_vectors or [None] * len(jobs_keywords), model)
+        computed = [row for row, vector in enumerate(vectors) if vector is None]
+
+        known_ids = model.known_ids()
+        first_unknown = int(known_ids[-1]) + 1 if len(known_ids) else 0
+        unknown = {}
+        for row, (terms, row_weights, _) in zip(computed, model.vectors(documents[row] for row in computed)):
+            term_ids = []
+            for term in terms:
+                term_id = model.term_ids.get(term)
+                if term_id is None or term_id >= first_unknown:
+                    # Added since known_ids was taken, or never seen
+                    term_id = first_unknown + unknown.setdefault(term, len(unknown))
+                term_ids.append(term_id)
+            vectors[row] = (np.asarray(term_ids, dtype=np.int64), row_weights)
+
+        indptr = np.concatenate([[0], np.cumsum([len(term_ids) for term_ids, _ in vectors])])
+        matrix = csr_matrix(
+            (
+                np.concatenate([row_weights for _, row_weights in vectors]),
+                np.concatenate([term_ids for term_ids, _ in vectors]),
+                indptr,
+            ),
+            shape=(len(documents), first_unknown + len(unknown) or 1),
+        )
+        matrix.sort_indices()
+        return matrix
+
+    @staticmethod
+    def pair_matrices(matrix, n_resumes: int, resume_rows, job_rows) -> tuple:
+        """
+        Expand a document-term matrix holding the resumes followed by the
+        jobs into one resume row and one job row per pair.
+
+        Returns:
+            tuple: The resume rows, the job rows, and both restricted to the
+            terms each pair shares. The two restricted matrices have the same
+            sparsity structure, so their ``data`` arrays line up entry by entry.
+        """
+        resumes = matrix[np.asarray(resume_rows)]
+        jobs = matrix[n_resumes + np.asarray(job_rows)]
+        resume_shared = resumes.multiply(jobs > 0).tocsr()
+        job_shared = jobs.multiply(resumes > 0).tocsr()
+        for shared in (resume_shared, job_shared):
+            shared.eliminate_zeros()
+            shared.sort_indices()
+        return resumes, jobs, resume_shared, job_shared
+
+    @staticmethod
+    def common_term_counts(resumes_keywords: list, jobs_keywords: list, resume_rows, job_rows) -> np.ndarray:
+        """
+        Number of distinct whitespace-separated terms each pair shares,
+        which drives the soft overlap boost.
+        """
+        documents = [split_terms(keywords) for keywords in resumes_keywords]
+        resume_terms = set().union(*documents)
+        # Only terms of some resume can be shared
+        documents += [resume_terms.intersection(split_terms(keywords)) for keywords in jobs_keywords]
+        try:
+            terms, _ = count_matrix(documents)
+        except ValueError:
+            return np.zeros(len(job_rows))
+        resumes = terms[np.asarray(resume_rows)]
+        jobs = terms[len(resumes_keywords) + np.asarray(job_rows)]
+        return row_sums(resumes.multiply(jobs))
+
+    @staticmethod
+    def calibrate(score: np.ndarray) -> np.ndarray:
+        """
+        Apply the piecewise calibration curve of tfidf_job_in_resume_score
+        to an array of raw containment scores and clamp to [0.3, 1.0].
+        """
+        score = np.where(score < 0.7, score + (0.7 - score) * 0.6, score)
+        score = np.where((0.6 < score) & (score < 0.75), score * 0.2 + score, score)
+        score = np.where((0.4 < score) & (score < 0.6), score * 0.15 + score, score)
+        score = np.where(score < 0.4, score * 0.1 + score, score)
+        return np.clip(score, 0.3, 1.0)
+
     def tfidf_cosine_similarity(self, str1, str2):
         try:
             vectorizer = TfidfVectorizer(stop_words='english')
@@ -157,11 +701,7 @@ class Score:
         conn = get_conn()
         try:
             cur = conn.cursor()
-            cur.execute("""
-                UPDATE public."TaskRequest"
-                SET "matchStatus" = %s
-                WHERE id = %s
-            """, (status, self.task_id))
+            cur.execute(UPDATE_STATUS_QUERY, (status, self.task_id))
             conn.commit()
             cur.close()
             return {"status": "Match status updated"}
@@ -171,13 +711,49 @@ class Score:
         finally:
             put_conn(conn)
 
+    @staticmethod
+    def update_statuses(statuses: dict):
+        """
+        Set the "matchStatus" of many tasks in one transaction, one
+        statement per distinct status.
+
+        Args:
+            statuses (dict): Status per task_id.
+        """
+        if not statuses:
+            return {"status": "Match statuses updated"}
+
+        task_ids_by_status = {}
+        for task_id, status in statuses.items():
+            task_ids_by_status.setdefault(status, []).append(task_id)
+
+        conn = get_conn()
+        try:
+            with conn.cursor() as cur:
+                for status, task_ids in task_ids_by_status.items():
+                    cur.execute(UPDATE_STATUSES_QUERY, (status, task_ids))
+            conn.commit()
+            return {"status": "Match statuses updated"}
+        except Exception as e:
+            conn.rollback()
+            logging.exception("❌ Error updating matchStatus")
+            return {"error": str(e)}
+        finally:
+            put_conn(conn)
+
+    async def update_status_async(self, status = "IN_PROGRESS"):
+        try:
+            await aio.execute(UPDATE_STATUS_QUERY, (status, self.task_id))
+            return {"status": "Match status updated"}
+        except Exception as e:
+            logging.exception("❌ Error updating matchStatus")
+            return {"error": str(e)}
+
     def is_valid_task(self) -> bool:
         conn = get_conn()
         try:
             cur = conn.cursor()
-            cur.execute("""
-                SELECT 1 FROM public."TaskRequest" WHERE id = %s
-            """, (self.task_id,))
+            cur.execute(TASK_EXISTS_QUERY, (self.task_id,))
             exists = cur.fetchone() is not None
             cur.close()
             return exists
@@ -185,4 +761,11 @@ class Score:
             logging.exception("❌ Error validating task_id existence")
             return False
         finally:
-            put_conn(conn)
\ No newline at end of file
+            put_conn(conn)
+
+    async def is_valid_task_async(self) -> bool:
+        try:
+            return await aio.fetchone(TASK_EXISTS_QUERY, (self.task_id,)) is not None
+        except Exception as e:
+            logging.exception("❌ Error validating task_id existence")
+            return False
@@ -0,0 +1,339 @@
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from .utils.db import DB_STREAM_CHUNK_SIZE, BatchUpdate, stream_rows
+from .utils.docvectors import DOCUMENT_VECTORS_ENABLED, current_vector, vector_matrix, vector_model
+
+# Inverted lists the catalog is partitioned into; 0 sizes it to about
+# 4 * sqrt(jobs) when the index is trained
+SEMANTIC_INDEX_LISTS = int(os.getenv("SEMANTIC_INDEX_LISTS", "0"))
+# Lists scanned per query; more raises recall and latency (see
+# benchmarks/bench_semantic.py)
+SEMANTIC_INDEX_PROBES = int(os.getenv("SEMANTIC_INDEX_PROBES", "16"))
+# Catalogs smaller than this are searched exhaustively, without training
+SEMANTIC_INDEX_MIN_JOBS = int(os.getenv("SEMANTIC_INDEX_MIN_JOBS", "5000"))
+# Seconds the API keeps its index before rebuilding it from the Job table,
+# as JOB_INDEX_MAX_AGE does for the job index: document vectors stored by
+# worker processes only reach it through a rebuild
+SEMANTIC_INDEX_MAX_AGE = float(os.getenv("SEMANTIC_INDEX_MAX_AGE", "300"))
+
+# Vectors k-means is trained on per list, and its iterations
+TRAINING_POINTS_PER_LIST = 64
+TRAINING_ITERATIONS = 10
+# Rows assigned to centroids per matrix product
+ASSIGN_CHUNK_SIZE = 16384
+
+INDEX_QUERY = """
+    SELECT id, "documentVector" FROM public."Job"
+    WHERE "documentVectorModel" = %s AND "documentVector" IS NOT NULL
+"""
+
+BACKFILL_QUERY = """
+    SELECT id, "htmlDescription" FROM public."Job"
+    WHERE keywords IS NOT NULL AND "documentVectorModel" IS DISTINCT FROM %s
+"""
+
+
+class SemanticIndex:
+    """
+    In-process approximate nearest-neighbour index over the L2-normalized
+    document vectors of jobs, in the IVF style: spherical k-means splits the
+    catalog into inverted lists around centroids, and a query scans only the
+    lists of its nearest centroids. Scores are cosine similarities.
+
+    Until the catalog reaches SEMANTIC_INDEX_MIN_JOBS every query is
+    exhaustive. The lists are retrained once the catalog has doubled since
+    the last training; jobs added in between join their nearest list.
+    """
+
+    def __init__(self, n_lists: int = SEMANTIC_INDEX_LISTS, n_probes: int = SEMANTIC_INDEX_PROBES,
+                 min_jobs: int = SEMANTIC_INDEX_MIN_JOBS, seed: int = 0):
+        self.n_lists = n_lists
+        self.n_probes = n_probes
+        self.min_jobs = min_jobs
+        self.seed = seed
+        # Row i of the matrix is job number i; rows of replaced jobs stay
+        # in place, marked dead
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.size = 0
+        self.job_ids = []
+        self.job_numbers = {}
+        self.alive = np.zeros(0, dtype=bool)
+        self.centroids = None
+        self.lists = []
+        self.trained_size = 0
+        self._unassigned = 0
+        self._lock = threading.RLock()
+        # Vectors stored after this are only indexed if added in-process
+        self.built_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.job_numbers)
+
+    def add_documents(self, documents):
+        """
+        Add or replace jobs.
+
+        Args:
+            documents (iterable): ``(job_id, vector)`` pairs with normalized
+                vectors of one dimension.
+        """
+        documents = [(job_id, vector) for job_id, vector in documents if vector is not None]
+        if not documents:
+            return
+        rows = vector_matrix([vector for _, vector in documents])
+        with self._lock:
+            if self.size == 0 and self.matrix.shape[1] != rows.shape[1]:
+                self.matrix = np.zeros((0, rows.shape[1]), dtype=np.float32)
+            if rows.shape[1] != self.matrix.shape[1]:
+                raise ValueError(f"vectors have {rows.shape[1]} dimensions, the index {self.matrix.shape[1]}")
+            self._reserve(self.size + len(rows))
+            for (job_id, _), row in zip(documents, rows):
+                previous = self.job_numbers.get(job_id)
+                if previous is not None:
+                    self.alive[previous] = False
+                self.job_numbers[job_id] = self.size
+                self.job_ids.append(job_id)
+                self.matrix[self.size] = row
+                self.alive[self.size] = True
+                self.size += 1
+
+    def _reserve(self, capacity: int):
+        # Grow geometrically so that appends stay amortized O(1)
+        if capacity <= len(self.matrix):
+            return
+        capacity = max(capacity, 2 * len(self.matrix), 1024)
+        matrix = np.zeros((capacity, self.matrix.shape[1]), dtype=np.float32)
+        matrix[:self.size] = self.matrix[:self.size]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self.size] = self.alive[:self.size]
+        self.matrix, self.alive = matrix, alive
+
+    def _refresh(self):
+        # Train on first use past min_jobs and again once the catalog has
+        # doubled; otherwise file the jobs added since into their lists
+        if len(self) < self.min_jobs:
+            return
+        if self.centroids is None or self.size >= 2 * self.trained_size:
+            self.train()
+        elif self._unassigned < self.size:
+            rows = np.arange(self._unassigned, self.size)
+            assignment = self._assign(self.matrix[rows])
+            order = np.argsort(assignment, kind="stable")
+            boundaries = np.searchsorted(assignment[order], np.arange(len(self.centroids) + 1))
+            for list_number in np.flatnonzero(np.diff(boundaries)):
+                added = rows[order[boundaries[list_number]:boundaries[list_number + 1]]]
+                self.lists[list_number] = np.concatenate([self.lists[list_number], added.astype(np.int32)])
+            self._unassigned = self.size
+
+    def _assign(self, vectors) -> np.ndarray:
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), ASSIGN_CHUNK_SIZE):
+            chunk = vectors[start:start + ASSIGN_CHUNK_SIZE]
+            assignment[start:start + len(chunk)] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return assignment
+
+    def train(self):
+        """
+        Partition the live jobs with spherical k-means, trained on a sample,
+        and rebuild every inverted list.
+        """
+        with self._lock:
+            rows = np.flatnonzero(self.alive[:self.size])
+            if not len(rows):
+                return
+            n_lists = self.n_lists or int(4 * np.sqrt(len(rows)))
+            n_lists = max(1, min(n_lists, len(rows)))
+            rng = np.random.default_rng(self.seed)
+            sample_size = min(len(rows), n_lists * TRAINING_POINTS_PER_LIST)
+            sample = self.matrix[rng.choice(rows, sample_size, replace=False)]
+            self.centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+
+            for _ in range(TRAINING_ITERATIONS):
+                assignment = self._assign(sample)
+                members = csr_matrix(
+                    (np.ones(sample_size, dtype=np.float32), (assignment, np.arange(sample_size))),
+                    shape=(n_lists, sample_size),
+                )
+                sums = np.asarray(members @ sample)
+                norms = np.linalg.norm(sums, axis=1)
+                # A centroid that lost every member restarts at a random point
+                empty = norms == 0
+                sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+                norms[empty] = 1.0
+                self.centroids = (sums / norms[:, np.newaxis]).astype(np.float32)
+
+            assignment = self._assign(self.matrix[rows])
+            order = np.argsort(assignment, kind="stable")
+            boundaries = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+            self.lists = [
+                rows[order[boundaries[i]:boundaries[i + 1]]].astype(np.int32) for i in range(n_lists)
+            ]
+            self.trained_size = self.size
+            self._unassigned = self.size
+
+    def top_k(self, vector, k: int = 20, n_probes: int = None) -> list:
+        """
+        The k jobs most similar to a normalized query vector.
+
+        Args:
+            vector (list): The query's document vector.
+            k (int): Number of jobs to return.
+            n_probes (int, optional): Lists to scan; defaults to the index's.
+
+        Returns:
+            list: ``(job_id, cosine similarity)`` pairs, best first.
+        """
+        with self._lock:
+            self._refresh()
+            if self.centroids is None:
+                return self.exhaustive_top_k(vector, k)
+            query = np.asarray(vector, dtype=np.float32)
+            n_probes = min(n_probes or self.n_probes, len(self.centroids))
+            nearest = np.argpartition(-(self.centroids @ query), n_probes - 1)[:n_probes]
+            candidates = np.concatenate([self.lists[i] for i in nearest])
+            candidates = candidates[self.alive[candidates]]
+            return self._ranked(candidates, self.matrix[candidates] @ query, k)
+
+    def exhaustive_top_k(self, vector, k: int = 20) -> list:
+        """
+        ``top_k`` by brute force: one matrix-vector product over every job.
+        """
+        with self._lock:
+            candidates = np.flatnonzero(self.alive[:self.size])
+            if not len(candidates):
+                return []
+            scores = self.matrix[:self.size] @ np.asarray(vector, dtype=np.float32)
+            return self._ranked(candidates, scores[candidates], k)
+
+    def _ranked(self, candidates, scores, k) -> list:
+        if not len(candidates) or k <= 0:
+            return []
+        if len(candidates) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            candidates, scores = candidates[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [(self.job_ids[candidates[i]], float(scores[i])) for i in order]
+
+    @classmethod
+    def build_from_db(cls, chunk_size: int = DB_STREAM_CHUNK_SIZE):
+        """
+        Build an index over every Job with a document vector from the
+        current pipeline.
+
+        Returns:
+            SemanticIndex: The populated index.
+        """
+        index = cls()
+        for rows in stream_rows(INDEX_QUERY, (vector_model(),), chunk_size):
+            index.add_documents(rows)
+        with index._lock:
+            index._refresh()
+        logging.info(f"✅ Built semantic index: {len(index)} jobs, {len(index.lists)} lists")
+        return index
+
+
+_index = None
+_index_lock = threading.Lock()
+_rebuilding = False
+
+
+def get_semantic_index() -> SemanticIndex:
+    """
+    Returns the process-wide semantic index, building it on first use. Once
+    it is older than SEMANTIC_INDEX_MAX_AGE seconds it is rebuilt in the
+    background; the current index keeps answering until the new one
+    replaces it.
+    """
+    global _index, _rebuilding
+    with _index_lock:
+        if _index is None:
+            _index = SemanticIndex.build_from_db()
+        elif not _rebuilding and time.monotonic() - _index.built_at > SEMANTIC_INDEX_MAX_AGE:
+            _rebuilding = True
+            threading.Thread(target=_rebuild_semantic_index, name="semantic-index-rebuild", daemon=True).start()
+        return _index
+
+
+def _rebuild_semantic_index():
+    global _index, _rebuilding
+    try:
+        index = SemanticIndex.build_from_db()
+        with _index_lock:
+            _index = index
+    except Exception:
+        logging.exception("❌ Error rebuilding the semantic index; keeping the current one")
+        with _index_lock:
+            # Wait a full period before trying again
+            _index.built_at = time.monotonic()
+    finally:
+        _rebuilding = False
+
+
+def update_semantic_index(document_vectors: dict):
+    """
+    Add newly parsed jobs to the process-wide index if this process has
+    built one, i.e. the API running tasks itself. Indexes in other processes
+    see the jobs once they are rebuilt.
+
+    Args:
+        document_vectors (dict): ``(vector model, components)`` per job id.
+    """
+    if _index is None or not document_vectors:
+        return
+    model = vector_model()
+    _index.add_documents(
+        (job_id, current_vector(vector, model)) for job_id, vector in document_vectors.items()
+    )
+
+
+def backfill_document_vectors(chunk_size: int = 64) -> int:
+    """
+    Parse again the keyworded jobs that have no document vector from the
+    current pipeline, e.g. after document vectors were enabled, and store
+    their vectors. Their keywords are left as they are.
+
+    Returns:
+        int: Number of jobs updated.
+    """
+    if not DOCUMENT_VECTORS_ENABLED:
+        logging.warning("⚠️ Document vectors are disabled; set SCORE_MODE=semantic or DOCUMENT_VECTORS_ENABLED=1")
+        return 0
+    from .JobDescriptionProcessor import parse_html_descriptions
+
+    model = vector_model()
+    start = time.perf_counter()
+    updated = 0
+    for rows in stream_rows(BACKFILL_QUERY, (model,), chunk_size):
+        writer = BatchUpdate(
+            "Job", ["id"], ["documentVector", "documentVectorModel"],
+            casts={"documentVector": "real[]", "documentVectorModel": "text"},
+        )
+        parsed_jobs = parse_html_descriptions([html or "" for _, html in rows], batch_size=chunk_size)
+        for (job_id, _), parsed in zip(rows, parsed_jobs):
+            writer.add(job_id, parsed.get("document_vector"), model)
+        failures = writer.flush()
+        for job_id, error in failures.items():
+            logging.error(f"❌ Failed to store the document vector of job_id={job_id}: {error}")
+        updated += len(rows) - len(failures)
+    logging.info(f"✅ Backfilled {updated} document vectors from {model} in {time.perf_counter() - start:.2f} seconds")
+    return updated
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Manage job document vectors and the semantic index.")
+    parser.add_argument("command", choices=["info", "backfill"])
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        backfill_document_vectors()
+    index = SemanticIndex.build_from_db()
+    print(f"vector_model={vector_model()} jobs={len(index)} lists={len(index.lists)}")
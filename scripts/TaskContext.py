@@ -0,0 +1,309 @@
+import logging
+import os
+
+from .utils import aio
+from .utils.db import DB_STREAM_CHUNK_SIZE, get_conn, put_conn, stream_rows
+from .utils.docvectors import SCORE_MODE, vector_columns, vector_model
+from .utils.keywords import keyword_counts
+
+# Tasks with at least this many jobs are streamed: their jobs are read
+# through a server-side cursor and processed chunk by chunk instead of
+# being loaded up front. 0 streams every task.
+TASK_STREAM_MIN_JOBS = int(os.getenv("TASK_STREAM_MIN_JOBS", "2000"))
+
+TASK_QUERY = """
+    SELECT r.id, r."rawText", r."keywordCounts", r.keywords, r."keywordsHash", r."keywordsSourceHash",
+           r."documentVectorModel", r."documentVector",
+           (SELECT count(*) FROM public."JobMatched" j WHERE j."taskRequestId" = t.id)
+    FROM public."TaskRequest" t
+    LEFT JOIN public."Resume" r ON r.id = t."resumeId"
+    WHERE t.id = %s
+"""
+
+# HTML is only shipped for jobs that still need keywords
+TASK_JOBS_QUERY = f"""
+    SELECT jd.id, jd."keywordCounts", jd.keywords, jd."keywordsHash", j."scoreInputsHash",
+           CASE WHEN jd.keywords IS NULL THEN jd."htmlDescription" END,
+           jd."vectorModelVersion", jd."vectorTermIds", jd."vectorWeights", {vector_columns("jd")}
+    FROM public."JobMatched" j
+    JOIN public."Job" jd ON j."jobId" = jd.id
+    WHERE j."taskRequestId" = %s
+"""
+
+BATCH_TASK_QUERY = """
+    SELECT t.id, r.id, r."rawText", r."keywordCounts", r.keywords, r."keywordsHash", r."keywordsSourceHash",
+           r."documentVectorModel", r."documentVector",
+           (SELECT count(*) FROM public."JobMatched" j WHERE j."taskRequestId" = t.id)
+    FROM public."TaskRequest" t
+    LEFT JOIN public."Resume" r ON r.id = t."resumeId"
+    WHERE t.id = ANY(%s)
+"""
+
+BATCH_TASK_JOBS_QUERY = f"""
+    SELECT j."taskRequestId", jd.id, jd."keywordCounts", jd.keywords, jd."keywordsHash", j."scoreInputsHash",
+           CASE WHEN jd.keywords IS NULL THEN jd."htmlDescription" END,
+           jd."vectorModelVersion", jd."vectorTermIds", jd."vectorWeights", {vector_columns("jd")}
+    FROM public."JobMatched" j
+    JOIN public."Job" jd ON j."jobId" = jd.id
+    WHERE j."taskRequestId" = ANY(%s)
+"""
+
+
+# Keyworded jobs of streamed tasks without a vector from the current
+# pipeline; a task with any is scored with TF-IDF in every chunk
+JOBS_WITHOUT_VECTOR_QUERY = """
+    SELECT j."taskRequestId", count(*)
+    FROM public."JobMatched" j
+    JOIN public."Job" jd ON j."jobId" = jd.id
+    WHERE j."taskRequestId" = ANY(%s) AND jd.keywords IS NOT NULL
+      AND jd."documentVectorModel" IS DISTINCT FROM %s
+    GROUP BY j."taskRequestId"
+"""
+
+
+class TaskContext:
+    """
+    Everything one job match task reads, loaded up front and handed to each
+    stage. Stages update it with what they write, so later stages see their
+    results without querying again.
+
+    A streamed context holds only the resume; its jobs come from
+    ``job_chunks``, one context per chunk. Keywords are held as keyword
+    count maps, a job's stored TF-IDF vector as ``(model version, term ids,
+    weights)`` and document vectors as ``(vector model, components)``.
+    Keywords come with their stored "keywordsHash", None until they have
+    been hashed. In semantic mode a streamed context also counts the jobs
+    that have no current document vector, since no single chunk sees them
+    all.
+    """
+
+    def __init__(self, task_id, resume_id=None, resume_raw_text=None, resume_keywords=None,
+                 resume_keywords_source_hash=None, job_count=0, jobs=None, streamed=False,
+                 resume_document_vector=None, resume_keywords_hash=None, jobs_without_vector=0):
+        self.task_id = task_id
+        self.resume_id = resume_id
+        self.resume_raw_text = resume_raw_text
+        self.resume_keywords = resume_keywords
+        self.resume_keywords_hash = resume_keywords_hash
+        self.resume_keywords_source_hash = resume_keywords_source_hash
+        self.resume_document_vector = resume_document_vector
+        self.job_count = job_count
+        self.jobs = jobs or []
+        self.streamed = streamed
+        self.jobs_without_vector = jobs_without_vector
+
+    @staticmethod
+    def _jobs(job_rows) -> list:
+        return [
+            {
+                "id": job_id,
+                "keywords": keyword_counts(counts, keywords),
+                "keywordsHash": stored_hash,
+                "scoreInputsHash": inputs_hash,
+                "description": html,
+                "vector": (version, term_ids, weights) if version else None,
+                "document_vector": (vector_model, vector) if vector_model else None,
+            }
+            for job_id, counts, keywords, stored_hash, inputs_hash, html, version, term_ids, weights, vector_model, vector
+            in job_rows
+        ]
+
+    @classmethod
+    def _from_task_row(cls, task_id, task_row, jobs=None, streamed=False, without_vector=None):
+        resume_id, raw_text, counts, keywords, stored_hash, source_hash, vector_model, vector, job_count = task_row
+        return cls(
+            task_id, resume_id, raw_text, keyword_counts(counts, keywords), source_hash, job_count,
+            jobs=jobs, streamed=streamed,
+            resume_document_vector=(vector_model, vector) if vector_model else None,
+            resume_keywords_hash=stored_hash,
+            jobs_without_vector=(without_vector or {}).get(task_id, 0),
+        )
+
+    @classmethod
+    def _from_rows(cls, task_id, task_row, job_rows):
+        return cls._from_task_row(task_id, task_row, jobs=cls._jobs(job_rows))
+
+    @staticmethod
+    def should_stream(task_row, stream=None) -> bool:
+        return stream if stream is not None else task_row[-1] >= TASK_STREAM_MIN_JOBS
+
+    @classmethod
+    def load(cls, task_id, stream=None):
+        """
+        Load the task's resume and jobs in two queries on one connection.
+
+        Args:
+            stream (bool, optional): Load only the resume and leave the jobs
+                to ``job_chunks``. By default tasks with at least
+                TASK_STREAM_MIN_JOBS jobs are streamed.
+
+        Returns:
+            TaskContext | None: None when the task does not exist.
+        """
+        conn = get_conn()
+        job_rows, without_vector = None, {}
+        try:
+            with conn.cursor() as cur:
+                cur.execute(TASK_QUERY, (task_id,))
+                task_row = cur.fetchone()
+                if task_row is None:
+                    return None
+                if not cls.should_stream(task_row, stream):
+                    cur.execute(TASK_JOBS_QUERY, (task_id,))
+                    job_rows = cur.fetchall()
+                elif SCORE_MODE == "semantic":
+                    cur.execute(JOBS_WITHOUT_VECTOR_QUERY, ([task_id], vector_model()))
+                    without_vector = dict(cur.fetchall())
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logging.exception(f"❌ Error loading task context for task_id={task_id}")
+            raise
+        finally:
+            put_conn(conn)
+        if job_rows is None:
+            return cls._from_task_row(task_id, task_row, streamed=True, without_vector=without_vector)
+        return cls._from_rows(task_id, task_row, job_rows)
+
+    @classmethod
+    async def load_async(cls, task_id, stream=None):
+        task_row = await aio.fetchone(TASK_QUERY, (task_id,))
+        if task_row is None:
+            return None
+        if cls.should_stream(task_row, stream):
+            without_vector = {}
+            if SCORE_MODE == "semantic":
+                without_vector = dict(await aio.fetchall(JOBS_WITHOUT_VECTOR_QUERY, ([task_id], vector_model())))
+            return cls._from_task_row(task_id, task_row, streamed=True, without_vector=without_vector)
+        job_rows = await aio.fetchall(TASK_JOBS_QUERY, (task_id,))
+        return cls._from_rows(task_id, task_row, job_rows)
+
+    def _with_jobs(self, job_rows):
+        return type(self)(
+            self.task_id, self.resume_id, self.resume_raw_text, self.resume_keywords,
+            self.resume_keywords_source_hash, self.job_count, jobs=self._jobs(job_rows),
+            resume_document_vector=self.resume_document_vector,
+            resume_keywords_hash=self.resume_keywords_hash,
+            jobs_without_vector=self.jobs_without_vector,
+        )
+
+    def job_chunks(self, chunk_size: int = DB_STREAM_CHUNK_SIZE):
+        """
+        Yields one TaskContext per chunk of the task's jobs, read through a
+        server-side cursor. Each shares this context's resume, so the job
+        stages can run on it as on a fully loaded context, and it is
+        dropped once the next chunk is read.
+        """
+        for job_rows in stream_rows(TASK_JOBS_QUERY, (self.task_id,), chunk_size):
+            yield self._with_jobs(job_rows)
+
+    async def job_chunks_async(self, chunk_size: int = DB_STREAM_CHUNK_SIZE):
+        async for job_rows in aio.stream_rows(TASK_JOBS_QUERY, (self.task_id,), chunk_size):
+            yield self._with_jobs(job_rows)
+
+    @classmethod
+    def load_many(cls, task_ids) -> dict:
+        """
+        Load the contexts of many tasks in two queries on one connection.
+        Tasks with at least TASK_STREAM_MIN_JOBS jobs come back streamed.
+
+        Returns:
+            dict: TaskContext per task_id, without the tasks that do not exist.
+        """
+        task_ids = list(task_ids)
+        job_rows, without_vector = [], {}
+        conn = get_conn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(BATCH_TASK_QUERY, (task_ids,))
+                task_rows = cur.fetchall()
+                loaded_ids = [task_id for task_id, *task_row in task_rows if not cls.should_stream(task_row)]
+                if loaded_ids:
+                    cur.execute(BATCH_TASK_JOBS_QUERY, (loaded_ids,))
+                    job_rows = cur.fetchall()
+                if SCORE_MODE == "semantic" and len(loaded_ids) < len(task_rows):
+                    cur.execute(JOBS_WITHOUT_VECTOR_QUERY, (task_ids, vector_model()))
+                    without_vector = dict(cur.fetchall())
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logging.exception(f"❌ Error loading task contexts for {len(task_ids)} tasks")
+            raise
+        finally:
+            put_conn(conn)
+
+        jobs_by_task = {}
+        for task_id, *job_row in job_rows:
+            jobs_by_task.setdefault(task_id, []).append(job_row)
+        return {
+            task_id: cls._from_rows(task_id, task_row, jobs_by_task.get(task_id, []))
+            if task_id in loaded_ids
+            else cls._from_task_row(task_id, task_row, streamed=True, without_vector=without_vector)
+            for task_id, *task_row in task_rows
+        }
+
+    def pending_jobs(self) -> list:
+        """
+        Jobs without keywords yet, as JobDescriptionProcessor expects them.
+        """
+        return [
+            {"id": job["id"], "description": job["description"]}
+            for job in self.jobs if job["keywords"] is None
+        ]
+
+    def set_job_keywords(self, keywords_by_job: dict, vectors_by_job=None, document_vectors=None):
+        vectors_by_job = vectors_by_job or {}
+        document_vectors = document_vectors or {}
+        for job in self.jobs:
+            if job["id"] in keywords_by_job:
+                job["keywords"] = keywords_by_job[job["id"]]
+                job["keywordsHash"] = None
+                job["description"] = None
+                job["vector"] = vectors_by_job.get(job["id"])
+                job["document_vector"] = document_vectors.get(job["id"])
+
+    def resume(self) -> dict:
+        """
+        The resume as Score.get_resume returns it.
+        """
+        if self.resume_id is None:
+            return {"error": f"No resume found for task_id: {self.task_id}"}
+        return {
+            "id": self.resume_id,
+            "keywords": self.resume_keywords,
+            "keywordsHash": self.resume_keywords_hash,
+            "document_vector": self.resume_document_vector,
+            "jobsWithoutVector": self.jobs_without_vector,
+        }
+
+    def job_keywords(self) -> list:
+        """
+        The task's jobs as Score.get_jobs returns them.
+        """
+        return [
+            {key: job[key] for key in ("id", "keywords", "keywordsHash", "scoreInputsHash", "vector", "document_vector")}
+            for job in self.jobs
+        ]
+
+
+class TaskBatch:
+    """
+    The contexts of tasks run together. It stands in for a single
+    TaskContext in JobDescriptionProcessor, so a job shared by several
+    tasks is parsed and written once.
+    """
+
+    def __init__(self, contexts):
+        self.contexts = list(contexts)
+        self.label = f"batch of {len(self.contexts)} tasks"
+
+    def pending_jobs(self) -> list:
+        pending = {}
+        for context in self.contexts:
+            for job in context.pending_jobs():
+                pending.setdefault(job["id"], job)
+        return list(pending.values())
+
+    def set_job_keywords(self, keywords_by_job: dict, vectors_by_job=None, document_vectors=None):
+        for context in self.contexts:
+            context.set_job_keywords(keywords_by_job, vectors_by_job, document_vectors)
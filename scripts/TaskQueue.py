@@ -0,0 +1,449 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from .utils import aio
+from .utils.db import get_conn, put_conn
+
+# "postgres" shares the "TaskQueue" table between every API and worker host;
+# "sqlite" keeps the queue in a local file for single-host development
+TASK_QUEUE_BACKEND = os.getenv("TASK_QUEUE_BACKEND", "postgres")
+TASK_QUEUE_PATH = os.getenv("TASK_QUEUE_PATH", ".cache/task_queue.sqlite3")
+# Seconds a claimed task stays invisible to other workers; workers extend
+# the lease while they are still running the task
+TASK_QUEUE_VISIBILITY_TIMEOUT = float(os.getenv("TASK_QUEUE_VISIBILITY_TIMEOUT", "300"))
+TASK_QUEUE_MAX_ATTEMPTS = int(os.getenv("TASK_QUEUE_MAX_ATTEMPTS", "3"))
+# Delay before the first retry, doubled on every further attempt
+TASK_QUEUE_RETRY_DELAY = float(os.getenv("TASK_QUEUE_RETRY_DELAY", "30"))
+
+# QUEUED -> RUNNING -> DONE, or back to QUEUED on failure until the task
+# runs out of attempts and becomes DEAD. A RUNNING task whose lease has
+# expired belongs to a worker that died and is claimable again.
+QUEUED, RUNNING, DONE, DEAD = "QUEUED", "RUNNING", "DONE", "DEAD"
+
+# profile: the task was queued with profiling requested
+Lease = namedtuple("Lease", ["task_id", "attempts", "max_attempts", "worker_id", "profile"], defaults=[False])
+
+
+# Inserts a task, or revives a finished or dead one; returns no row for a
+# task that is already queued or running
+ENQUEUE_QUERY = """
+    INSERT INTO public."TaskQueue" ("taskId", status, "maxAttempts", profile)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT ("taskId") DO UPDATE
+    SET status = EXCLUDED.status,
+        attempts = 0,
+        "maxAttempts" = EXCLUDED."maxAttempts",
+        profile = EXCLUDED.profile,
+        "visibleAt" = now(),
+        "lockedBy" = NULL,
+        "lastError" = NULL,
+        "updatedAt" = now()
+    WHERE "TaskQueue".status IN (%s, %s)
+    RETURNING "taskId"
+"""
+
+
+# Buries expired leases that have used up their attempts and fails their
+# tasks in the same statement: their worker died, so run_task never got to
+# set the task FAILED itself
+BURY_EXPIRED_QUERY = """
+    WITH buried AS (
+        UPDATE public."TaskQueue"
+        SET status = %s, "lastError" = 'lease expired', "updatedAt" = now()
+        WHERE status = %s AND "visibleAt" <= now() AND attempts >= "maxAttempts"
+        RETURNING "taskId"
+    )
+    UPDATE public."TaskRequest"
+    SET "matchStatus" = 'FAILED'
+    WHERE id IN (SELECT "taskId" FROM buried)
+    RETURNING id
+"""
+
+FAIL_TASKS_QUERY = """
+    UPDATE public."TaskRequest"
+    SET "matchStatus" = 'FAILED'
+    WHERE id = ANY(%s)
+"""
+
+
+def retry_delay(attempts: int) -> float:
+    return TASK_QUEUE_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+
+
+def fail_tasks(task_ids):
+    """
+    Set the "matchStatus" of tasks whose lease the SQLite queue buried to
+    FAILED. Raises on error, so the caller keeps the leases to bury later.
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(FAIL_TASKS_QUERY, (list(task_ids),))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        put_conn(conn)
+
+
+def log_buried(task_ids):
+    for task_id in task_ids:
+        logging.warning(f"⚠️ Worker running task_id={task_id} died on its last attempt; task FAILED")
+
+
+class PostgresTaskQueue:
+    """
+    Durable task queue in the "TaskQueue" table. Workers claim tasks with
+    ``FOR UPDATE SKIP LOCKED`` so concurrent claims never block on or
+    return the same row.
+    """
+
+    def enqueue(self, task_id: str, max_attempts: int = TASK_QUEUE_MAX_ATTEMPTS, profile: bool = False) -> bool:
+        """
+        Queue a task unless it is already queued or running. Finished and
+        dead tasks are queued again with a fresh set of attempts.
+
+        Args:
+            task_id (str): The TaskRequest to process.
+            max_attempts (int): Runs allowed before the task is dead.
+            profile (bool): Have the worker profile the task.
+
+        Returns:
+            bool: True when the task was queued, False when it was a duplicate.
+        """
+        conn = get_conn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(ENQUEUE_QUERY, (task_id, QUEUED, max_attempts, profile, DONE, DEAD))
+                queued = cur.fetchone() is not None
+            conn.commit()
+            return queued
+        except Exception:
+            conn.rollback()
+            logging.exception(f"❌ Error enqueueing task_id={task_id}")
+            raise
+        finally:
+            put_conn(conn)
+
+    async def enqueue_async(self, task_id: str, max_attempts: int = TASK_QUEUE_MAX_ATTEMPTS,
+                            profile: bool = False) -> bool:
+        try:
+            row = await aio.fetchone(ENQUEUE_QUERY, (task_id, QUEUED, max_attempts, profile, DONE, DEAD))
+            return row is not None
+        except Exception:
+            logging.exception(f"❌ Error enqueueing task_id={task_id}")
+            raise
+
+    def claim(self, worker_id: str, visibility_timeout: float = TASK_QUEUE_VISIBILITY_TIMEOUT):
+        """
+        Lease the oldest visible task, first burying expired leases that
+        have used up their attempts.
+
+        Args:
+            worker_id (str): Identifies the claiming worker.
+            visibility_timeout (float): Seconds before the lease expires.
+
+        Returns:
+            Lease | None: The claimed task, or None when the queue is empty.
+        """
+        leases = self.claim_many(worker_id, 1, visibility_timeout)
+        return leases[0] if leases else None
+
+    def claim_many(self, worker_id: str, limit: int,
+                   visibility_timeout: float = TASK_QUEUE_VISIBILITY_TIMEOUT) -> list:
+        """
+        Lease up to ``limit`` of the oldest visible tasks at once, so a
+        worker can run them as one batch. Expired leases on their last
+        attempt are buried and their tasks set FAILED in the same
+        transaction.
+
+        Returns:
+            list: The claimed Leases; empty when the queue is empty.
+        """
+        conn = get_conn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(BURY_EXPIRED_QUERY, (DEAD, RUNNING))
+                buried = [row[0] for row in cur.fetchall()]
+                cur.execute("""
+                    UPDATE public."TaskQueue" AS q
+                    SET status = %s,
+                        attempts = q.attempts + 1,
+                        "visibleAt" = now() + %s * interval '1 second',
+                        "lockedBy" = %s,
+                        "updatedAt" = now()
+                    WHERE q."taskId" IN (
+                        SELECT "taskId" FROM public."TaskQueue"
+                        WHERE status IN (%s, %s) AND "visibleAt" <= now()
+                          AND attempts < "maxAttempts"
+                        ORDER BY "visibleAt"
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING q."taskId", q.attempts, q."maxAttempts", q.profile
+                """, (RUNNING, visibility_timeout, worker_id, QUEUED, RUNNING, limit))
+                rows = cur.fetchall()
+            conn.commit()
+            log_buried(buried)
+            return [Lease(*row[:3], worker_id, row[3]) for row in rows]
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            put_conn(conn)
+
+    def extend(self, lease: Lease, visibility_timeout: float = TASK_QUEUE_VISIBILITY_TIMEOUT) -> bool:
+        """
+        Push back the lease expiry of a task this worker still holds.
+
+        Returns:
+            bool | None: False when the lease was lost to another worker,
+            None when the update itself failed and may be retried.
+        """
+        return self._update_leased(lease, """
+            UPDATE public."TaskQueue"
+            SET "visibleAt" = now() + %s * interval '1 second', "updatedAt" = now()
+            WHERE "taskId" = %s AND "lockedBy" = %s AND status = %s AND attempts = %s
+        """, (visibility_timeout, lease.task_id, lease.worker_id, RUNNING, lease.attempts))
+
+    def complete(self, lease: Lease) -> bool:
+        return self._update_leased(lease, """
+            UPDATE public."TaskQueue"
+            SET status = %s, "lockedBy" = NULL, "lastError" = NULL, "updatedAt" = now()
+            WHERE "taskId" = %s AND "lockedBy" = %s AND status = %s AND attempts = %s
+        """, (DONE, lease.task_id, lease.worker_id, RUNNING, lease.attempts))
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        """
+        Release a failed task for a delayed retry, or bury it once it has
+        used up its attempts.
+        """
+        status = DEAD if lease.attempts >= lease.max_attempts else QUEUED
+        return self._update_leased(lease, """
+            UPDATE public."TaskQueue"
+            SET status = %s,
+                "visibleAt" = now() + %s * interval '1 second',
+                "lockedBy" = NULL,
+                "lastError" = %s,
+                "updatedAt" = now()
+            WHERE "taskId" = %s AND "lockedBy" = %s AND status = %s AND attempts = %s
+        """, (status, retry_delay(lease.attempts), error, lease.task_id, lease.worker_id,
+              RUNNING, lease.attempts))
+
+    def _update_leased(self, lease, query, params) -> bool:
+        conn = get_conn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                updated = cur.rowcount == 1
+            conn.commit()
+            if not updated:
+                logging.warning(f"⚠️ Lost lease on task_id={lease.task_id} (worker {lease.worker_id})")
+            return updated
+        except Exception:
+            conn.rollback()
+            logging.exception(f"❌ Error updating queue entry for task_id={lease.task_id}")
+            return None
+        finally:
+            put_conn(conn)
+
+    def stats(self) -> dict:
+        """
+        Returns the number of queue entries per status.
+        """
+        conn = get_conn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute('SELECT status, COUNT(*) FROM public."TaskQueue" GROUP BY status')
+                rows = cur.fetchall()
+            conn.commit()
+            return dict(rows)
+        finally:
+            put_conn(conn)
+
+
+class SqliteTaskQueue:
+    """
+    Single-host counterpart of PostgresTaskQueue. Claims are serialized with
+    ``BEGIN IMMEDIATE`` instead of row locks.
+    """
+
+    def __init__(self, path: str = TASK_QUEUE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode, so transactions are opened explicitly below
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS task_queue (
+                task_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                visible_at REAL NOT NULL,
+                locked_by TEXT,
+                last_error TEXT,
+                updated_at REAL NOT NULL,
+                profile INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(task_queue)")}
+        if "profile" not in columns:
+            self._conn.execute("ALTER TABLE task_queue ADD COLUMN profile INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS task_queue_visible ON task_queue (status, visible_at)"
+        )
+
+    def _transaction(self, statements, before_commit=None) -> list:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                results = [self._conn.execute(query, params) for query, params in statements]
+                rows = [(cur.rowcount, cur.fetchall()) for cur in results]
+                if before_commit is not None:
+                    before_commit(rows)
+                self._conn.execute("COMMIT")
+                return rows
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, task_id: str, max_attempts: int = TASK_QUEUE_MAX_ATTEMPTS, profile: bool = False) -> bool:
+        now = time.time()
+        [(_, rows)] = self._transaction([("""
+            INSERT INTO task_queue (task_id, status, max_attempts, visible_at, updated_at, profile)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (task_id) DO UPDATE
+            SET status = excluded.status, attempts = 0, max_attempts = excluded.max_attempts,
+                visible_at = excluded.visible_at, locked_by = NULL, last_error = NULL,
+                updated_at = excluded.updated_at, profile = excluded.profile
+            WHERE task_queue.status IN (?, ?)
+            RETURNING task_id
+        """, (task_id, QUEUED, max_attempts, now, now, int(profile), DONE, DEAD))])
+        return bool(rows)
+
+    async def enqueue_async(self, task_id: str, max_attempts: int = TASK_QUEUE_MAX_ATTEMPTS,
+                            profile: bool = False) -> bool:
+        return await asyncio.to_thread(self.enqueue, task_id, max_attempts, profile)
+
+    def claim(self, worker_id: str, visibility_timeout: float = TASK_QUEUE_VISIBILITY_TIMEOUT):
+        leases = self.claim_many(worker_id, 1, visibility_timeout)
+        return leases[0] if leases else None
+
+    def claim_many(self, worker_id: str, limit: int,
+                   visibility_timeout: float = TASK_QUEUE_VISIBILITY_TIMEOUT) -> list:
+        now = time.time()
+
+        # "TaskRequest" lives in Postgres, so its tasks are failed before
+        # the burial commits; when that fails the leases stay expired and
+        # are buried by a later claim
+        def fail_buried(results):
+            (_, buried), _ = results
+            if buried:
+                fail_tasks(row[0] for row in buried)
+
+        (_, buried), (_, rows) = self._transaction([
+            ("""
+                UPDATE task_queue SET status = ?, last_error = 'lease expired', updated_at = ?
+                WHERE status = ? AND visible_at <= ? AND attempts >= max_attempts
+                RETURNING task_id
+            """, (DEAD, now, RUNNING, now)),
+            ("""
+                UPDATE task_queue
+                SET status = ?, attempts = attempts + 1, visible_at = ?, locked_by = ?, updated_at = ?
+                WHERE task_id IN (
+                    SELECT task_id FROM task_queue
+                    WHERE status IN (?, ?) AND visible_at <= ? AND attempts < max_attempts
+                    ORDER BY visible_at
+                    LIMIT ?
+                )
+                RETURNING task_id, attempts, max_attempts, profile
+            """, (RUNNING, now + visibility_timeout, worker_id, now, QUEUED, RUNNING, now, limit)),
+        ], before_commit=fail_buried)
+        log_buried(row[0] for row in buried)
+        return [Lease(*row[:3], worker_id, bool(row[3])) for row in rows]
+
+    def extend(self, lease: Lease, visibility_timeout: float = TASK_QUEUE_VISIBILITY_TIMEOUT) -> bool:
+        now = time.time()
+        return self._update_leased(lease, "visible_at = ?", (now + visibility_timeout,))
+
+    def complete(self, lease: Lease) -> bool:
+        return self._update_leased(
+            lease, "status = ?, locked_by = NULL, last_error = NULL", (DONE,)
+        )
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        status = DEAD if lease.attempts >= lease.max_attempts else QUEUED
+        return self._update_leased(
+            lease,
+            "status = ?, visible_at = ?, locked_by = NULL, last_error = ?",
+            (status, time.time() + retry_delay(lease.attempts), error),
+        )
+
+    def _update_leased(self, lease, assignments, params) -> bool:
+        try:
+            [(updated, _)] = self._transaction([(f"""
+                UPDATE task_queue SET {assignments}, updated_at = ?
+                WHERE task_id = ? AND locked_by = ? AND status = ? AND attempts = ?
+            """, (*params, time.time(), lease.task_id, lease.worker_id, RUNNING, lease.attempts))])
+        except sqlite3.Error:
+            logging.exception(f"❌ Error updating queue entry for task_id={lease.task_id}")
+            return None
+        if updated != 1:
+            logging.warning(f"⚠️ Lost lease on task_id={lease.task_id} (worker {lease.worker_id})")
+        return updated == 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM task_queue GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_task_queue():
+    """
+    Returns the process-wide task queue for TASK_QUEUE_BACKEND.
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            if TASK_QUEUE_BACKEND == "sqlite":
+                _queue = SqliteTaskQueue()
+            elif TASK_QUEUE_BACKEND == "postgres":
+                _queue = PostgresTaskQueue()
+            else:
+                raise ValueError(f"Unknown TASK_QUEUE_BACKEND: {TASK_QUEUE_BACKEND}")
+        return _queue
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Inspect or feed the job match task queue.")
+    parser.add_argument("command", choices=["stats", "enqueue"])
+    parser.add_argument("task_ids", nargs="*")
+    parser.add_argument("--profile", action="store_true", help="profile the enqueued tasks")
+    args = parser.parse_args()
+
+    queue = get_task_queue()
+    if args.command == "stats":
+        print(json.dumps(queue.stats(), indent=2))
+    else:
+        for task_id in args.task_ids:
+            print(f"{task_id}: {'queued' if queue.enqueue(task_id, profile=args.profile) else 'already queued'}")
@@ -3,25 +3,40 @@
 # import pathlib
 
 from scripts.Extractor import DataExtractor
+from scripts.utils.docvectors import DOCUMENT_VECTORS_ENABLED
 # from scripts.KeytermsExtraction import KeytermExtractor
 # from scripts.utils.Utils import CountFrequency, TextCleaner
-from scripts.utils.Utils import TextCleaner
+
 
 SAVE_DIRECTORY = "../../Data/Processed/JobDescription"
 
 
 class ParseJobDesc:
 
-    def __init__(self, job_desc: str):
+    def __init__(self, job_desc: str, doc=None):
         self.job_desc_data = job_desc
-        self.clean_data = TextCleaner.clean_text(self.job_desc_data)
+        self.extractor = DataExtractor(self.job_desc_data, doc=doc)
+        self.clean_data = self.extractor.clean_text
         # self.entities = DataExtractor(self.clean_data).extract_entities()
-        self.key_words = DataExtractor(self.clean_data).extract_particular_words()
+        self.key_words = self.extractor.extract_particular_words()
+        self.document_vector = self.extractor.extract_document_vector() if DOCUMENT_VECTORS_ENABLED else None
         # self.pos_frequencies = CountFrequency(self.clean_data).count_frequency()
         # self.keyterms = KeytermExtractor(self.clean_data).get_keyterms_based_on_sgrank()
         # self.bi_grams = KeytermExtractor(self.clean_data).bi_gramchunker()
         # self.tri_grams = KeytermExtractor(self.clean_data).tri_gramchunker()
 
+    @classmethod
+    def pipe(cls, job_descs, batch_size: int = 64, n_process: int = 1):
+        """
+        Parses many job descriptions through one batched spaCy run and
+        yields a ParseJobDesc per description, in input order.
+        """
+        parsed_docs = DataExtractor.pipe_docs(
+            job_descs, batch_size=batch_size, n_process=n_process
+        )
+        for job_desc, doc in parsed_docs:
+            yield cls(job_desc, doc=doc)
+
     def get_JSON(self) -> dict:
         """
         Returns a dictionary of job description data.
@@ -32,6 +47,7 @@ class ParseJobDesc:
             # "clean_data": self.clean_data,
             # "entities": self.entities,
             "extracted_keywords": self.key_words,
+            "document_vector": self.document_vector,
             # "keyterms": self.keyterms,
             # "bi_grams": str(self.bi_grams),
             # "tri_grams": str(self.tri_grams),
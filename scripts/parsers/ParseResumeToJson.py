@@ -4,30 +4,45 @@
 # import pathlib
 
 from scripts.Extractor import DataExtractor
+from scripts.utils.docvectors import DOCUMENT_VECTORS_ENABLED
 # from scripts.KeytermsExtraction import KeytermExtractor
 # from scripts.utils.Utils import CountFrequency, TextCleaner
-from scripts.utils.Utils import TextCleaner, generate_unique_id
+from scripts.utils.Utils import generate_unique_id
 
 SAVE_DIRECTORY = "../../Data/Processed/Resumes"
 
 
 class ParseResume:
 
-    def __init__(self, resume: str):
+    def __init__(self, resume: str, doc=None):
         self.resume_data = resume
-        self.clean_data = TextCleaner.clean_text(self.resume_data)
+        self.extractor = DataExtractor(self.resume_data, doc=doc)
+        self.clean_data = self.extractor.clean_text
         # self.entities = DataExtractor(self.clean_data).extract_entities()
         # self.name = DataExtractor(self.clean_data[:30]).extract_names()
         # self.experience = DataExtractor(self.clean_data).extract_experience()
         # self.emails = DataExtractor(self.resume_data).extract_emails()
         # self.phones = DataExtractor(self.resume_data).extract_phone_numbers()
         # self.years = DataExtractor(self.clean_data).extract_position_year()
-        self.key_words = DataExtractor(self.clean_data).extract_particular_words()
+        self.key_words = self.extractor.extract_particular_words()
+        self.document_vector = self.extractor.extract_document_vector() if DOCUMENT_VECTORS_ENABLED else None
         # self.pos_frequencies = CountFrequency(self.clean_data).count_frequency()
         # self.keyterms = KeytermExtractor(self.clean_data).get_keyterms_based_on_sgrank()
         # self.bi_grams = KeytermExtractor(self.clean_data).bi_gramchunker()
         # self.tri_grams = KeytermExtractor(self.clean_data).tri_gramchunker()
 
+    @classmethod
+    def pipe(cls, resumes, batch_size: int = 64, n_process: int = 1):
+        """
+        Parses many resumes through one batched spaCy run and yields a
+        ParseResume per resume, in input order.
+        """
+        parsed_docs = DataExtractor.pipe_docs(
+            resumes, batch_size=batch_size, n_process=n_process
+        )
+        for resume, doc in parsed_docs:
+            yield cls(resume, doc=doc)
+
     def get_JSON(self) -> dict:
         """
         Returns a dictionary of resume data.
@@ -38,6 +53,7 @@ class ParseResume:
             # "clean_data": self.clean_data,
             # "entities": self.entities,
             "extracted_keywords": self.key_words,
+            "document_vector": self.document_vector,
             # "keyterms": self.keyterms,
             # "name": self.name,
             # "experience": self.experience,
@@ -1,14 +1,9 @@
 import re
 from uuid import uuid4
 
-import spacy
+import numpy as np
 
-try:
-    nlp = spacy.load("en_core_web_md")
-except OSError:
-    from spacy.cli import download
-    download("en_core_web_md")
-    nlp = spacy.load("en_core_web_md")
+from . import models
 
 REGEX_PATTERNS = {
     "email_pattern": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b",
@@ -27,6 +22,95 @@ def generate_unique_id():
     return str(uuid4())
 
 
+class CleaningEngine:
+    """
+    A text cleaner built once. Contact patterns are removed with
+    precompiled regexes, and punctuation/stopwords are removed by slicing
+    the text around the offending tokens of an already parsed Doc.
+    """
+
+    def __init__(self, patterns: dict = REGEX_PATTERNS):
+        """
+        Args:
+            patterns (dict): Regexes to strip, applied one after another in
+                insertion order.
+        """
+        self.patterns = [re.compile(pattern) for pattern in patterns.values()]
+
+    def strip_patterns(self, text: str) -> str:
+        """
+        Remove every email, phone number and link. Each pattern runs over
+        the output of the previous one, so e.g. the digits of a link are
+        removed as a phone number before the rest of the link is matched.
+
+        Args:
+            text (str): The input text.
+
+        Returns:
+            str: The text without the patterns.
+        """
+        for pattern in self.patterns:
+            text = pattern.sub("", text)
+        return text
+
+    def clean_doc(self, doc, drop_punct: bool = True, drop_stopwords: bool = False) -> str:
+        """
+        Rebuild the text of a parsed Doc without its punctuation and/or
+        stopword tokens, keeping all surrounding whitespace.
+
+        Args:
+            doc (spacy.tokens.Doc): The parsed text. POS tags are needed only
+                when dropping punctuation.
+            drop_punct (bool): Drop tokens tagged PUNCT.
+            drop_stopwords (bool): Drop stopword tokens.
+
+        Returns:
+            str: The cleaned text.
+        """
+        # spaCy is imported lazily so that importing this module stays cheap
+        from spacy.attrs import IDX, IS_STOP, LENGTH, POS
+        from spacy.parts_of_speech import PUNCT
+
+        if len(doc) == 0:
+            return doc.text
+        attrs = doc.to_array([IDX, LENGTH, POS, IS_STOP])
+        drop = np.zeros(len(doc), dtype=bool)
+        if drop_punct:
+            drop |= attrs[:, 2] == PUNCT
+        if drop_stopwords:
+            drop |= attrs[:, 3] == 1
+        if not drop.any():
+            return doc.text
+
+        text = doc.text
+        starts = attrs[drop, 0]
+        ends = starts + attrs[drop, 1]
+        pieces = [text[:starts[0]]]
+        pieces.extend(text[end:start] for end, start in zip(ends[:-1], starts[1:]))
+        pieces.append(text[ends[-1]:])
+        return "".join(pieces)
+
+    def clean(self, text: str, drop_punct: bool = True, drop_stopwords: bool = False) -> str:
+        """
+        Strip patterns, parse once and rebuild the text without the dropped
+        tokens.
+
+        Args:
+            text (str): The input text.
+            drop_punct (bool): Drop tokens tagged PUNCT.
+            drop_stopwords (bool): Drop stopword tokens.
+
+        Returns:
+            str: The cleaned text.
+        """
+        profile = "keywords" if drop_punct else "lexical"
+        doc = models.parse(self.strip_patterns(text), profile)
+        return self.clean_doc(doc, drop_punct=drop_punct, drop_stopwords=drop_stopwords)
+
+
+cleaner = CleaningEngine()
+
+
 class TextCleaner:
     """
     A class for cleaning a text by removing specific patterns.
@@ -42,49 +126,53 @@ class TextCleaner:
         Returns:
             str: The cleaned text.
         """
-        for pattern in REGEX_PATTERNS:
-            text = re.sub(REGEX_PATTERNS[pattern], "", text)
-        return text
+        return cleaner.strip_patterns(text)
 
-    def clean_text(text):
+    def clean_text(text, doc=None):
         """
-        Clean the input text by removing specific patterns.
+        Clean the input text by removing specific patterns and punctuation.
+
+        The text is rebuilt from token offsets, so punctuation is only dropped
+        where spaCy tagged a standalone PUNCT token.
 
         Args:
             text (str): The input text to clean.
+            doc (spacy.tokens.Doc, optional): A Doc already parsed from
+                ``TextCleaner.remove_emails_links(text)``. When omitted the
+                text is parsed here.
 
         Returns:
             str: The cleaned text.
         """
-        text = TextCleaner.remove_emails_links(text)
-        doc = nlp(text)
-        for token in doc:
-            if token.pos_ == "PUNCT":
-                text = text.replace(token.text, "")
-        return str(text)
+        if doc is None:
+            return cleaner.clean(text)
+        return cleaner.clean_doc(doc)
 
-    def remove_stopwords(text):
+    def remove_stopwords(text, doc=None):
         """
         Clean the input text by removing stopwords.
 
+        Only whole stopword tokens are removed; words that merely contain a
+        stopword are left intact.
+
         Args:
             text (str): The input text to clean.
+            doc (spacy.tokens.Doc, optional): A Doc already parsed from
+                ``text``.
 
         Returns:
             str: The cleaned text.
         """
-        doc = nlp(text)
-        for token in doc:
-            if token.is_stop:
-                text = text.replace(token.text, "")
-        return text
+        if doc is None:
+            doc = models.parse(text, "lexical")
+        return cleaner.clean_doc(doc, drop_punct=False, drop_stopwords=True)
 
 
 class CountFrequency:
 
-    def __init__(self, text):
+    def __init__(self, text, doc=None):
         self.text = text
-        self.doc = nlp(text)
+        self.doc = doc if doc is not None else models.parse(text, "keywords")
 
     def count_frequency(self):
         """
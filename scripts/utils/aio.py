@@ -0,0 +1,210 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from . import db, metrics
+
+# Async pool used by the request path; sized independently of the sync pool
+# since a single event loop can keep many more queries in flight
+ASYNC_DB_MIN_SIZE = int(os.getenv("ASYNC_DB_MIN_SIZE", "1"))
+ASYNC_DB_MAX_SIZE = int(os.getenv("ASYNC_DB_MAX_SIZE", "10"))
+# Threads running parsing and scoring off the event loop
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", "2"))
+
+_pool = None
+_pool_lock = asyncio.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+async def get_async_pool():
+    """
+    Returns the process-wide psycopg 3 AsyncConnectionPool, opening it on
+    first use.
+    """
+    global _pool
+    if _pool is not None:
+        return _pool
+    async with _pool_lock:
+        if _pool is None:
+            from psycopg_pool import AsyncConnectionPool
+
+            pool = AsyncConnectionPool(
+                db.PG_DSN,
+                min_size=ASYNC_DB_MIN_SIZE,
+                max_size=ASYNC_DB_MAX_SIZE,
+                open=False,
+            )
+            await pool.open()
+            _pool = pool
+    return _pool
+
+
+async def close_async_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def pool_stats() -> dict:
+    """
+    Returns psycopg_pool's counters for the async pool, or an empty dict
+    before first use.
+    """
+    return _pool.get_stats() if _pool is not None else {}
+
+
+# Each helper sends its statement, then the pool commits on return
+HELPER_ROUND_TRIPS = 2
+
+
+async def fetchone(query, params=None):
+    pool = await get_async_pool()
+    async with pool.connection() as conn:
+        db.count_round_trip(HELPER_ROUND_TRIPS)
+        with metrics.timed("db_query"):
+            cur = await conn.execute(query, params)
+            return await cur.fetchone()
+
+
+async def fetchall(query, params=None):
+    pool = await get_async_pool()
+    async with pool.connection() as conn:
+        db.count_round_trip(HELPER_ROUND_TRIPS)
+        with metrics.timed("db_query"):
+            cur = await conn.execute(query, params)
+            return await cur.fetchall()
+
+
+async def execute(query, params=None) -> int:
+    """
+    Run one statement in its own transaction.
+
+    Returns:
+        int: Number of rows affected.
+    """
+    pool = await get_async_pool()
+    async with pool.connection() as conn:
+        db.count_round_trip(HELPER_ROUND_TRIPS)
+        with metrics.timed("db_query"):
+            cur = await conn.execute(query, params)
+        return cur.rowcount
+
+
+async def stream_rows(query, params=None, chunk_size: int = db.DB_STREAM_CHUNK_SIZE):
+    """
+    Async counterpart of ``db.stream_rows``: yields lists of at most
+    ``chunk_size`` rows from a named server-side cursor.
+    """
+    pool = await get_async_pool()
+    async with pool.connection() as conn:
+        async with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cur:
+            db.count_round_trip()
+            with metrics.timed("db_query"):
+                await cur.execute(query, params)
+            while True:
+                db.count_round_trip()
+                with metrics.timed("db_query"):
+                    rows = await cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=CPU_EXECUTOR_WORKERS, thread_name_prefix="cpu")
+        return _executor
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """
+    Run blocking or CPU-bound work on the CPU executor so the event loop
+    keeps serving requests meanwhile.
+    """
+    loop = asyncio.get_running_loop()
+    # Carry context variables (e.g. the round-trip counter) into the thread
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_cpu_executor(), functools.partial(context.run, fn, *args, **kwargs)
+    )
+
+
+async def flush_batch(batch) -> dict:
+    """
+    Async counterpart of ``BatchUpdate.flush``: one transaction, a savepoint
+    per chunk, and row-by-row retry of failing chunks.
+
+    Args:
+        batch (BatchUpdate): The queued updates.
+
+    Returns:
+        dict: Error message per failed row key (an empty dict on success).
+    """
+    import psycopg
+    from psycopg import sql
+
+    if not batch.rows:
+        return {}
+
+    rows, batch.rows = batch.rows, []
+    columns = batch.key_columns + batch.value_columns
+    row_template = sql.SQL("({})").format(sql.SQL(", ").join(
+        sql.SQL("%s::{}").format(sql.SQL(batch.casts[col])) if col in batch.casts else sql.SQL("%s")
+        for col in columns
+    ))
+
+    def statement(n_rows):
+        return sql.SQL("""
+            UPDATE public.{table} AS t
+            SET {assignments}
+            FROM (VALUES {values}) AS v ({columns})
+            WHERE {conditions}
+        """).format(
+            table=sql.Identifier(batch.table),
+            assignments=sql.SQL(", ").join(
+                sql.SQL("{col} = v.{col}").format(col=sql.Identifier(col))
+                for col in batch.value_columns
+            ),
+            values=sql.SQL(", ").join([row_template] * n_rows),
+            columns=sql.SQL(", ").join(sql.Identifier(col) for col in columns),
+            conditions=sql.SQL(" AND ").join(
+                sql.SQL("t.{col} = v.{col}").format(col=sql.Identifier(col))
+                for col in batch.key_columns
+            ),
+        )
+
+    failures = {}
+    pool = await get_async_pool()
+    try:
+        async with pool.connection() as conn:
+            async with conn.transaction():
+                for start in range(0, len(rows), batch.chunk_size):
+                    chunk = rows[start:start + batch.chunk_size]
+                    try:
+                        # Nested transactions are savepoints
+                        async with conn.transaction():
+                            db.count_round_trip()
+                            with metrics.timed("db_query"):
+                                await conn.execute(statement(len(chunk)), [value for row in chunk for value in row])
+                    except psycopg.Error:
+                        for row in chunk:
+                            try:
+                                async with conn.transaction():
+                                    db.count_round_trip()
+                                    with metrics.timed("db_query"):
+                                        await conn.execute(statement(1), list(row))
+                            except psycopg.Error as e:
+                                failures[batch._row_key(row)] = str(e)
+    except Exception as e:
+        logging.exception(f"❌ Batch update of {batch.table} failed")
+        failures = {batch._row_key(row): str(e) for row in rows}
+    return failures
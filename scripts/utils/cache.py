@@ -0,0 +1,210 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Local, persistent keyword cache shared by every task handled on this host
+KEYWORD_CACHE_PATH = os.getenv("KEYWORD_CACHE_PATH", ".cache/keyword_cache.sqlite3")
+KEYWORD_CACHE_MAX_ENTRIES = int(os.getenv("KEYWORD_CACHE_MAX_ENTRIES", "50000"))
+KEYWORD_CACHE_ENABLED = os.getenv("KEYWORD_CACHE_ENABLED", "1") == "1"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class KeywordCache:
+    """
+    A size-bounded, LRU-evicted cache of extracted keywords keyed by the
+    content hash of a job description and the extraction pipeline version.
+    """
+
+    def __init__(self, path: str = KEYWORD_CACHE_PATH, max_entries: int = KEYWORD_CACHE_MAX_ENTRIES):
+        """
+        Open (and create if needed) the cache database.
+
+        Args:
+            path (str): Path of the SQLite file.
+            max_entries (int): Entries kept before least recently used ones
+                are evicted.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS keyword_cache (
+                key TEXT PRIMARY KEY,
+                pipeline_version TEXT NOT NULL,
+                keywords TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS keyword_cache_last_used ON keyword_cache (last_used)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(content: str, pipeline_version: str) -> str:
+        """
+        Hash whitespace-normalized content together with the pipeline version.
+
+        Args:
+            content (str): The raw HTML or text of a job description.
+            pipeline_version (str): Tag identifying the extraction pipeline.
+
+        Returns:
+            str: The cache key.
+        """
+        normalized = _WHITESPACE.sub(" ", content or "").strip()
+        digest = hashlib.sha256()
+        digest.update(pipeline_version.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalized.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get_many(self, keys) -> dict:
+        """
+        Look up several keys at once and mark the hits as recently used.
+
+        Args:
+            keys (iterable): Cache keys from ``make_key``.
+
+        Returns:
+            dict: Cached entries for the keys that were found: keyword
+            lists, or parsed JSON when stored with a document vector.
+        """
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, keywords FROM keyword_cache WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                found.update((key, json.loads(keywords)) for key, keywords in rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE keyword_cache SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, entries: dict, pipeline_version: str):
+        """
+        Store keyword lists and evict least recently used entries past the
+        size bound.
+
+        Args:
+            entries (dict): Mapping of cache key to keyword list, or to
+                JSON-serializable parsed output.
+            pipeline_version (str): Tag the keywords were extracted with.
+        """
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO keyword_cache (key, pipeline_version, keywords, last_used)
+                VALUES (?, ?, ?, ?)
+                """,
+                [(key, pipeline_version, json.dumps(keywords), now) for key, keywords in entries.items()],
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM keyword_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                """
+                DELETE FROM keyword_cache WHERE key IN (
+                    SELECT key FROM keyword_cache ORDER BY last_used ASC LIMIT ?
+                )
+                """,
+                (overflow,),
+            )
+            logging.info(f"🧹 Evicted {overflow} keyword cache entries")
+
+    def invalidate(self, keep_version: str = None) -> int:
+        """
+        Drop entries produced by other pipeline versions, or everything.
+
+        Args:
+            keep_version (str, optional): Pipeline version whose entries are
+                kept. When omitted the whole cache is cleared.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        with self._lock:
+            if keep_version is None:
+                cur = self._conn.execute("DELETE FROM keyword_cache")
+            else:
+                cur = self._conn.execute(
+                    "DELETE FROM keyword_cache WHERE pipeline_version != ?", (keep_version,)
+                )
+            self._conn.commit()
+            return cur.rowcount
+
+    def stats(self) -> dict:
+        """
+        Returns the number of entries per pipeline version.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT pipeline_version, COUNT(*) FROM keyword_cache GROUP BY pipeline_version"
+            ).fetchall()
+        return dict(rows)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_keyword_cache():
+    """
+    Returns the process-wide KeywordCache, or None when caching is disabled.
+    """
+    global _cache
+    if not KEYWORD_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = KeywordCache()
+            except (sqlite3.Error, OSError) as e:
+                logging.warning(f"⚠️ Keyword cache unavailable, continuing without it: {e}")
+                return None
+    return _cache
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or invalidate the job keyword cache.")
+    parser.add_argument("command", choices=["stats", "clear", "purge-stale"])
+    args = parser.parse_args()
+
+    cache = KeywordCache()
+    if args.command == "stats":
+        print(json.dumps(cache.stats(), indent=2))
+    elif args.command == "clear":
+        print(f"Removed {cache.invalidate()} entries")
+    else:
+        from scripts.Extractor import pipeline_version
+        print(f"Removed {cache.invalidate(keep_version=pipeline_version())} entries")
@@ -1,45 +1,418 @@
 from psycopg2.pool import ThreadedConnectionPool
+from psycopg2 import sql
+from psycopg2.extras import execute_values
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+import contextlib
+import contextvars
 import logging
+import os
+import threading
+import time
+import uuid
 
-# PostgreSQL connection string (DSN)
-PG_DSN = (
+from . import metrics
+
+# PostgreSQL connection string (DSN); PG_DSN overrides the default
+PG_DSN = os.getenv("PG_DSN") or (
     "postgresql://neondb_owner:npg_SfzAVOih23Xp"
     "@ep-fancy-sunset-a1xqv7sq-pooler.ap-southeast-1.aws.neon.tech"
     "/jobgenai?sslmode=require"
 )
 
-# Singleton pool using DSN
-pool = ThreadedConnectionPool(
-    minconn=1,
-    maxconn=5,
-    dsn=PG_DSN
-)
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "5"))
+# Seconds get_conn waits for a free connection before giving up
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connections idle for longer than this are checked with SELECT 1 before
+# being handed out; recently used ones are trusted
+DB_VALIDATE_IDLE_SECONDS = float(os.getenv("DB_VALIDATE_IDLE_SECONDS", "30"))
+
+# Rows per multi-row UPDATE statement in BatchUpdate.flush
+DB_WRITE_CHUNK_SIZE = int(os.getenv("DB_WRITE_CHUNK_SIZE", "500"))
+# Rows fetched per round trip when a query is read through a server-side cursor
+DB_STREAM_CHUNK_SIZE = int(os.getenv("DB_STREAM_CHUNK_SIZE", "500"))
+
+
+# Counter of the task being processed in this thread or coroutine, if any
+_round_trips = contextvars.ContextVar("db_round_trips", default=None)
+
+
+class RoundTrips:
+    def __init__(self):
+        self.count = 0
+
+
+@contextlib.contextmanager
+def track_round_trips():
+    """
+    Count the database round trips made inside the block, including those
+    of executor threads started with aio.run_cpu.
+
+    Yields:
+        RoundTrips: Its ``count`` grows as statements are sent.
+    """
+    trips = RoundTrips()
+    token = _round_trips.set(trips)
+    try:
+        yield trips
+    finally:
+        _round_trips.reset(token)
+
+
+def count_round_trip(n: int = 1):
+    trips = _round_trips.get()
+    if trips is not None:
+        trips.count += n
+
+
+class CountingCursor(psycopg2.extensions.cursor):
+    def execute(self, query, vars=None):
+        count_round_trip()
+        with metrics.timed("db_query"):
+            return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        vars_list = list(vars_list)
+        count_round_trip(len(vars_list))
+        with metrics.timed("db_query"):
+            return super().executemany(query, vars_list)
+
+
+class CountingConnection(psycopg2.extensions.connection):
+    """
+    Connection whose cursors, commits and rollbacks count as round trips.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursor_factory = CountingCursor
+
+    def commit(self):
+        if self.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            count_round_trip()
+        return super().commit()
+
+    def rollback(self):
+        if self.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            count_round_trip()
+        return super().rollback()
+
+
+class InstrumentedPool(ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool that waits for a free connection instead of
+    failing when exhausted, validates only connections that sat idle, and
+    counts what it does so the pool can be sized from data.
+    """
+
+    def __init__(self, minconn, maxconn, *args, timeout=DB_POOL_TIMEOUT,
+                 validate_idle_seconds=DB_VALIDATE_IDLE_SECONDS, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.timeout = timeout
+        self.validate_idle_seconds = validate_idle_seconds
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._stats_lock = threading.Lock()
+        now = time.monotonic()
+        self._last_used = {id(conn): now for conn in self._pool}
+        self.stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "waitSecondsTotal": 0.0,
+            "waitSecondsMax": 0.0,
+            "validations": 0,
+            "validationFailures": 0,
+            "inUse": 0,
+            "peakInUse": 0,
+        }
+
+    def getconn(self, key=None):
+        start = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            self._count("waits")
+            if not self._slots.acquire(timeout=self.timeout):
+                self._count("timeouts")
+                raise psycopg2.pool.PoolError(
+                    f"timed out after {self.timeout:g}s waiting for one of {self.maxconn} connections"
+                )
+        waited = time.monotonic() - start
+        try:
+            conn = self._checkout(key)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._stats_lock:
+            stats = self.stats
+            stats["checkouts"] += 1
+            stats["waitSecondsTotal"] += waited
+            stats["waitSecondsMax"] = max(stats["waitSecondsMax"], waited)
+            stats["inUse"] += 1
+            stats["peakInUse"] = max(stats["peakInUse"], stats["inUse"])
+        return conn
+
+    def _checkout(self, key):
+        # Every idle connection may have gone stale; a newly opened one ends the loop
+        for _ in range(self.maxconn + 1):
+            conn = super().getconn(key)
+            if self._is_alive(conn):
+                return conn
+            self._last_used.pop(id(conn), None)
+            super().putconn(conn, key, close=True)
+        raise psycopg2.OperationalError("Could not establish valid DB connection")
+
+    def _is_alive(self, conn) -> bool:
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        # Connections the pool has just opened have never been idle
+        if last_used is None or time.monotonic() - last_used < self.validate_idle_seconds:
+            return True
+        self._count("validations")
+        if validate_connection(conn):
+            return True
+        self._count("validationFailures")
+        return False
+
+    def putconn(self, conn, key=None, close=False):
+        if close or conn.closed:
+            self._last_used.pop(id(conn), None)
+        else:
+            self._last_used[id(conn)] = time.monotonic()
+        super().putconn(conn, key, close)
+        with self._stats_lock:
+            self.stats["inUse"] -= 1
+        self._slots.release()
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Returns the counters plus the pool's current shape.
+        """
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats.update({
+            "minSize": self.minconn,
+            "maxSize": self.maxconn,
+            "idle": len(self._pool),
+            "saturation": stats["inUse"] / self.maxconn,
+        })
+        return stats
+
+
+# Singleton pool using DSN, created on first checkout so that importing
+# the package (e.g. from offline benchmarks) does not open a connection
+pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global pool
+    with _pool_lock:
+        if pool is None:
+            pool = InstrumentedPool(
+                minconn=DB_POOL_MIN_SIZE,
+                maxconn=DB_POOL_MAX_SIZE,
+                dsn=PG_DSN,
+                connection_factory=CountingConnection,
+            )
+    return pool
+
+# Pools inherited through fork. They stay referenced so the child never
+# finalizes or closes their connections: closing one sends Terminate on a
+# socket the parent is still using
+_inherited_pools = []
+
+def _forget_pool_in_child():
+    # Connections inherited through fork belong to the parent process; the
+    # child opens its own pool on first use instead of sharing their sockets
+    global pool, _pool_lock
+    if pool is not None:
+        _inherited_pools.append(pool)
+    pool = None
+    _pool_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_forget_pool_in_child)
 
 def validate_connection(conn):
     try:
         with conn.cursor() as cur:
             cur.execute("SELECT 1")
             cur.fetchone()
+        conn.rollback()
         return True
     except (psycopg2.InterfaceError, psycopg2.OperationalError) as e:
         logging.warning(f"Connection validation failed: {e}")
         return False
 
 def get_conn():
-    conn = pool.getconn()
-    if not validate_connection(conn):
-        try:
-            conn.close()
-        except Exception:
-            pass
-        conn = pool.getconn()
-        if not validate_connection(conn):
-            raise psycopg2.OperationalError("Could not establish valid DB connection")
-    return conn
+    return get_pool().getconn()
 
 def put_conn(conn):
-    pool.putconn(conn)
+    get_pool().putconn(conn)
+
+def stream_rows(query, params=None, chunk_size: int = DB_STREAM_CHUNK_SIZE):
+    """
+    Yield the rows of a query in lists of at most ``chunk_size``, read
+    through a named server-side cursor so that only one chunk is held in
+    memory. The connection stays checked out, in one read transaction,
+    until the generator is exhausted or closed.
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cur:
+            cur.execute(query, params)
+            while True:
+                count_round_trip()
+                with metrics.timed("db_query"):
+                    rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        conn.commit()
+    except BaseException:
+        # Including GeneratorExit, when the consumer stops early
+        conn.rollback()
+        raise
+    finally:
+        put_conn(conn)
+
+def pool_stats() -> dict:
+    """
+    Returns the sync pool's counters, or an empty dict before first use.
+    """
+    return pool.snapshot() if pool is not None else {}
 
 def close_all():
-    pool.closeall()
+    """
+    Close every pooled connection, e.g. before forking processes that do
+    not need them. The next checkout opens a new pool.
+    """
+    global pool
+    with _pool_lock:
+        if pool is not None:
+            pool.closeall()
+            pool = None
+
+
+class BatchUpdate:
+    """
+    Collects row updates for one table and flushes them in a single
+    transaction using multi-row ``UPDATE ... FROM (VALUES ...)`` statements.
+    """
+
+    def __init__(self, table, key_columns, value_columns, casts=None,
+                 chunk_size=DB_WRITE_CHUNK_SIZE):
+        """
+        Args:
+            table (str): Table name in the public schema, e.g. "Job".
+            key_columns (list): Columns identifying the row to update.
+            value_columns (list): Columns to set.
+            casts (dict, optional): SQL type per column for the VALUES list,
+                e.g. {"keywords": "text[]"}.
+            chunk_size (int): Rows per UPDATE statement.
+        """
+        self.table = table
+        self.key_columns = list(key_columns)
+        self.value_columns = list(value_columns)
+        self.casts = casts or {}
+        self.chunk_size = max(1, chunk_size)
+        self.rows = []
+
+    def add(self, *row):
+        """
+        Queue one update; key values first, then values, in column order.
+        """
+        self.rows.append(tuple(row))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _row_key(self, row):
+        keys = row[:len(self.key_columns)]
+        return keys[0] if len(keys) == 1 else keys
+
+    def _statement(self):
+        columns = self.key_columns + self.value_columns
+        return sql.SQL("""
+            UPDATE public.{table} AS t
+            SET {assignments}
+            FROM (VALUES %s) AS v ({columns})
+            WHERE {conditions}
+        """).format(
+            table=sql.Identifier(self.table),
+            assignments=sql.SQL(", ").join(
+                sql.SQL("{col} = v.{col}").format(col=sql.Identifier(col))
+                for col in self.value_columns
+            ),
+            columns=sql.SQL(", ").join(sql.Identifier(col) for col in columns),
+            conditions=sql.SQL(" AND ").join(
+                sql.SQL("t.{col} = v.{col}").format(col=sql.Identifier(col))
+                for col in self.key_columns
+            ),
+        )
+
+    def _template(self):
+        columns = self.key_columns + self.value_columns
+        return "(" + ", ".join(
+            f"%s::{self.casts[col]}" if col in self.casts else "%s" for col in columns
+        ) + ")"
+
+    def flush(self) -> dict:
+        """
+        Write every queued row in one transaction. When a chunk fails it is
+        retried row by row so that only the offending rows are reported.
+
+        Returns:
+            dict: Error message per failed row key (an empty dict on success).
+        """
+        if not self.rows:
+            return {}
+
+        rows, self.rows = self.rows, []
+        failures = {}
+        conn = get_conn()
+        try:
+            with conn.cursor() as cur:
+                statement = self._statement().as_string(conn)
+                template = self._template()
+                for start in range(0, len(rows), self.chunk_size):
+                    chunk = rows[start:start + self.chunk_size]
+                    cur.execute("SAVEPOINT batch_chunk")
+                    try:
+                        execute_values(cur, statement, chunk, template=template, page_size=len(chunk))
+                    except psycopg2.Error:
+                        cur.execute("ROLLBACK TO SAVEPOINT batch_chunk")
+                        failures.update(self._retry_rows(cur, statement, template, chunk))
+                    cur.execute("RELEASE SAVEPOINT batch_chunk")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.exception(f"❌ Batch update of {self.table} failed")
+            failures = {self._row_key(row): str(e) for row in rows}
+        finally:
+            put_conn(conn)
+        return failures
+
+    async def flush_async(self) -> dict:
+        """
+        Async counterpart of ``flush`` on the psycopg 3 pool.
+        """
+        from .aio import flush_batch
+        return await flush_batch(self)
+
+    def _retry_rows(self, cur, statement, template, chunk):
+        failures = {}
+        for row in chunk:
+            cur.execute("SAVEPOINT batch_row")
+            try:
+                execute_values(cur, statement, [row], template=template)
+                cur.execute("RELEASE SAVEPOINT batch_row")
+            except psycopg2.Error as e:
+                cur.execute("ROLLBACK TO SAVEPOINT batch_row")
+                failures[self._row_key(row)] = str(e)
+        return failures
\ No newline at end of file
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+
+from .models import SPACY_MODEL, model_version
+
+# "tfidf" scores keyword containment; "semantic" scores the cosine
+# similarity of spaCy document vectors. A task is scored in one mode only:
+# TF-IDF throughout while its resume or any of its jobs has no vector yet
+SCORE_MODE = os.getenv("SCORE_MODE", "tfidf")
+# Compute and store a document vector per Job and Resume during the spaCy
+# pass; always on in semantic mode
+DOCUMENT_VECTORS_ENABLED = SCORE_MODE == "semantic" or os.getenv("DOCUMENT_VECTORS_ENABLED", "0") == "1"
+
+
+def vector_model() -> str:
+    """
+    Tag of the pipeline document vectors come from. Vectors with different
+    tags live in different spaces and are never compared.
+    """
+    return f"{SPACY_MODEL}-{model_version()}"
+
+
+def document_vector(doc):
+    """
+    The L2-normalized vector of a parsed Doc: the mean of its token vectors,
+    or of its tok2vec output for pipelines without static vectors.
+
+    Returns:
+        list | None: The float32 components, or None when the Doc has no
+        vector.
+    """
+    vector = np.asarray(doc.vector, dtype=np.float32)
+    norm = float(np.linalg.norm(vector)) if vector.size else 0.0
+    if not np.isfinite(norm) or norm == 0:
+        return None
+    return (vector / norm).tolist()
+
+
+def current_vector(document_vector_row, model: str):
+    """
+    The stored vector of a document if it came from ``model``.
+
+    Args:
+        document_vector_row (tuple | None): ``(vector model, components)``
+            as loaded with the document.
+        model (str): The current ``vector_model()``.
+
+    Returns:
+        list | None: The components, or None.
+    """
+    if document_vector_row is None:
+        return None
+    stored_model, components = document_vector_row
+    return components if stored_model == model and components else None
+
+
+def is_vectorized(document_vector_row, model: str) -> bool:
+    """
+    Whether a document has been through ``model``, including documents
+    whose text had no vector.
+    """
+    return document_vector_row is not None and document_vector_row[0] == model
+
+
+def vector_matrix(vectors) -> np.ndarray:
+    """
+    Stack document vectors into a float32 matrix, one row per document.
+    """
+    return np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+
+
+def vector_columns(alias: str) -> str:
+    """
+    SELECT list of a row's vector model and document vector. Outside
+    semantic mode it selects NULLs, so job queries do not ship vectors
+    nobody scores with.
+    """
+    if SCORE_MODE != "semantic":
+        return "NULL::text, NULL::real[]"
+    return f'{alias}."documentVectorModel", {alias}."documentVector"'
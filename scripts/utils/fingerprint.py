@@ -0,0 +1,34 @@
+import hashlib
+
+from .cache import KeywordCache
+
+# Content fingerprints used to skip work whose inputs have not changed
+
+
+def source_hash(text: str, pipeline_version: str) -> str:
+    """
+    Fingerprint of a raw document under an extraction pipeline version, as
+    stored in "keywordsSourceHash".
+    """
+    return KeywordCache.make_key(text, pipeline_version)
+
+
+def keywords_hash(counts) -> str:
+    """
+    Fingerprint of a keyword count map, as stored in "keywordsHash". It
+    does not depend on the order of the keywords.
+    """
+    digest = hashlib.sha256()
+    for keyword, count in sorted((counts or {}).items()):
+        digest.update(f"{keyword}\0{count}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def score_inputs_hash(resume_hash: str, job_hash: str, model_version: str) -> str:
+    """
+    Fingerprint of everything a similarity score depends on, as stored in
+    "scoreInputsHash" next to it. ``model_version`` is the IDF model's
+    rebuild version, so frequencies counted in since the score was computed
+    do not make it stale.
+    """
+    return hashlib.sha256(f"{resume_hash}:{job_hash}:{model_version}".encode("utf-8")).hexdigest()
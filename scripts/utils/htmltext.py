@@ -0,0 +1,148 @@
+from html.entities import html5
+from html.parser import HTMLParser
+
+# Elements whose text is not page text; BeautifulSoup's get_text leaves out
+# the same ones
+HIDDEN_TAGS = frozenset(["script", "style", "template", "rt", "rp"])
+
+# Elements that never have content, so they are never left open
+VOID_TAGS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem",
+    "meta", "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame",
+    "image", "isindex", "nextid", "spacer",
+])
+
+# Elements that start a new line of text where they open or close
+BLOCK_TAGS = frozenset([
+    "address", "article", "aside", "blockquote", "body", "br", "caption", "dd", "details",
+    "dialog", "div", "dl", "dt", "fieldset", "figcaption", "figure", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "head", "header", "hr", "html", "legend", "li",
+    "main", "nav", "ol", "p", "pre", "section", "summary", "table", "tbody", "td", "tfoot",
+    "th", "thead", "title", "tr", "ul",
+])
+
+
+class HTMLTextExtractor(HTMLParser):
+    """
+    Collects the text of an HTML document from the parser's events as they
+    arrive, without building a tree. Markup can be fed in pieces.
+
+    The text matches ``BeautifulSoup(html, "html.parser").get_text(" ", strip=True)``
+    except that the separator is a newline wherever a block element opens
+    or closes.
+    """
+
+    def __init__(self):
+        # References are resolved here, the way BeautifulSoup resolves them
+        super().__init__(convert_charrefs=False)
+        self.parts = []
+        # Names of the open elements, innermost last, and how many of them
+        # are hidden
+        self._open = []
+        self._hidden = 0
+        self._pending = []
+        self._block = False
+
+    def text(self) -> str:
+        self._flush()
+        return "".join(self.parts)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def _add(self, text: str):
+        text = text.strip()
+        if not text:
+            return
+        if self.parts:
+            self.parts.append("\n" if self._block else " ")
+        self.parts.append(text)
+        self._block = False
+
+    def _flush(self):
+        # Adjacent data events form one string until the next markup event
+        if self._pending:
+            self._add("".join(self._pending))
+            self._pending.clear()
+
+    def handle_data(self, data):
+        if not self._hidden:
+            self._pending.append(data)
+
+    def handle_charref(self, name):
+        number = int(name[1:], 16) if name[:1] in "xX" else int(name)
+        data = None
+        if number < 256:
+            # Numbers below 256 are often meant as Windows-1252, e.g. &#147;
+            try:
+                data = bytes([number]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(number)
+            except (ValueError, OverflowError):
+                pass
+        self.handle_data(data or "\N{REPLACEMENT CHARACTER}")
+
+    def handle_entityref(self, name):
+        # An unknown name is kept as literal text
+        self.handle_data(html5.get(f"{name};", f"&{name}"))
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in BLOCK_TAGS:
+            self._block = True
+        if tag in VOID_TAGS:
+            return
+        self._open.append(tag)
+        if tag in HIDDEN_TAGS:
+            self._hidden += 1
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in BLOCK_TAGS:
+            self._block = True
+        # A stray end tag is ignored; otherwise it closes every element
+        # opened inside the one it ends
+        if tag not in self._open:
+            return
+        while True:
+            name = self._open.pop()
+            if name in HIDDEN_TAGS:
+                self._hidden -= 1
+            if name == tag:
+                return
+
+    def unknown_decl(self, data):
+        self._flush()
+        if data.upper().startswith("CDATA["):
+            self._add(data[len("CDATA["):])
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+
+def html_to_text(html: str) -> str:
+    """
+    Extract the visible text of an HTML document. Script, style and template
+    contents, comments and declarations are dropped; block elements are
+    separated by newlines and other strings by a space.
+
+    Args:
+        html (str): The HTML markup.
+
+    Returns:
+        str: The text.
+    """
+    extractor = HTMLTextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor.text()
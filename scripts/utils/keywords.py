@@ -0,0 +1,111 @@
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import CountVectorizer
+
+# Same tokenization TfidfVectorizer applies to space-joined keywords
+analyze = CountVectorizer().build_analyzer()
+
+# Distinct keywords whose analyzed terms are kept in memory
+KEYWORD_TERMS_CACHE_SIZE = 100_000
+
+
+def count_keywords(keywords) -> dict:
+    """
+    Returns:
+        dict: Occurrences per distinct keyword, in order of first occurrence.
+    """
+    return dict(Counter(keywords))
+
+
+def keyword_counts(counts, keywords):
+    """
+    The keyword count map of a stored row. "keywords" holds each distinct
+    keyword once and "keywordCounts" its occurrences at the same position;
+    rows written before "keywordCounts" existed hold every occurrence in
+    "keywords" instead.
+
+    Returns:
+        dict | None: None when the row has no keywords yet.
+    """
+    if keywords is None:
+        return None
+    if counts is not None and len(counts) == len(keywords):
+        return dict(zip(keywords, counts))
+    return count_keywords(keywords)
+
+
+def save_values(keywords) -> tuple:
+    """
+    Returns:
+        tuple: The distinct keywords and their counts, as stored in
+        "keywords" and "keywordCounts", and the count map.
+    """
+    counts = count_keywords(keywords)
+    return list(counts), list(counts.values()), counts
+
+
+@lru_cache(maxsize=KEYWORD_TERMS_CACHE_SIZE)
+def _analyze_keyword(keyword: str) -> tuple:
+    return tuple(analyze(keyword))
+
+
+def term_counts(counts) -> Counter:
+    """
+    Analyzed term counts of a keyword count map (or a plain keyword list),
+    equal to ``Counter(analyze(" ".join(keywords)))`` but tokenizing each
+    distinct keyword only once per process.
+    """
+    if not isinstance(counts, dict):
+        counts = count_keywords(counts or [])
+    terms = Counter()
+    for keyword, count in counts.items():
+        for term in _analyze_keyword(keyword):
+            terms[term] += count
+    return terms
+
+
+def split_terms(counts) -> set:
+    """
+    The distinct whitespace-separated terms of the keywords, as
+    ``set(" ".join(keywords).split())`` gives them.
+    """
+    return set(" ".join(counts).split())
+
+
+def count_matrix(documents) -> tuple:
+    """
+    Document-term matrix of term count maps, with columns in sorted term
+    order as CountVectorizer lays them out.
+
+    Args:
+        documents (list): A mapping of term to count (or an iterable of
+            terms, each counted once) per document.
+
+    Returns:
+        tuple: The float64 CSR matrix and its terms.
+
+    Raises:
+        ValueError: No document has any term.
+    """
+    vocabulary, indices, data, indptr = {}, [], [], [0]
+    for document in documents:
+        items = document.items() if isinstance(document, dict) else ((term, 1) for term in document)
+        for term, count in items:
+            indices.append(vocabulary.setdefault(term, len(vocabulary)))
+            data.append(count)
+        indptr.append(len(indices))
+    if not vocabulary:
+        raise ValueError("empty vocabulary; documents have no terms")
+
+    terms = sorted(vocabulary)
+    columns = np.empty(len(terms), dtype=np.int64)
+    columns[[vocabulary[term] for term in terms]] = np.arange(len(terms))
+    matrix = csr_matrix(
+        (np.asarray(data, dtype=np.float64), columns[np.asarray(indices, dtype=np.int64)], indptr),
+        shape=(len(indptr) - 1, len(terms)),
+    )
+    matrix.sort_indices()
+    return matrix, terms
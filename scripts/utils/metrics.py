@@ -0,0 +1,169 @@
+import contextlib
+import logging
+import os
+import threading
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# With several processes (API plus workers, or a process pool) every process
+# writes its samples under this directory and /metrics aggregates them. It
+# must be set, and emptied, before any of the processes start.
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Without PROMETHEUS_MULTIPROC_DIR the API's /metrics only covers the API
+# process, so each worker process serves its own metrics: worker slot i on
+# port WORKER_METRICS_PORT + i. 0 disables them.
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9101"))
+
+# Timed pipeline stages; "spacy" is model time alone, "resume_parse" the
+# whole resume extraction around it
+STAGES = ["resume_parse", "html_to_text", "spacy", "keyword_save", "scoring", "db_query"]
+
+STAGE_SECONDS = Histogram(
+    "jobmatch_stage_seconds",
+    "Time spent in each pipeline stage.",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+TASKS = Counter("jobmatch_tasks_total", "Job match tasks run, by outcome.", ["outcome"])
+# rate(jobmatch_documents_total[1m]) gives documents processed per second
+DOCUMENTS = Counter("jobmatch_documents_total", "Documents parsed into keywords.", ["kind"])
+IN_FLIGHT = Gauge("jobmatch_tasks_in_flight", "Tasks currently running.", multiprocess_mode="livesum")
+
+# Label children are resolved once, so recording costs a lock and an add
+_stage_timers = {stage: STAGE_SECONDS.labels(stage) for stage in STAGES}
+_documents = {kind: DOCUMENTS.labels(kind) for kind in ("resume", "job")}
+
+
+@contextlib.contextmanager
+def timed(stage: str):
+    """
+    Record the time spent inside the block under ``stage``.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stage_timers[stage].observe(time.perf_counter() - start)
+
+
+def observe(stage: str, seconds: float):
+    _stage_timers[stage].observe(seconds)
+
+
+def count_task(outcome: str):
+    """
+    Args:
+        outcome (str): "success", "failed" or "skipped" (task not found).
+    """
+    TASKS.labels(outcome).inc()
+
+
+def count_documents(kind: str, n: int = 1):
+    if n:
+        _documents[kind].inc(n)
+
+
+def in_flight(n: int = 1):
+    """
+    Context manager counting ``n`` tasks as in flight while it is open.
+    """
+    return _InFlight(n)
+
+
+class _InFlight:
+    def __init__(self, n):
+        self.n = n
+
+    def __enter__(self):
+        IN_FLIGHT.inc(self.n)
+
+    def __exit__(self, *exc):
+        IN_FLIGHT.dec(self.n)
+
+
+class ScrapeTimeCollector:
+    """
+    Gauges read only when /metrics is scraped: task queue depth and the
+    database pool counters of the serving process.
+    """
+
+    def collect(self):
+        from . import aio, db
+        from ..TaskQueue import get_task_queue
+
+        depth = GaugeMetricFamily("jobmatch_queue_tasks", "Task queue entries by status.", labels=["status"])
+        try:
+            for status, count in get_task_queue().stats().items():
+                depth.add_metric([status], count)
+        except Exception:
+            logging.exception("❌ Error reading task queue depth for metrics")
+        yield depth
+
+        pools = GaugeMetricFamily(
+            "jobmatch_db_pool", "Database pool counters of this process.", labels=["pool", "counter"]
+        )
+        for name, stats in (("sync", db.pool_stats()), ("async", aio.pool_stats())):
+            for counter, value in stats.items():
+                if isinstance(value, (int, float)):
+                    pools.add_metric([name, counter], value)
+        yield pools
+
+
+_scrape_registry = None
+_scrape_registry_lock = threading.Lock()
+
+
+def scrape_registry() -> CollectorRegistry:
+    """
+    The registry a scrape reads: every process's samples in multiprocess
+    mode, this process's otherwise, plus the scrape-time gauges.
+    """
+    global _scrape_registry
+    with _scrape_registry_lock:
+        if _scrape_registry is None:
+            if PROMETHEUS_MULTIPROC_DIR:
+                _scrape_registry = CollectorRegistry()
+                multiprocess.MultiProcessCollector(_scrape_registry)
+            else:
+                _scrape_registry = REGISTRY
+            _scrape_registry.register(ScrapeTimeCollector())
+    return _scrape_registry
+
+
+def render() -> tuple:
+    """
+    Returns:
+        tuple: The metrics page in the Prometheus text format and its
+        content type.
+    """
+    return generate_latest(scrape_registry()), CONTENT_TYPE_LATEST
+
+
+def serve(port: int):
+    """
+    Serve this process's metrics over HTTP on ``port``, from a daemon
+    thread, for processes outside the API such as workers.
+    """
+    start_http_server(port, registry=scrape_registry())
+    logging.info(f"📈 Serving metrics on port {port}")
+
+
+def mark_process_dead(pid: int):
+    """
+    Drop the live gauges of a process that exited, in multiprocess mode.
+    """
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
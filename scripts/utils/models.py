@@ -0,0 +1,187 @@
+import logging
+import os
+import threading
+import time
+from importlib import metadata
+
+from . import metrics
+
+# spaCy pipeline used for cleaning and keyword extraction
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_md")
+
+# Pipeline components each DataExtractor feature needs. Coarse POS tags
+# come from the tagger plus the attribute ruler, both fed by the shared
+# tok2vec (or transformer) layer; entities come from the NER component.
+POS_COMPONENTS = ("tok2vec", "transformer", "tagger", "attribute_ruler")
+NER_COMPONENTS = ("tok2vec", "transformer", "ner")
+FEATURE_COMPONENTS = {
+    "clean_text": POS_COMPONENTS,
+    "remove_stopwords": (),
+    "extract_particular_words": POS_COMPONENTS,
+    "extract_names": NER_COMPONENTS,
+    "extract_entities": NER_COMPONENTS,
+    "extract_experience": (),
+    "extract_links": (),
+    "extract_emails": (),
+    "extract_phone_numbers": (),
+    "extract_position_year": (),
+    "count_frequency": POS_COMPONENTS,
+}
+
+_models = {}
+_lock = threading.Lock()
+
+
+class ExtractionProfile:
+    """
+    A named set of DataExtractor features. Parsing under a profile runs only
+    the pipeline components those features need.
+    """
+
+    def __init__(self, name: str, features):
+        unknown = set(features) - set(FEATURE_COMPONENTS)
+        if unknown:
+            raise ValueError(f"Unknown extraction features: {sorted(unknown)}")
+        self.name = name
+        self.features = frozenset(features)
+        self.components = frozenset(
+            component for feature in self.features for component in FEATURE_COMPONENTS[feature]
+        )
+
+    def disabled(self, nlp) -> list:
+        """
+        Names of the components of ``nlp`` this profile does not need.
+        """
+        return [name for name in nlp.pipe_names if name not in self.components]
+
+    def __repr__(self):
+        return f"ExtractionProfile({self.name!r}, {sorted(self.features)})"
+
+
+PROFILES = {
+    "keywords": ExtractionProfile("keywords", ["clean_text", "extract_particular_words"]),
+    "entities": ExtractionProfile("entities", ["clean_text", "extract_names", "extract_entities"]),
+    "full": ExtractionProfile("full", FEATURE_COMPONENTS),
+    # Tokenizer and lexical attributes only
+    "lexical": ExtractionProfile("lexical", ["remove_stopwords", "extract_experience"]),
+}
+
+
+def get_profile(profile) -> ExtractionProfile:
+    """
+    Resolve a profile name (or pass through a profile object).
+    """
+    if isinstance(profile, ExtractionProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown extraction profile: {profile}") from None
+
+
+def get_nlp(name: str = SPACY_MODEL):
+    """
+    Return the named spaCy pipeline, loading it on first use.
+
+    Models are never downloaded here; a missing model is a deployment error
+    and fails loudly instead of hanging on network access.
+
+    Args:
+        name (str): Installed package name or path of the pipeline.
+
+    Returns:
+        spacy.language.Language: The loaded pipeline.
+    """
+    nlp = _models.get(name)
+    if nlp is not None:
+        return nlp
+    with _lock:
+        if name not in _models:
+            import spacy
+
+            start = time.perf_counter()
+            try:
+                _models[name] = spacy.load(name)
+            except OSError as e:
+                raise OSError(
+                    f"spaCy model '{name}' is not installed; install it at build time "
+                    f"with: python -m spacy download {name}"
+                ) from e
+            logging.info(f"🧠 Loaded spaCy model {name} in {time.perf_counter() - start:.2f}s")
+        return _models[name]
+
+
+def parse(text: str, profile="full", name: str = SPACY_MODEL):
+    """
+    Parse one text, running only the components the profile needs.
+
+    Args:
+        text (str): The text to parse.
+        profile (str | ExtractionProfile): Features the Doc will serve.
+        name (str): Pipeline to use.
+
+    Returns:
+        spacy.tokens.Doc: The parsed document.
+    """
+    nlp = get_nlp(name)
+    with metrics.timed("spacy"):
+        return nlp(text, disable=get_profile(profile).disabled(nlp))
+
+
+def pipe(texts, profile="full", batch_size: int = 64, n_process: int = 1, name: str = SPACY_MODEL):
+    """
+    Batched counterpart of ``parse`` built on ``nlp.pipe``.
+
+    Yields:
+        spacy.tokens.Doc: One Doc per text, in input order.
+    """
+    nlp = get_nlp(name)
+    return _timed_docs(nlp.pipe(
+        texts,
+        batch_size=batch_size,
+        n_process=n_process,
+        disable=get_profile(profile).disabled(nlp),
+    ))
+
+
+def _timed_docs(docs):
+    # nlp.pipe works lazily as Docs are pulled, so time each pull and record
+    # the run as one observation when it ends
+    elapsed = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            doc = next(docs, None)
+            elapsed += time.perf_counter() - start
+            if doc is None:
+                return
+            yield doc
+    finally:
+        metrics.observe("spacy", elapsed)
+
+
+def is_loaded(name: str = SPACY_MODEL) -> bool:
+    return name in _models
+
+
+def model_version(name: str = SPACY_MODEL) -> str:
+    """
+    Version of the named pipeline, read from package metadata when the
+    model has not been loaded yet.
+    """
+    if name in _models:
+        return _models[name].meta.get("version", "unknown")
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return get_nlp(name).meta.get("version", "unknown")
+
+
+def warm_up(name: str = SPACY_MODEL):
+    """
+    Load the pipeline and run it once so the first real request does not
+    pay for lazy initialization.
+    """
+    start = time.perf_counter()
+    get_nlp(name)("Warm up the pipeline with a short Python developer resume.")
+    logging.info(f"🔥 Warm-up finished in {time.perf_counter() - start:.2f}s")
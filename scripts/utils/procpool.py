@@ -0,0 +1,118 @@
+import gc
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import models
+
+# Forked processes each worker.py worker uses to parse one task's job
+# descriptions in parallel; 0 parses in the worker itself. Workers already
+# run tasks in parallel, so keep this at 0 unless WORKER_CONCURRENCY is 1
+# and single tasks are large. The API process never forks a pool.
+PROCESS_POOL_SIZE = int(os.getenv("PROCESS_POOL_SIZE", "0"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def preload():
+    """
+    Load the spaCy pipeline and move every object allocated so far into the
+    permanent GC generation.
+
+    Forked children then share the model's pages with the parent: without
+    ``gc.freeze`` the first collection in each child writes to the header of
+    every tracked object and copies most of the model into private memory.
+    """
+    start = time.perf_counter()
+    models.warm_up()
+    gc.collect()
+    gc.freeze()
+    logging.info(f"🧊 Preloaded and froze {gc.get_freeze_count()} objects in {time.perf_counter() - start:.2f}s")
+
+
+def fork_context():
+    """
+    The ``fork`` start method, which copy-on-write sharing depends on.
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        raise RuntimeError("Pre-forked workers need the 'fork' start method (Linux or macOS)")
+    return multiprocessing.get_context("fork")
+
+
+def _ready(_=None):
+    return os.getpid()
+
+
+def start_process_pool(size: int = PROCESS_POOL_SIZE):
+    """
+    Preload the model and fork the process-wide pool of parse workers, so
+    none of them loads a model of its own.
+
+    Forking copies only the calling thread, and any lock another thread
+    holds at that moment (logging, the DB pool) stays locked forever in the
+    children. Call this while the process still has a single thread, as
+    worker.py does before it starts its lease heartbeat.
+
+    Returns:
+        ProcessPoolExecutor | None: The pool; None when ``size`` is 0.
+    """
+    global _pool
+    if size <= 0:
+        return None
+    if threading.active_count() > 1:
+        raise RuntimeError("The parse pool must be forked before any other thread starts")
+    with _pool_lock:
+        if _pool is None:
+            preload()
+            pool = ProcessPoolExecutor(max_workers=size, mp_context=fork_context())
+            # Fork every worker now, while the parent is in its frozen state
+            list(pool.map(_ready, range(size)))
+            _pool = pool
+        return _pool
+
+
+def get_process_pool():
+    """
+    Returns the pool started by ``start_process_pool``, or None when this
+    process has none and parses in the calling thread.
+    """
+    return _pool
+
+
+def map_chunks(fn, items, chunk_size: int, pool=None):
+    """
+    Apply ``fn`` to consecutive chunks of ``items`` in the pool and yield
+    the concatenated results in input order. Without a pool the chunks run
+    in the calling process.
+
+    Args:
+        fn (callable): Module-level function taking a list and returning a
+            list of the same length.
+        items (iterable): Inputs to split into chunks.
+        chunk_size (int): Inputs per dispatched call.
+        pool (ProcessPoolExecutor, optional): Defaults to get_process_pool().
+
+    Yields:
+        The results of ``fn`` for each input.
+    """
+    items = list(items)
+    chunks = [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+    pool = pool or get_process_pool()
+    if pool is None:
+        for chunk in chunks:
+            yield from fn(chunk)
+        return
+    for results in pool.map(fn, chunks):
+        yield from results
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
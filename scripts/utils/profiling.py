@@ -0,0 +1,103 @@
+import contextlib
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import time
+
+# Where profiled tasks leave their .prof dump and .txt summary
+PROFILE_DIR = os.getenv("PROFILE_DIR", ".cache/profiles")
+# Fraction of tasks profiled even when not requested, e.g. 0.01 for 1%
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+# Self time is attributed to the first stage whose pattern matches the
+# function's file or, for C functions, its qualified name
+STAGE_PATTERNS = [
+    ("html_to_text", re.compile(r"(^|[/\\])bs4[/\\]|[/\\]htmltext\.py|[/\\]html[/\\]parser\.py|\bbs4\.")),
+    ("spacy", re.compile(r"(^|[/\\])(spacy|thinc|blis)[/\\]|\b(spacy|thinc|blis)\.")),
+    ("tfidf", re.compile(r"(^|[/\\])(sklearn|scipy|numpy)[/\\]|\b(sklearn|scipy|numpy)\.")),
+    ("postgres", re.compile(r"(^|[/\\])(psycopg2|psycopg|psycopg_pool)[/\\]|\b(psycopg2|psycopg)\.")),
+    ("app", re.compile(r"[/\\]scripts[/\\]")),
+]
+
+
+def should_profile(requested: bool = False) -> bool:
+    return requested or (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE)
+
+
+@contextlib.contextmanager
+def profiled(name: str, requested: bool = False):
+    """
+    Run the block under cProfile when profiling was requested or the block
+    is sampled, then write ``<name>-<timestamp>.prof`` and a ``.txt``
+    summary to PROFILE_DIR. Otherwise the block runs untouched.
+
+    Only the calling thread is profiled; work handed to the process pool
+    shows up as time spent waiting for it.
+
+    Args:
+        name (str): Identifies the profiled work, e.g. the task id.
+        requested (bool): Profile regardless of PROFILE_SAMPLE_RATE.
+    """
+    if not should_profile(requested):
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        try:
+            path = write_profile(profiler, name, elapsed)
+            logging.info(f"🔬 Profile of {name} written to {path}")
+        except Exception:
+            logging.exception(f"❌ Error writing profile of {name}")
+
+
+def stage_times(stats: pstats.Stats) -> dict:
+    """
+    Returns:
+        dict: Seconds of self time per stage, plus "other".
+    """
+    totals = {stage: 0.0 for stage, _ in STAGE_PATTERNS}
+    totals["other"] = 0.0
+    for (filename, _, function), (_, _, self_time, _, _) in stats.stats.items():
+        location = f"{filename} {function}"
+        stage = next((stage for stage, pattern in STAGE_PATTERNS if pattern.search(location)), "other")
+        totals[stage] += self_time
+    return totals
+
+
+def write_profile(profiler: cProfile.Profile, name: str, elapsed: float) -> str:
+    """
+    Dump the profile and its summary: wall time, self time per stage and the
+    functions with the highest cumulative time.
+
+    Returns:
+        str: Path of the .prof file.
+    """
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    safe_name = re.sub(r"[^\w.-]+", "_", name)
+    base = os.path.join(PROFILE_DIR, f"{safe_name}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}")
+    profiler.dump_stats(f"{base}.prof")
+
+    top = io.StringIO()
+    stats = pstats.Stats(profiler, stream=top)
+    stats.sort_stats("cumulative").print_stats(25)
+
+    totals = stage_times(stats)
+    profiled_total = sum(totals.values()) or 1.0
+    lines = [f"Profile of {name}: {elapsed:.3f}s wall", "", "Self time by stage:"]
+    for stage, seconds in sorted(totals.items(), key=lambda item: -item[1]):
+        lines.append(f"  {stage:<14} {seconds:9.3f}s  {seconds / profiled_total:6.1%}")
+    lines += ["", top.getvalue()]
+    with open(f"{base}.txt", "w") as f:
+        f.write("\n".join(lines))
+    return f"{base}.prof"
@@ -0,0 +1,175 @@
+import logging
+
+from .db import get_conn, put_conn
+
+# Idempotent DDL for the tables and columns the matcher needs. The core
+# tables ("TaskRequest", "Resume", "Job", "JobMatched") are created by the
+# main application, and these statements belong in its migrations; print
+# them with ``python -m scripts.utils.schema sql``. Applying them from here
+# is meant for local databases.
+SCHEMA_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS public."IdfModel" (
+        id integer PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+        version text NOT NULL,
+        "documentCount" integer NOT NULL DEFAULT 0,
+        "updatedAt" timestamptz NOT NULL DEFAULT now()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS public."IdfTerm" (
+        id serial PRIMARY KEY,
+        term text NOT NULL UNIQUE,
+        "documentFrequency" integer NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    ALTER TABLE public."JobMatched" ADD COLUMN IF NOT EXISTS "scoreModelVersion" text
+    """,
+    """
+    ALTER TABLE public."Resume"
+        ADD COLUMN IF NOT EXISTS "keywordsHash" text,
+        ADD COLUMN IF NOT EXISTS "keywordsSourceHash" text
+    """,
+    """
+    ALTER TABLE public."Job" ADD COLUMN IF NOT EXISTS "keywordsHash" text
+    """,
+    """
+    ALTER TABLE public."JobMatched" ADD COLUMN IF NOT EXISTS "scoreInputsHash" text
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS public."TaskQueue" (
+        "taskId" text PRIMARY KEY,
+        status text NOT NULL DEFAULT 'QUEUED',
+        attempts integer NOT NULL DEFAULT 0,
+        "maxAttempts" integer NOT NULL DEFAULT 3,
+        "visibleAt" timestamptz NOT NULL DEFAULT now(),
+        "lockedBy" text,
+        "lastError" text,
+        "createdAt" timestamptz NOT NULL DEFAULT now(),
+        "updatedAt" timestamptz NOT NULL DEFAULT now()
+    )
+    """,
+    """
+    ALTER TABLE public."TaskQueue" ADD COLUMN IF NOT EXISTS profile boolean NOT NULL DEFAULT false
+    """,
+    """
+    ALTER TABLE public."Resume" ADD COLUMN IF NOT EXISTS "keywordCounts" integer[]
+    """,
+    """
+    ALTER TABLE public."Job" ADD COLUMN IF NOT EXISTS "keywordCounts" integer[]
+    """,
+    """
+    ALTER TABLE public."Job"
+        ADD COLUMN IF NOT EXISTS "vectorTermIds" integer[],
+        ADD COLUMN IF NOT EXISTS "vectorWeights" double precision[],
+        ADD COLUMN IF NOT EXISTS "vectorNorm" double precision,
+        ADD COLUMN IF NOT EXISTS "vectorModelVersion" text
+    """,
+    """
+    ALTER TABLE public."Job"
+        ADD COLUMN IF NOT EXISTS "documentVector" real[],
+        ADD COLUMN IF NOT EXISTS "documentVectorModel" text
+    """,
+    """
+    ALTER TABLE public."Resume"
+        ADD COLUMN IF NOT EXISTS "documentVector" real[],
+        ADD COLUMN IF NOT EXISTS "documentVectorModel" text
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS "TaskQueue_status_visibleAt_idx"
+    ON public."TaskQueue" (status, "visibleAt")
+    """,
+]
+
+
+# Every column the matcher reads or writes beyond the core tables' own,
+# added by SCHEMA_STATEMENTS
+REQUIRED_COLUMNS = {
+    "IdfModel": ["id", "version", "documentCount", "updatedAt"],
+    "IdfTerm": ["id", "term", "documentFrequency"],
+    "TaskQueue": [
+        "taskId", "status", "attempts", "maxAttempts", "visibleAt", "lockedBy", "lastError",
+        "createdAt", "updatedAt", "profile",
+    ],
+    "Resume": [
+        "keywordsHash", "keywordsSourceHash", "keywordCounts", "documentVector", "documentVectorModel",
+    ],
+    "Job": [
+        "keywordsHash", "keywordCounts", "vectorTermIds", "vectorWeights", "vectorNorm",
+        "vectorModelVersion", "documentVector", "documentVectorModel",
+    ],
+    "JobMatched": ["scoreModelVersion", "scoreInputsHash"],
+}
+
+COLUMNS_QUERY = """
+    SELECT table_name, column_name FROM information_schema.columns
+    WHERE table_schema = 'public' AND table_name = ANY(%s)
+"""
+
+
+def missing_columns() -> list:
+    """
+    The columns in REQUIRED_COLUMNS the database does not have yet.
+
+    Returns:
+        list: ``"Table"."column"`` names; empty when the schema is up to date.
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(COLUMNS_QUERY, (list(REQUIRED_COLUMNS),))
+            present = set(cur.fetchall())
+        conn.commit()
+    finally:
+        put_conn(conn)
+    return [
+        f'"{table}"."{column}"'
+        for table, columns in REQUIRED_COLUMNS.items()
+        for column in columns
+        if (table, column) not in present
+    ]
+
+
+def ensure_schema() -> bool:
+    """
+    Apply every statement in SCHEMA_STATEMENTS in one transaction.
+
+    Returns:
+        bool: True when the schema is up to date.
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            for statement in SCHEMA_STATEMENTS:
+                cur.execute(statement)
+        conn.commit()
+        return True
+    except Exception:
+        conn.rollback()
+        logging.exception("❌ Error applying matcher schema")
+        return False
+    finally:
+        put_conn(conn)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import textwrap
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Check, print or apply the matcher's schema additions.")
+    parser.add_argument("command", nargs="?", choices=["apply", "check", "sql"], default="apply")
+    args = parser.parse_args()
+
+    if args.command == "sql":
+        print(";\n".join(textwrap.dedent(statement).strip() for statement in SCHEMA_STATEMENTS) + ";")
+    elif args.command == "check":
+        missing = missing_columns()
+        if missing:
+            logging.error(f"❌ Missing columns: {', '.join(missing)}")
+            sys.exit(1)
+        logging.info("✅ Matcher schema is up to date")
+    elif ensure_schema():
+        logging.info("✅ Matcher schema is up to date")
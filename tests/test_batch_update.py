@@ -0,0 +1,112 @@
+import psycopg2
+import pytest
+from psycopg2 import sql
+
+from scripts.utils import db
+from scripts.utils.db import BatchUpdate
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement):
+        self.conn.log.append(statement)
+
+
+class FakeConnection:
+    """
+    Records the statements a flush issues; a VALUES list containing a row
+    whose key is in ``bad_keys`` fails as Postgres would reject it.
+    """
+
+    def __init__(self, bad_keys=()):
+        self.bad_keys = set(bad_keys)
+        self.log = []
+        self.written = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+    def execute_values(self, cur, statement, rows, template=None, page_size=100):
+        keys = [row[0] for row in rows]
+        self.log.append(("VALUES", keys))
+        bad = self.bad_keys.intersection(keys)
+        if bad:
+            raise psycopg2.DataError(f"invalid input for row {min(bad)}")
+        self.written.extend(keys)
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(db, "get_conn", lambda: conn)
+    monkeypatch.setattr(db, "put_conn", lambda c: None)
+    monkeypatch.setattr(db, "execute_values", conn.execute_values)
+    # Composing identifiers needs a live connection
+    monkeypatch.setattr(BatchUpdate, "_statement", lambda self: sql.SQL("UPDATE ... FROM (VALUES %s)"))
+    return conn
+
+
+def batch(keys, chunk_size=3):
+    update = BatchUpdate("Job", ["id"], ["keywords"], chunk_size=chunk_size)
+    for key in keys:
+        update.add(key, ["python"])
+    return update
+
+
+def test_flush_writes_chunks_in_one_transaction(conn):
+    update = batch(range(7))
+    assert update.flush() == {}
+    assert len(update) == 0
+    assert conn.written == list(range(7))
+    assert [entry for entry in conn.log if isinstance(entry, tuple)] == [
+        ("VALUES", [0, 1, 2]), ("VALUES", [3, 4, 5]), ("VALUES", [6]),
+    ]
+    assert conn.log.count("COMMIT") == 1
+    assert BatchUpdate("Job", ["id"], ["keywords"]).flush() == {}
+
+
+def test_failing_chunk_is_retried_row_by_row(conn):
+    conn.bad_keys = {4}
+    failures = batch(range(7)).flush()
+
+    # Only the offending row is reported; its chunk neighbours are written
+    assert list(failures) == [4]
+    assert "invalid input for row 4" in failures[4]
+    assert sorted(conn.written) == [0, 1, 2, 3, 5, 6]
+    chunk = conn.log.index(("VALUES", [3, 4, 5]))
+    assert conn.log[chunk + 1] == "ROLLBACK TO SAVEPOINT batch_chunk"
+    assert conn.log[chunk + 2:chunk + 5] == ["SAVEPOINT batch_row", ("VALUES", [3]), "RELEASE SAVEPOINT batch_row"]
+    assert "ROLLBACK TO SAVEPOINT batch_row" in conn.log
+    assert conn.log[-1] == "COMMIT"
+
+
+def test_composite_keys_are_reported_as_tuples(conn):
+    conn.bad_keys = {"t1"}
+    update = BatchUpdate("JobMatched", ["taskRequestId", "jobId"], ["score"], chunk_size=10)
+    update.add("t1", 5, 0.5)
+    update.add("t2", 6, 0.25)
+    assert list(update.flush()) == [("t1", 5)]
+
+
+def test_transaction_error_reports_every_row(conn, monkeypatch):
+    def lost(*args, **kwargs):
+        raise psycopg2.OperationalError("server closed the connection")
+
+    monkeypatch.setattr(conn, "commit", lost)
+    failures = batch(range(4)).flush()
+    assert sorted(failures) == [0, 1, 2, 3]
+    assert conn.log[-1] == "ROLLBACK"
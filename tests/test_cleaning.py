@@ -0,0 +1,100 @@
+import re
+
+import pytest
+import spacy
+from spacy.tokens import Doc
+
+from scripts.utils.Utils import REGEX_PATTERNS, CleaningEngine, TextCleaner, cleaner
+
+
+def legacy_strip_patterns(text):
+    # TextCleaner.remove_emails_links before CleaningEngine
+    for pattern in REGEX_PATTERNS:
+        text = re.sub(REGEX_PATTERNS[pattern], "", text)
+    return text
+
+
+def reference_clean_doc(doc, drop_punct=True, drop_stopwords=False):
+    return "".join(
+        token.whitespace_
+        if (drop_punct and token.pos_ == "PUNCT") or (drop_stopwords and token.is_stop)
+        else token.text_with_ws
+        for token in doc
+    )
+
+
+@pytest.fixture(scope="module")
+def vocab():
+    return spacy.blank("en").vocab
+
+
+def make_doc(vocab, text):
+    # Whitespace-separated words; a word made only of punctuation is tagged
+    # PUNCT, as the tagger would
+    words = text.split(" ")
+    pos = ["PUNCT" if word and not any(c.isalnum() for c in word) else "NOUN" for word in words]
+    spaces = [True] * (len(words) - 1) + [False]
+    return Doc(vocab, words=words, spaces=spaces, pos=pos)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("see https://x.io/jobs/5551234567 now", "see / now"),
+    ("Contact john.doe@example.com or 555.123.4567 today", "Contact  or  today"),
+    ("Call (555) 123-4567 or visit www.example.com/careers.", "Call  or visit ."),
+    ("mail me at a.b@c.io, thanks", "mail me at , thanks"),
+    ("no contact details here", "no contact details here"),
+    ("", ""),
+])
+def test_strip_patterns_reference_cases(text, expected):
+    assert cleaner.strip_patterns(text) == expected
+    assert cleaner.strip_patterns(text) == legacy_strip_patterns(text)
+
+
+def test_strip_patterns_matches_legacy_on_mixed_text():
+    text = (
+        "Jane Doe | jane@doe.dev | +1 555-867-5309 | https://doe.dev/p/12345678901 "
+        "www.github.com/jane 2021-2024 Senior Engineer, ID 4155550123."
+    )
+    assert cleaner.strip_patterns(text) == legacy_strip_patterns(text)
+
+
+def test_strip_patterns_runs_patterns_in_order():
+    engine = CleaningEngine({"first": r"ab", "second": r"ac"})
+    # "aabc" -> "ac" after the first pattern, then "" after the second
+    assert engine.strip_patterns("aabc") == ""
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Doe , Python", "Doe  Python"),
+    ("skills : Python , SQL .", "skills  Python  SQL "),
+    ("no punctuation here", "no punctuation here"),
+    (", leading", " leading"),
+])
+def test_clean_doc_drops_punctuation(vocab, text, expected):
+    doc = make_doc(vocab, text)
+    assert cleaner.clean_doc(doc) == expected
+    assert cleaner.clean_doc(doc) == reference_clean_doc(doc)
+
+
+def test_clean_doc_drops_whole_stopword_tokens_only(vocab):
+    doc = make_doc(vocab, "data is a skill")
+    cleaned = cleaner.clean_doc(doc, drop_punct=False, drop_stopwords=True)
+    # "a" inside "data" is not a token of its own and stays
+    assert cleaned == "data   skill"
+    assert cleaned == reference_clean_doc(doc, drop_punct=False, drop_stopwords=True)
+
+
+def test_clean_doc_drops_punctuation_and_stopwords(vocab):
+    doc = make_doc(vocab, "the data , and the model .")
+    assert cleaner.clean_doc(doc, drop_stopwords=True) == reference_clean_doc(doc, drop_stopwords=True)
+
+
+def test_clean_doc_empty(vocab):
+    assert cleaner.clean_doc(Doc(vocab, words=[])) == ""
+
+
+def test_text_cleaner_delegates(vocab):
+    doc = make_doc(vocab, "Doe , Python")
+    assert TextCleaner.clean_text("Doe , Python", doc=doc) == "Doe  Python"
+    assert TextCleaner.remove_stopwords("data is a skill", doc=make_doc(vocab, "data is a skill")) == "data   skill"
+    assert TextCleaner.remove_emails_links("a@b.co x") == " x"
@@ -0,0 +1,84 @@
+import importlib
+
+import pytest
+
+from scripts.ResumeProcessor import ResumeProcessor
+from scripts.utils.fingerprint import keywords_hash, score_inputs_hash, source_hash
+
+# The package re-exports the class under the module's name
+resume_processor_module = importlib.import_module("scripts.ResumeProcessor")
+
+TEXT = "Senior Python developer with PostgreSQL and Kubernetes experience"
+
+
+def test_keywords_hash_ignores_order():
+    assert keywords_hash({"python": 2, "sql": 1}) == keywords_hash({"sql": 1, "python": 2})
+    assert keywords_hash({"python": 2, "sql": 1}) != keywords_hash({"python": 1, "sql": 1})
+    assert keywords_hash({"python": 1}) != keywords_hash({"python": 1, "sql": 1})
+    # Separators keep keywords and counts from running together
+    assert keywords_hash({"ab": 1}) != keywords_hash({"a": 1, "b": 1})
+    assert keywords_hash({"a1": 1}) != keywords_hash({"a": 11})
+    assert keywords_hash(None) == keywords_hash({})
+
+
+def test_score_inputs_hash_covers_every_input():
+    base = score_inputs_hash("resume", "job", "idf-1")
+    assert base == score_inputs_hash("resume", "job", "idf-1")
+    assert len({
+        base,
+        score_inputs_hash("resume2", "job", "idf-1"),
+        score_inputs_hash("resume", "job2", "idf-1"),
+        score_inputs_hash("resume", "job", "idf-2"),
+        score_inputs_hash("job", "resume", "idf-1"),
+    }) == 5
+
+
+def test_source_hash_ignores_whitespace_but_not_the_pipeline():
+    assert source_hash(TEXT, "v1") == source_hash(f"  {TEXT.replace(' ', '  ')}\n", "v1")
+    assert source_hash(TEXT, "v1") != source_hash(TEXT, "v2")
+    assert source_hash(TEXT, "v1") != source_hash(TEXT + " Go", "v1")
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    # Stand-ins for the spaCy model's versions, so no model is loaded
+    monkeypatch.setattr(resume_processor_module, "pipeline_version", lambda: "pipeline-1")
+    monkeypatch.setattr(resume_processor_module, "vector_model", lambda: "vectors-1")
+    monkeypatch.setattr(resume_processor_module, "DOCUMENT_VECTORS_ENABLED", False)
+    processor = ResumeProcessor("task")
+    processor.resume_id = "resume"
+    processor.raw_text = TEXT
+    processor.keywords = {"python": 1}
+    processor.keywords_source_hash = source_hash(TEXT, "pipeline-1")
+    return processor
+
+
+def test_resume_with_current_keywords_is_unchanged(processor):
+    assert processor.is_unchanged()
+
+
+def test_resume_is_stale_when_text_or_pipeline_changes(processor, monkeypatch):
+    processor.raw_text = TEXT + " and Go"
+    assert not processor.is_unchanged()
+
+    processor.raw_text = TEXT
+    monkeypatch.setattr(resume_processor_module, "pipeline_version", lambda: "pipeline-2")
+    assert not processor.is_unchanged()
+
+
+def test_resume_without_keywords_or_hash_is_stale(processor):
+    processor.keywords = None
+    assert not processor.is_unchanged()
+
+    processor.keywords = {"python": 1}
+    processor.keywords_source_hash = None
+    assert not processor.is_unchanged()
+
+
+def test_resume_needs_a_current_vector_when_vectors_are_enabled(processor, monkeypatch):
+    monkeypatch.setattr(resume_processor_module, "DOCUMENT_VECTORS_ENABLED", True)
+    assert not processor.is_unchanged()
+    processor.document_vector = ("vectors-0", [0.1, 0.2])
+    assert not processor.is_unchanged()
+    processor.document_vector = ("vectors-1", [0.1, 0.2])
+    assert processor.is_unchanged()
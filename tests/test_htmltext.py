@@ -0,0 +1,67 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from benchmarks.corpus import make_job_html, make_job_page
+from scripts.utils.htmltext import HTMLTextExtractor, html_to_text
+
+# Markup the generated corpora do not cover: references, malformed
+# nesting, stray end tags, hidden elements and declarations
+EDGE_CASES = [
+    "<p>Hi <b>Py</b>thon &amp; C&nbsp;</p><!-- c --><![CDATA[cd]]><?pi x?><!DOCTYPE html>",
+    "&foo; &amp &#150; &#x41; &notin &notit; a&lt;b &#0; &#129; &#1114112; &#X42;&AMP;&ampx",
+    "<textarea>ta</textarea><template><p>tp</p></template><noscript>ns</noscript><svg><style>s</style></svg>",
+    "<ruby>kan<rt>ji</rt><rp>(</rp></ruby>x<div><rt>hidden</div>shown",
+    "a<p>b<p>c</div>d</p></p>e<p>unclosed <b>bold",
+    "<p>x</p >y<br>z<img src=x>w<br/>v<div/>u",
+    "<scr<script>ipt>x</script>y<script>'</p>'</script>z<style>p{}</style>",
+    "<ul><li>one<li>two</ul><table><tr><td>a<td>b</table>tail &",
+    "x</br>a",
+    "<p>x</BR>a</p><b>y</i>z</b>",
+    "",
+]
+
+
+def reference_text(html):
+    # The previous implementation of read_html_description
+    return BeautifulSoup(html, "html.parser").get_text(separator=" ", strip=True)
+
+
+def chunked_text(html, chunk):
+    extractor = HTMLTextExtractor()
+    for start in range(0, len(html), chunk):
+        extractor.feed(html[start:start + chunk])
+    extractor.close()
+    return extractor.text()
+
+
+@pytest.mark.parametrize("html", EDGE_CASES)
+def test_matches_beautifulsoup(html):
+    assert html_to_text(html).replace("\n", " ") == reference_text(html)
+
+
+@pytest.mark.parametrize("html", EDGE_CASES)
+@pytest.mark.parametrize("chunk", [1, 7, 97])
+def test_chunked_feed_matches_whole(html, chunk):
+    assert chunked_text(html, chunk) == html_to_text(html)
+
+
+@pytest.mark.parametrize("make", [make_job_html, make_job_page])
+@pytest.mark.parametrize("seed", range(3))
+def test_corpus_matches_beautifulsoup(make, seed):
+    html = make(seed, "medium")
+    text = html_to_text(html)
+    assert text.replace("\n", " ") == reference_text(html)
+    assert chunked_text(html, 97) == text
+
+
+@pytest.mark.parametrize("html, expected", [
+    # A stray </br> breaks the line as <br> does, the way browsers read it
+    ("x</br>a", "x\na"),
+    ("x</BR>", "x"),
+    ("</br>a", "a"),
+    ("<p>one</p><p>two</p>", "one\ntwo"),
+    ("<b>in</b>line", "in line"),
+    ("<script>hidden()</script>shown", "shown"),
+])
+def test_line_breaks(html, expected):
+    assert html_to_text(html) == expected
@@ -0,0 +1,92 @@
+import random
+
+import numpy as np
+import pytest
+
+from benchmarks.corpus import make_keywords
+from scripts import JobIndex as job_index_module
+from scripts.JobIndex import JOB_INDEX_PRUNE_MAX_TERMS, JobIndex
+
+# Both searches accumulate float32 scores
+TOLERANCE = 1e-6
+
+
+def random_index(jobs, seed=0, vocabulary_size=300) -> JobIndex:
+    rng = random.Random(seed)
+    index = JobIndex()
+    index.add_documents(
+        (f"job-{i}", make_keywords(seed * 100_000 + i, rng.randint(0, 60), vocabulary_size)) for i in range(jobs)
+    )
+    return index
+
+
+def assert_same_top_k(pruned, exhaustive):
+    assert len(pruned) == len(exhaustive)
+    np.testing.assert_allclose([s for _, s in pruned], [s for _, s in exhaustive], atol=TOLERANCE)
+    if not pruned:
+        return
+    # Jobs tied with the k-th score may be cut differently; all others must match
+    kth = exhaustive[-1][1]
+    assert {j for j, s in pruned if s > kth + TOLERANCE} == {j for j, s in exhaustive if s > kth + TOLERANCE}
+
+
+@pytest.mark.parametrize("k", [1, 5, 20, 100])
+def test_pruned_top_k_matches_exhaustive(k):
+    index = random_index(2000)
+    rng = random.Random(1)
+    for seed in range(40):
+        query = make_keywords(10_000_000 + seed, rng.randint(1, 40), 300)
+        assert_same_top_k(index.pruned_top_k(query, k), index.exhaustive_top_k(query, k))
+
+
+def test_pruned_top_k_with_ties():
+    # Every document appears three times, so scores tie in threes across the
+    # k-th boundary
+    rng = random.Random(2)
+    documents = [make_keywords(seed, rng.randint(1, 30), 50) for seed in range(200)]
+    index = JobIndex()
+    index.add_documents((f"job-{copy}-{i}", keywords) for copy in range(3) for i, keywords in enumerate(documents))
+    for seed in range(30):
+        query = make_keywords(1_000_000 + seed, rng.randint(1, 20), 50)
+        for k in (1, 4, 10, 31):
+            pruned, exhaustive = index.pruned_top_k(query, k), index.exhaustive_top_k(query, k)
+            assert_same_top_k(pruned, exhaustive)
+        # A bulk build weights every copy against the same corpus
+        scores = dict(index.exhaustive_top_k(query, len(index)))
+        for i in range(len(documents)):
+            copies = [scores.get(f"job-{copy}-{i}", 0.0) for copy in range(3)]
+            assert copies == pytest.approx([copies[0]] * 3, abs=TOLERANCE)
+
+
+def test_k_larger_than_candidates():
+    index = JobIndex()
+    index.add_documents([("a", ["python", "sql"]), ("b", ["python"]), ("c", ["java"]), ("d", [])])
+    pruned = index.pruned_top_k(["python", "go"], 50)
+    assert [job_id for job_id, _ in pruned] == ["b", "a"]
+    assert_same_top_k(pruned, index.exhaustive_top_k(["python", "go"], 50))
+    assert index.pruned_top_k(["rust"], 50) == []
+    assert index.pruned_top_k(["python"], 0) == []
+
+
+def test_long_queries(monkeypatch):
+    index = random_index(1500, seed=3, vocabulary_size=2000)
+    query = make_keywords(42, 400, 2000)
+    assert len(index._query_terms(query)[0]) > JOB_INDEX_PRUNE_MAX_TERMS
+
+    exhaustive = index.exhaustive_top_k(query, 20)
+    # pruned_top_k always prunes; top_k answers long queries exhaustively
+    assert_same_top_k(index.pruned_top_k(query, 20), exhaustive)
+    assert index.top_k(query, 20) == exhaustive
+    monkeypatch.setattr(job_index_module, "JOB_INDEX_PRUNE_MAX_TERMS", 10_000)
+    assert_same_top_k(index.top_k(query, 20), exhaustive)
+
+
+def test_replaced_jobs_are_not_returned():
+    index = random_index(500, seed=4)
+    query = make_keywords(7, 30, 300)
+    replaced = [job_id for job_id, _ in index.exhaustive_top_k(query, 5)]
+    index.add_documents((job_id, ["unrelated"]) for job_id in replaced)
+
+    pruned = index.pruned_top_k(query, 20)
+    assert_same_top_k(pruned, index.exhaustive_top_k(query, 20))
+    assert not set(replaced) & {job_id for job_id, _ in pruned}
@@ -0,0 +1,47 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from scripts.utils.fingerprint import keywords_hash
+from scripts.utils.keywords import analyze, count_keywords, count_matrix, keyword_counts, save_values, term_counts
+
+KEYWORDS = ["python", "sql", "python", "Machine Learning", "c++", "python", "sql"]
+
+
+def test_save_values_round_trip():
+    keywords, counts, count_map = save_values(KEYWORDS)
+    assert keywords == ["python", "sql", "Machine Learning", "c++"]
+    assert counts == [3, 2, 1, 1]
+    assert count_map == {"python": 3, "sql": 2, "Machine Learning": 1, "c++": 1}
+    assert keyword_counts(counts, keywords) == count_map
+
+
+def test_legacy_rows_fall_back_to_counting_keywords():
+    # Written before "keywordCounts": every occurrence is in "keywords"
+    assert keyword_counts(None, KEYWORDS) == count_keywords(KEYWORDS)
+    # Counts left over from another keyword list are not trusted
+    assert keyword_counts([1, 1], KEYWORDS) == count_keywords(KEYWORDS)
+    assert keyword_counts(None, None) is None
+    assert keyword_counts([], []) == {}
+
+
+def test_legacy_and_compact_rows_hash_alike():
+    # Rescoring after the migration must not find every score stale
+    keywords, counts, _ = save_values(KEYWORDS)
+    assert keywords_hash(keyword_counts(None, KEYWORDS)) == keywords_hash(keyword_counts(counts, keywords))
+
+
+@pytest.mark.parametrize("keywords", [KEYWORDS, [], ["a", "the"], ["Node.js", "node", "CI/CD"] * 3])
+def test_term_counts_match_joined_analysis(keywords):
+    expected = Counter(analyze(" ".join(keywords)))
+    assert term_counts(keywords) == expected
+    assert term_counts(count_keywords(keywords)) == expected
+
+
+def test_count_matrix_columns_are_sorted_terms():
+    matrix, terms = count_matrix([{"sql": 2, "python": 1}, ["java", "sql"]])
+    assert terms == ["java", "python", "sql"]
+    np.testing.assert_array_equal(matrix.toarray(), [[0, 1, 2], [1, 0, 1]])
+    with pytest.raises(ValueError):
+        count_matrix([{}, []])
@@ -0,0 +1,122 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from benchmarks.corpus import make_keywords
+from scripts.IdfModel import IdfModel
+from scripts.JobVectors import job_vectors
+from scripts.Score import Score
+from scripts.utils.keywords import count_keywords, term_counts
+
+# Scores are rounded to 4 decimals by both scorers
+TOLERANCE = 1e-4
+
+# Keywords the Zipf corpus lacks: case, one-letter and punctuated terms,
+# multi-word keywords and stopword-only ones
+ODD_KEYWORDS = ["C", "c", "R", "C++", "node.js", "Machine Learning", "machine", "a", "the", "3D", "ci/cd", "x"]
+
+
+def random_keywords(rng, seed):
+    shape = rng.choice(["zipf", "odd", "duplicates", "empty", "mixed"])
+    if shape == "empty":
+        return []
+    if shape == "duplicates":
+        return [rng.choice(ODD_KEYWORDS + ["python", "sql"])] * rng.randint(1, 60)
+    if shape == "odd":
+        return rng.choices(ODD_KEYWORDS, k=rng.randint(1, 20))
+    keywords = make_keywords(seed, rng.randint(1, 80), vocabulary_size=rng.choice([20, 300]))
+    if shape == "mixed":
+        keywords += rng.choices(ODD_KEYWORDS, k=5) + keywords[:10] * 3
+    return keywords
+
+
+def random_pairs(n, seed=0):
+    rng = random.Random(seed)
+    return [(random_keywords(rng, 2 * i), random_keywords(rng, 2 * i + 1)) for i in range(n)]
+
+
+def baseline(resume, job):
+    return Score(None).tfidf_job_in_resume_score(" ".join(resume), " ".join(job))
+
+
+def pair_model(documents) -> IdfModel:
+    # A corpus of exactly these documents: its smoothed IDF is the one
+    # TfidfVectorizer fits on a (resume, job) pair
+    frequencies = Counter()
+    for keywords in documents:
+        frequencies.update(term_counts(keywords).keys())
+    term_ids = {term: term_id for term_id, term in enumerate(sorted(frequencies), start=1)}
+    return IdfModel("test", len(documents), dict(frequencies), term_ids)
+
+
+def test_pair_scores_match_per_pair_baseline():
+    pairs = random_pairs(300)
+    expected = np.array([baseline(resume, job) for resume, job in pairs])
+    scores = Score(None).tfidf_pair_scores(
+        [count_keywords(resume) for resume, _ in pairs], [count_keywords(job) for _, job in pairs],
+        np.arange(len(pairs)), np.arange(len(pairs)),
+    )
+    np.testing.assert_allclose(scores, expected, atol=TOLERANCE)
+
+
+def test_pair_scores_share_resumes_and_jobs():
+    rng = random.Random(1)
+    resumes = [random_keywords(rng, seed) for seed in range(8)]
+    jobs = [random_keywords(rng, seed) for seed in range(100, 130)]
+    resume_rows = np.array([rng.randrange(len(resumes)) for _ in range(200)])
+    job_rows = np.array([rng.randrange(len(jobs)) for _ in range(200)])
+
+    scores = Score(None).tfidf_pair_scores(
+        [count_keywords(resume) for resume in resumes], [count_keywords(job) for job in jobs], resume_rows, job_rows
+    )
+    expected = [baseline(resumes[r], jobs[j]) for r, j in zip(resume_rows, job_rows)]
+    np.testing.assert_allclose(scores, expected, atol=TOLERANCE)
+
+
+@pytest.mark.parametrize("resume, job", [
+    ([], []),
+    ([], ["python"]),
+    (["python"], []),
+    (["a", "x"], ["the"]),
+    (["python"] * 50, ["python"]),
+    (["python", "sql"], ["python", "sql"]),
+])
+def test_pair_scores_edge_cases(resume, job):
+    score = Score(None)
+    [pair] = score.tfidf_pair_scores([count_keywords(resume)], [count_keywords(job)], np.array([0]), np.array([0]))
+    assert pair == pytest.approx(baseline(resume, job), abs=TOLERANCE)
+    [corpus] = score.corpus_tfidf_pair_scores(
+        [count_keywords(resume)], [count_keywords(job)], np.array([0]), np.array([0]), pair_model([resume, job])
+    )
+    assert corpus == pytest.approx(baseline(resume, job), abs=TOLERANCE)
+
+
+def test_corpus_scores_match_baseline_under_pair_model():
+    score = Score(None)
+    for resume, job in random_pairs(150, seed=2):
+        [corpus] = score.corpus_tfidf_pair_scores(
+            [count_keywords(resume)], [count_keywords(job)], np.array([0]), np.array([0]), pair_model([resume, job])
+        )
+        assert corpus == pytest.approx(baseline(resume, job), abs=TOLERANCE), (resume, job)
+
+
+def test_corpus_scores_from_stored_vectors_match_keywords():
+    rng = random.Random(3)
+    resumes = [count_keywords(random_keywords(rng, seed)) for seed in range(5)]
+    jobs = [count_keywords(random_keywords(rng, seed)) for seed in range(100, 160)]
+    model = pair_model(jobs)
+    vectors = job_vectors(dict(enumerate(jobs)), model)
+    # As Score reads them back from the Job table
+    stored = [
+        (model.version, vectors[row][0].tolist(), vectors[row][1].tolist()) if row in vectors else None
+        for row in range(len(jobs))
+    ]
+    resume_rows = np.repeat(np.arange(len(resumes)), len(jobs))
+    job_rows = np.tile(np.arange(len(jobs)), len(resumes))
+
+    score = Score(None)
+    from_keywords = score.corpus_tfidf_pair_scores(resumes, jobs, resume_rows, job_rows, model)
+    from_vectors = score.corpus_tfidf_pair_scores(resumes, jobs, resume_rows, job_rows, model, stored)
+    np.testing.assert_allclose(from_vectors, from_keywords, atol=TOLERANCE)
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from scripts.SemanticIndex import SemanticIndex
+
+K = 20
+
+
+def clustered_vectors(count, dimensions=32, topics=40, seed=0):
+    # Normalized points scattered around random topics, as in
+    # benchmarks/bench_semantic.py
+    rng = np.random.default_rng(seed)
+    centers = np.random.default_rng(100).standard_normal((topics, dimensions)).astype(np.float32)
+    vectors = centers[rng.integers(topics, size=count)] + 0.5 * rng.standard_normal((count, dimensions))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def recall(index, queries, n_probes=None):
+    found = []
+    for query in queries:
+        expected = {job_id for job_id, _ in index.exhaustive_top_k(query, K)}
+        found.append(len(expected & {job_id for job_id, _ in index.top_k(query, K, n_probes)}) / len(expected))
+    return np.mean(found)
+
+
+@pytest.fixture(scope="module")
+def index():
+    index = SemanticIndex(min_jobs=0)
+    index.add_documents(enumerate(clustered_vectors(4000, seed=1)))
+    index.train()
+    return index
+
+
+def test_ivf_recall_against_exhaustive(index):
+    queries = clustered_vectors(50, seed=2)
+    assert len(index.lists) > index.n_probes
+    assert recall(index, queries) >= 0.9
+
+
+def test_probing_every_list_is_exact(index):
+    for query in clustered_vectors(10, seed=3):
+        exhaustive = index.exhaustive_top_k(query, K)
+        found = index.top_k(query, K, n_probes=len(index.lists))
+        assert [job_id for job_id, _ in found] == [job_id for job_id, _ in exhaustive]
+        np.testing.assert_allclose([s for _, s in found], [s for _, s in exhaustive], atol=1e-6)
+
+
+def test_small_catalogs_are_searched_exhaustively():
+    index = SemanticIndex(min_jobs=1000)
+    index.add_documents(enumerate(clustered_vectors(500, seed=4)))
+    query = clustered_vectors(1, seed=5)[0]
+    assert index.top_k(query, K) == index.exhaustive_top_k(query, K)
+    assert index.centroids is None
+
+
+def test_jobs_added_after_training_are_found():
+    index = SemanticIndex(min_jobs=0)
+    index.add_documents(enumerate(clustered_vectors(2000, seed=6)))
+    index.train()
+    added = clustered_vectors(300, seed=7)
+    index.add_documents((f"new-{i}", vector) for i, vector in enumerate(added))
+    # Replaced jobs drop out of the results
+    index.add_documents([(0, -added[0])])
+
+    assert index.trained_size == 2000
+    assert recall(index, added[:30]) >= 0.9
+    for vector in added[:30]:
+        [(job_id, score)] = index.top_k(vector, 1)
+        assert job_id.startswith("new-") and score == pytest.approx(1.0, abs=1e-5)
+    assert 0 not in {job_id for job_id, _ in index.top_k(added[0], K, n_probes=len(index.lists))}
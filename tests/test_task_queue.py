@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from scripts import TaskQueue
+from scripts.TaskQueue import DEAD, QUEUED, RUNNING, SqliteTaskQueue
+
+
+@pytest.fixture
+def failed(monkeypatch):
+    # "TaskRequest" is in Postgres; record the tasks the queue fails instead
+    failed = []
+    monkeypatch.setattr(TaskQueue, "fail_tasks", lambda task_ids: failed.extend(task_ids))
+    return failed
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SqliteTaskQueue(str(tmp_path / "queue.sqlite3"))
+
+
+def status(queue, task_id):
+    return queue._conn.execute("SELECT status FROM task_queue WHERE task_id = ?", (task_id,)).fetchone()[0]
+
+
+def test_expired_last_attempt_fails_task(queue, failed):
+    queue.enqueue("t1", max_attempts=1)
+    [lease] = queue.claim_many("w1", 5, visibility_timeout=0)
+    assert lease.attempts == 1
+
+    # The worker died: its lease expires without complete() or fail()
+    assert queue.claim_many("w2", 5) == []
+    assert status(queue, "t1") == DEAD
+    assert failed == ["t1"]
+
+
+def test_expired_lease_with_attempts_left_is_claimed_again(queue, failed):
+    queue.enqueue("t1", max_attempts=2)
+    queue.claim_many("w1", 5, visibility_timeout=0)
+
+    [lease] = queue.claim_many("w2", 5)
+    assert (lease.task_id, lease.attempts, lease.worker_id) == ("t1", 2, "w2")
+    assert failed == []
+
+
+def test_lease_stays_expired_when_failing_its_task_errors(queue, failed, monkeypatch):
+    queue.enqueue("t1", max_attempts=1)
+    queue.enqueue("t2")
+    queue.claim_many("w1", 1, visibility_timeout=0)
+
+    def unreachable(task_ids):
+        raise ConnectionError("postgres down")
+
+    monkeypatch.setattr(TaskQueue, "fail_tasks", unreachable)
+    with pytest.raises(ConnectionError):
+        queue.claim_many("w2", 5)
+    # Nothing was buried or claimed
+    assert (status(queue, "t1"), status(queue, "t2")) == (RUNNING, QUEUED)
+
+    monkeypatch.setattr(TaskQueue, "fail_tasks", lambda task_ids: failed.extend(task_ids))
+    [lease] = queue.claim_many("w2", 5)
+    assert lease.task_id == "t2"
+    assert status(queue, "t1") == DEAD
+    assert failed == ["t1"]
+
+
+def test_extend_tells_lost_leases_from_errors(queue, failed):
+    queue.enqueue("t1")
+    [lease] = queue.claim_many("w1", 1)
+    assert queue.extend(lease) is True
+    assert queue.extend(lease._replace(worker_id="w2")) is False
+
+    queue._conn.execute("DROP TABLE task_queue")
+    assert queue.extend(lease) is None
+
+
+def test_keep_leases_retries_after_errors():
+    from worker import keep_leases
+
+    class FlakyQueue:
+        def __init__(self):
+            self.calls = []
+
+        def extend(self, lease, visibility_timeout):
+            self.calls.append(lease)
+            # a fails once and is kept, b is lost after its first renewal
+            if lease == "a":
+                return None if self.calls.count("a") == 1 else True
+            return self.calls.count("b") == 1
+
+    queue, done = FlakyQueue(), threading.Event()
+    thread = threading.Thread(target=keep_leases, args=(queue, ["a", "b"], 0.03, done))
+    thread.start()
+    while queue.calls.count("a") < 4:
+        done.wait(0.01)
+    done.set()
+    thread.join()
+    assert queue.calls.count("b") == 2
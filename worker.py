@@ -0,0 +1,177 @@
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+
+from scripts.Pipeline import run_batch, run_task
+from scripts.TaskQueue import TASK_QUEUE_VISIBILITY_TIMEOUT, get_task_queue
+from scripts.utils import db, metrics, models, procpool, schema
+from scripts.utils.procpool import fork_context, preload
+
+# Worker processes per host; each runs one task or batch at a time
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "2"))
+# Tasks a worker claims at once and runs as one batch, sharing the parsing
+# and scoring of the resumes and jobs they have in common
+WORKER_BATCH_SIZE = int(os.getenv("WORKER_BATCH_SIZE", "1"))
+# Seconds an idle worker waits before polling the queue again
+WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "1"))
+# Load the spaCy model once in the supervisor and fork workers from it, so
+# they share its memory copy-on-write instead of each loading a copy
+WORKER_PRELOAD = os.getenv("WORKER_PRELOAD", "1") == "1"
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(processName)s %(levelname)s %(message)s",
+)
+
+
+def keep_leases(queue, leases, visibility_timeout, done):
+    # Renew well before expiry so a slow task is not handed to a second worker.
+    # Only a lost lease is dropped; one whose renewal failed is retried next tick
+    while leases and not done.wait(visibility_timeout / 3):
+        leases = [lease for lease in leases if queue.extend(lease, visibility_timeout) is not False]
+
+
+def work(stop, visibility_timeout, poll_interval, batch_size=1, metrics_port=0):
+    """
+    Claim and run tasks until asked to stop. Runs in its own process.
+    """
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    # The supervisor handles Ctrl-C and tells workers to finish up
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    queue = get_task_queue()
+    if not models.is_loaded():
+        models.warm_up()
+    # Fork the parse workers while this process has no other thread yet
+    procpool.start_process_pool()
+    if metrics_port:
+        metrics.serve(metrics_port)
+    logging.info(f"👷 Worker {worker_id} ready")
+
+    while not stop.is_set():
+        try:
+            leases = queue.claim_many(worker_id, batch_size, visibility_timeout)
+        except Exception:
+            logging.exception("❌ Error claiming a task")
+            stop.wait(poll_interval * 5)
+            continue
+        if not leases:
+            stop.wait(poll_interval)
+            continue
+
+        for lease in leases:
+            logging.info(f"📦 Claimed task_id={lease.task_id} (attempt {lease.attempts}/{lease.max_attempts})")
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=keep_leases, args=(queue, leases, visibility_timeout, done), daemon=True
+        )
+        heartbeat.start()
+        error = "task failed; see worker logs"
+        try:
+            # Tasks with attempts left are retried, so only their last
+            # failure is recorded as FAILED
+            if len(leases) == 1:
+                lease = leases[0]
+                results = {
+                    lease.task_id: run_task(lease.task_id, lease.profile, lease.attempts >= lease.max_attempts)
+                }
+            else:
+                results = run_batch(
+                    [lease.task_id for lease in leases], any(lease.profile for lease in leases),
+                    retried={lease.task_id for lease in leases if lease.attempts < lease.max_attempts},
+                )
+        except Exception as e:
+            logging.exception(f"❌ Unhandled error running {len(leases)} tasks")
+            results, error = {}, str(e)
+        finally:
+            done.set()
+            heartbeat.join()
+
+        for lease in leases:
+            if results.get(lease.task_id):
+                queue.complete(lease)
+            else:
+                queue.fail(lease, error)
+
+    procpool.shutdown()
+    logging.info(f"👋 Worker {worker_id} stopped; DB pool: {db.pool_stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run job match workers against the task queue.")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY)
+    parser.add_argument("--visibility-timeout", type=float, default=TASK_QUEUE_VISIBILITY_TIMEOUT)
+    parser.add_argument("--poll-interval", type=float, default=WORKER_POLL_INTERVAL)
+    parser.add_argument("--batch-size", type=int, default=WORKER_BATCH_SIZE)
+    parser.add_argument("--metrics-port", type=int, default=metrics.WORKER_METRICS_PORT)
+    parser.add_argument("--no-preload", dest="preload", action="store_false", default=WORKER_PRELOAD)
+    args = parser.parse_args()
+
+    missing = schema.missing_columns()
+    if missing:
+        logging.error(
+            f"❌ Missing columns: {', '.join(missing)}; apply the matcher's migrations "
+            "(python -m scripts.utils.schema sql) before starting workers"
+        )
+        sys.exit(1)
+    # The supervisor is done with the database; workers open their own pools
+    db.close_all()
+
+    if args.preload:
+        preload()
+    context = fork_context()
+    stop = context.Event()
+    # Set from the signal handler instead of ``stop``: setting a
+    # multiprocessing Event while this thread waits on it deadlocks
+    stopping = threading.Event()
+
+    def request_stop(signum, frame):
+        stopping.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    processes = {}
+
+    # In multiprocess mode the API's /metrics aggregates workers sharing its directory
+    serve_metrics = args.metrics_port and not metrics.PROMETHEUS_MULTIPROC_DIR
+
+    def start(slot):
+        process = context.Process(
+            target=work,
+            args=(
+                stop, args.visibility_timeout, args.poll_interval, max(1, args.batch_size),
+                args.metrics_port + slot if serve_metrics else 0,
+            ),
+            name=f"worker-{slot}",
+        )
+        process.start()
+        processes[slot] = process
+
+    for slot in range(args.concurrency):
+        start(slot)
+
+    # Replace workers that die (e.g. killed for memory); their task is
+    # picked up again once its lease expires
+    while not stopping.wait(5):
+        for slot, process in list(processes.items()):
+            if not process.is_alive():
+                logging.warning(f"⚠️ {process.name} exited with code {process.exitcode}; restarting")
+                metrics.mark_process_dead(process.pid)
+                start(slot)
+
+    logging.info("🛑 Stopping workers after their current task")
+    stop.set()
+
+    for process in processes.values():
+        process.join()
+        metrics.mark_process_dead(process.pid)
+
+
+if __name__ == "__main__":
+    main()